@@ -0,0 +1,109 @@
+"""
+Measures bytes on the wire and CPU time per MB for request and response
+compression with gzip and zstd.
+
+Uses an /add body of generated prose and a CHUNKS /search response. zstd is
+skipped unless the `zstandard` package is installed.
+
+Run from an environment with the SDK installed (e.g. `uv run`):
+
+    python benchmarks/compression.py
+"""
+
+import random
+import time
+import zlib
+from uuid import uuid4
+
+from cogwit_sdk.infrastructure.compression import (
+    CompressionConfig,
+    compress_body,
+    decompress_body,
+    zstandard,
+)
+from cogwit_sdk.infrastructure.json_backend import json_dumps
+
+WORDS = (
+    "graph knowledge entity relation document memory search dataset node edge "
+    "the of and to in is that for with as on by from this be are it"
+).split()
+
+
+def prose(word_count: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(word_count))
+
+
+def add_body() -> bytes:
+    return json_dumps(
+        {
+            "text_data": [prose(2_000) for _ in range(500)],
+            "dataset_id": "",
+            "dataset_name": "main_dataset",
+            "node_set": None,
+        }
+    )
+
+
+def chunks_response() -> bytes:
+    dataset_id = str(uuid4())
+    return json_dumps(
+        [
+            {
+                "search_result": [{"id": str(uuid4()), "text": prose(200)}],
+                "dataset_id": dataset_id,
+                "dataset_name": "main_dataset",
+            }
+            for _ in range(2_000)
+        ]
+    )
+
+
+def decompress(encoding: str, body: bytes) -> bytes:
+    if encoding == "gzip":
+        return zlib.decompress(body, wbits=31)
+    return decompress_body(encoding, body)
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main():
+    random.seed(0)
+    encodings = ["gzip"] + (["zstd"] if zstandard is not None else [])
+
+    print(
+        f"{'payload':<10}{'codec':<6}{'level':>6}{'MB':>8}{'wire MB':>9}"
+        f"{'ratio':>7}{'comp ms/MB':>12}{'decomp ms/MB':>14}"
+    )
+
+    for name, body in (("add", add_body()), ("chunks", chunks_response())):
+        megabytes = len(body) / 1_000_000
+
+        for encoding in encodings:
+            levels = (1, 6, 9) if encoding == "gzip" else (1, 3, 9)
+            for level in levels:
+                config = CompressionConfig(
+                    request_encoding=encoding, gzip_level=level, zstd_level=level
+                )
+                compressed = compress_body(config, body)
+                assert decompress(encoding, compressed) == body
+
+                compress_time = best_of(3, lambda: compress_body(config, body))
+                decompress_time = best_of(3, lambda: decompress(encoding, compressed))
+                print(
+                    f"{name:<10}{encoding:<6}{level:>6}{megabytes:>8.2f}"
+                    f"{len(compressed) / 1_000_000:>9.2f}"
+                    f"{len(body) / len(compressed):>6.1f}x"
+                    f"{compress_time * 1000 / megabytes:>12.1f}"
+                    f"{decompress_time * 1000 / megabytes:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures how long decoding a /search payload takes as the result count grows.
+
+Compares the previous try-each-branch decoding in `cogwit.search` with the
+prebuilt `search_response_adapter`.
+
+Run from an environment with the SDK installed (e.g. `uv run`):
+
+    python benchmarks/search_response_decoding.py
+"""
+
+import timeit
+from uuid import uuid4
+
+from cogwit_sdk.cogwit.cogwit import (
+    CombinedSearchResult,
+    SearchResult,
+    search_response_adapter,
+)
+
+
+def legacy_decode(data):
+    try:
+        return CombinedSearchResult(**data)
+    except (ValueError, TypeError):
+        try:
+            return [SearchResult(**result) for result in data]
+        except (ValueError, TypeError):
+            return data
+
+
+def adapter_decode(data):
+    try:
+        return search_response_adapter.validate_python(data)
+    except ValueError:
+        return data
+
+
+def chunks_payload(result_count: int):
+    dataset_id = str(uuid4())
+    return [
+        {
+            "search_result": [{"id": str(uuid4()), "text": "lorem ipsum " * 20}],
+            "dataset_id": dataset_id,
+            "dataset_name": "main_dataset",
+        }
+        for _ in range(result_count)
+    ]
+
+
+def raw_payload(result_count: int):
+    return [{"text": "lorem ipsum " * 20} for _ in range(result_count)]
+
+
+def measure(decode, payload) -> float:
+    repeat = max(3, 20000 // max(len(payload), 1))
+    return min(timeit.repeat(lambda: decode(payload), number=1, repeat=repeat))
+
+
+def main():
+    print(
+        f"{'payload':<8}{'results':>9}{'legacy ms':>12}{'adapter ms':>12}{'speedup':>9}"
+    )
+
+    for name, build_payload in (("chunks", chunks_payload), ("raw", raw_payload)):
+        for result_count in (10, 100, 1_000, 10_000):
+            payload = build_payload(result_count)
+            legacy = measure(legacy_decode, payload)
+            adapter = measure(adapter_decode, payload)
+            print(
+                f"{name:<8}{result_count:>9}{legacy * 1000:>12.3f}"
+                f"{adapter * 1000:>12.3f}{legacy / adapter:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
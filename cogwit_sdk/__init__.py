@@ -1,5 +1,16 @@
 from .cogwit.cogwit import cogwit, CogwitConfig
+from .infrastructure.circuit_breaker import CircuitOpenError
+from .infrastructure.timeout_policy import DeadlineExceeded, deadline_after
+from .modules.cognify.PipelineRunPoller import PipelineStatusError
 from .modules.search.SearchType import SearchType
 
 
-__all__ = ["cogwit", "CogwitConfig", "SearchType"]
+__all__ = [
+    "cogwit",
+    "CogwitConfig",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "deadline_after",
+    "PipelineStatusError",
+    "SearchType",
+]
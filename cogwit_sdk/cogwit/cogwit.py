@@ -1,12 +1,110 @@
-from uuid import UUID
-from pydantic import BaseModel, RootModel
-from typing import Dict, List, Optional, Union, Any
-from cogwit_sdk.infrastructure.send_api_request import SuccessResponse, send_api_request
+import asyncio
+import aiohttp
+from urllib.parse import urlencode
+from uuid import UUID, uuid4
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    Field,
+    RootModel,
+    Tag,
+    TypeAdapter,
+    ValidationError,
+)
+from typing import Annotated, AsyncIterator, Dict, Iterable, List, Optional, Union, Any
+from cogwit_sdk.infrastructure.compression import CompressionConfig
+from cogwit_sdk.infrastructure.concurrency_limiter import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyStats,
+)
+from cogwit_sdk.infrastructure.http_session import (
+    ConnectionPoolConfig,
+    create_client_session,
+)
+from cogwit_sdk.infrastructure.rate_limiter import (
+    RateLimitConfig,
+    create_rate_limiters,
+)
+from cogwit_sdk.infrastructure.request_tracing import TraceHook
+from cogwit_sdk.infrastructure.retry_policy import IDEMPOTENCY_KEY_HEADER, RetryPolicy
+from cogwit_sdk.infrastructure.json_backend import json_loads
+from cogwit_sdk.infrastructure.json_stream import JsonArrayParser
+from cogwit_sdk.infrastructure.send_api_request import (
+    ErrorResponse,
+    SuccessResponse,
+    open_api_stream,
+    send_api_request,
+)
+from cogwit_sdk.infrastructure.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitState,
+)
+from cogwit_sdk.infrastructure.hedging import Hedger, HedgingConfig, HedgingStats
+from cogwit_sdk.infrastructure.timeout_policy import TimeoutPolicy, with_deadline
+from cogwit_sdk.infrastructure.single_flight import SingleFlight, SingleFlightConfig
+from cogwit_sdk.infrastructure.sse import ServerSentEventParser
+from cogwit_sdk.modules.add.AddCoalescer import AddCoalescer, AddCoalescingConfig
+from cogwit_sdk.modules.add.batch_text_data import batch_text_data
+from cogwit_sdk.modules.add.stream_add_body import (
+    AddSource,
+    is_text_data,
+    stream_add_body,
+)
+from cogwit_sdk.modules.cognify.PipelineRunPoller import (
+    PipelinePollingConfig,
+    PipelineRunHandle,
+    PipelineRunPoller,
+    PipelineStatusError,
+)
+from cogwit_sdk.modules.search.DiskSearchResultCache import (
+    DiskSearchCacheConfig,
+    DiskSearchResultCache,
+)
+from cogwit_sdk.modules.search.SearchManyRun import SearchManyRun
+from cogwit_sdk.modules.search.SearchResultCache import (
+    CACHE_MISS,
+    DatasetInvalidations,
+    SearchCacheConfig,
+    SearchCacheKey,
+    SearchCacheStats,
+    SearchResultCache,
+    search_cache_key,
+    search_result_datasets,
+)
 from cogwit_sdk.modules.search.SearchType import SearchType
+from cogwit_sdk.modules.search.SimilarSearchCache import (
+    SimilarSearchCache,
+    SimilarSearchCacheConfig,
+)
 
 
 class CogwitConfig(BaseModel):
     api_key: str
+    connection_pool: ConnectionPoolConfig = Field(default_factory=ConnectionPoolConfig)
+    retry_policy: RetryPolicy = Field(default_factory=RetryPolicy)
+    timeout_policy: TimeoutPolicy = Field(default_factory=TimeoutPolicy)
+    rate_limits: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    adaptive_concurrency: AdaptiveConcurrencyConfig = Field(
+        default_factory=AdaptiveConcurrencyConfig
+    )
+    add_coalescing: AddCoalescingConfig = Field(default_factory=AddCoalescingConfig)
+    search_cache: SearchCacheConfig = Field(default_factory=SearchCacheConfig)
+    disk_search_cache: DiskSearchCacheConfig = Field(
+        default_factory=DiskSearchCacheConfig
+    )
+    similar_search_cache: SimilarSearchCacheConfig = Field(
+        default_factory=SimilarSearchCacheConfig
+    )
+    single_flight: SingleFlightConfig = Field(default_factory=SingleFlightConfig)
+    pipeline_polling: PipelinePollingConfig = Field(
+        default_factory=PipelinePollingConfig
+    )
+    compression: CompressionConfig = Field(default_factory=CompressionConfig)
+    hedging: HedgingConfig = Field(default_factory=HedgingConfig)
+    # Calls to an endpoint whose circuit is open raise CircuitOpenError.
+    circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
 
 
 class AddResponse(BaseModel):
@@ -21,6 +119,19 @@ class AddError(BaseModel):
     error: Union[str, Dict]
 
 
+class AddBatchFailure(BaseModel):
+    batch_index: int
+    item_count: int
+    status: int
+    error: Union[str, Dict]
+
+
+class AddManyResponse(BaseModel):
+    # One entry per batch, in input order.
+    results: List[Union[AddResponse, AddError]]
+    failures: List[AddBatchFailure]
+
+
 class CognifyResult(BaseModel):
     status: str
     dataset_id: UUID
@@ -73,75 +184,461 @@ class SearchResult(BaseModel):
 SearchResponse = Union[List[SearchResult], CombinedSearchResult, List[Any]]
 
 
+def _search_response_shape(data: Any) -> str:
+    if isinstance(data, dict):
+        return "combined"
+    if (
+        isinstance(data, list)
+        and data
+        and isinstance(data[0], dict)
+        and "search_result" in data[0]
+    ):
+        return "results"
+    return "raw"
+
+
+# Picks the SearchResponse branch from the payload shape up front, so the
+# payload is validated exactly once instead of trying each branch in turn.
+search_response_adapter: TypeAdapter[SearchResponse] = TypeAdapter(
+    Annotated[
+        Union[
+            Annotated[CombinedSearchResult, Tag("combined")],
+            Annotated[List[SearchResult], Tag("results")],
+            # Unrecognised payloads are handed back untouched, as before.
+            Annotated[Any, Tag("raw")],
+        ],
+        Discriminator(_search_response_shape),
+    ]
+)
+
+
 class SearchError(BaseModel):
     status: int
     error: Union[str, Dict]
 
 
+class CompletionDelta(BaseModel):
+    # Next fragment of a streamed completion answer.
+    text: str
+
+
 class cogwit:
     config: CogwitConfig
 
     def __init__(self, config: CogwitConfig):
         self.config = config
         self.SearchType = SearchType
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._rate_limiters = create_rate_limiters(config.rate_limits, config.api_key)
+        self._concurrency_limiters = {
+            api_endpoint: AdaptiveConcurrencyLimiter(config.adaptive_concurrency)
+            for api_endpoint in config.adaptive_concurrency.endpoints
+        }
+        self._trace_hooks: List[TraceHook] = []
+        self._circuit_breakers = {
+            api_endpoint: CircuitBreaker(api_endpoint, config.circuit_breaker)
+            for api_endpoint in config.circuit_breaker.endpoints
+        }
+        self._add_coalescer = (
+            AddCoalescer(config.add_coalescing, self._send_add)
+            if config.add_coalescing.enabled
+            else None
+        )
+        self._search_cache = (
+            SearchResultCache(config.search_cache.max_entries, config.search_cache.ttl)
+            if config.search_cache.enabled
+            else None
+        )
+        self._similar_search_cache = (
+            SimilarSearchCache(config.similar_search_cache)
+            if config.similar_search_cache.enabled
+            else None
+        )
+        self._disk_search_cache = (
+            DiskSearchResultCache(
+                config.disk_search_cache.path,
+                config.disk_search_cache.max_bytes,
+                config.disk_search_cache.ttl,
+                namespace=config.api_key,
+            )
+            if config.disk_search_cache.path is not None
+            else None
+        )
+        # Datasets changed through this client, so searches that were in
+        # flight when one of their datasets changed aren't written to the
+        # disk cache.
+        self._dataset_changes = DatasetInvalidations()
+        self._single_flight = SingleFlight()
+        self._search_hedger = Hedger(config.hedging) if config.hedging.search else None
+        self._pipeline_poller = PipelineRunPoller(
+            config.pipeline_polling,
+            self._fetch_pipeline_statuses,
+            on_completed=self._pipeline_run_completed,
+        )
+
+    async def open(self) -> "cogwit":
+        """
+        Opens a pooled HTTP session that all following calls reuse.
+
+        Without it every call opens and closes its own connection.
+        """
+        if self._session is None or self._session.closed:
+            self._session = create_client_session(self.config.connection_pool)
+
+        return self
+
+    async def aclose(self) -> None:
+        if self._add_coalescer is not None:
+            await self._add_coalescer.flush()
+
+        await self._pipeline_poller.close()
+
+        if self._disk_search_cache is not None:
+            self._disk_search_cache.close()
+
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def __aenter__(self) -> "cogwit":
+        return await self.open()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _stream_options(self, api_endpoint: str) -> Dict[str, Any]:
+        return {
+            "session": self._session,
+            "rate_limiter": self._rate_limiters.get(api_endpoint),
+            "concurrency_limiter": self._concurrency_limiters.get(api_endpoint),
+            "circuit_breaker": self._circuit_breakers.get(api_endpoint),
+            "timeout": self.config.timeout_policy.for_endpoint(api_endpoint),
+        }
+
+    def _request_options(
+        self, api_endpoint: str, deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return {
+            "session": self._session,
+            "retry_policy": self.config.retry_policy,
+            "rate_limiter": self._rate_limiters.get(api_endpoint),
+            "concurrency_limiter": self._concurrency_limiters.get(api_endpoint),
+            "compression": self.config.compression,
+            "circuit_breaker": self._circuit_breakers.get(api_endpoint),
+            "timeout": self.config.timeout_policy.for_endpoint(api_endpoint),
+            "deadline": deadline,
+            "trace_hooks": self._trace_hooks,
+        }
+
+    def add_trace_hook(self, hook: TraceHook) -> None:
+        """
+        Calls `hook` with a RequestTiming after every request attempt: where
+        the time went, the status, the bytes sent and received and the retry
+        attempt. Hooks run inline, so they should hand the timing off rather
+        than block.
+
+        Streamed searches and completions aren't traced.
+        """
+        self._trace_hooks.append(hook)
+
+    def remove_trace_hook(self, hook: TraceHook) -> None:
+        self._trace_hooks.remove(hook)
+
+    def search_cache_stats(self) -> Optional[SearchCacheStats]:
+        """Search cache counters, or None when the cache is disabled."""
+        if self._search_cache is None:
+            return None
+
+        return self._search_cache.stats()
+
+    def similar_search_cache_stats(self) -> Optional[SearchCacheStats]:
+        """Similar-query cache counters, or None when the cache is disabled."""
+        if self._similar_search_cache is None:
+            return None
+
+        return self._similar_search_cache.stats()
+
+    async def disk_search_cache_stats(self) -> Optional[SearchCacheStats]:
+        """Disk cache counters for this process, or None when it is disabled."""
+        if self._disk_search_cache is None:
+            return None
+
+        return await self._disk_search_cache.stats()
+
+    async def _datasets_changed(self, datasets: List[Union[UUID, str]]) -> None:
+        self._dataset_changes.invalidate(str(dataset) for dataset in datasets)
+
+        if self._search_cache is not None:
+            self._search_cache.invalidate_datasets(str(dataset) for dataset in datasets)
+
+        if self._similar_search_cache is not None:
+            self._similar_search_cache.invalidate_datasets(
+                str(dataset) for dataset in datasets
+            )
+
+        if self._disk_search_cache is not None:
+            await self._disk_search_cache.invalidate_datasets(
+                str(dataset) for dataset in datasets
+            )
+
+    def hedging_stats(self) -> Optional[HedgingStats]:
+        """Search hedging counters, or None when hedging is disabled."""
+        if self._search_hedger is None:
+            return None
+
+        return self._search_hedger.stats()
+
+    def circuit_states(self) -> Dict[str, CircuitState]:
+        """Current circuit state of each guarded endpoint."""
+        return {
+            api_endpoint: breaker.state
+            for api_endpoint, breaker in self._circuit_breakers.items()
+        }
+
+    def concurrency_stats(self) -> Dict[str, ConcurrencyStats]:
+        """Current adaptive limit and measured latency for each limited endpoint."""
+        return {
+            api_endpoint: limiter.stats()
+            for api_endpoint, limiter in self._concurrency_limiters.items()
+        }
 
     async def add(
         self,
-        data: Union[List[str], str],
+        data: Union[List[AddSource], AddSource],
         dataset_name: str = "main_dataset",
         dataset_id: Optional[UUID] = None,
         node_set: Optional[List[str]] = None,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> Union[AddResponse, AddError]:
+        """
+        Adds documents to a dataset.
+
+        Besides text, documents can be file paths, UTF-8 `bytes`, `memoryview`
+        or `mmap` objects, and async iterators of texts. Those are streamed
+        to the server while they are read, so large inputs are never held in
+        memory at once.
+
+        With `add_coalescing` enabled, concurrent calls for the same dataset and
+        node set are sent together and share the resulting response. Calls
+        given their own `idempotency_key` are always sent on their own.
+
+        `deadline` is a `time.monotonic()` timestamp (see `deadline_after`)
+        bounding the whole call, retries and backoff included. Past it the
+        call raises DeadlineExceeded. A coalesced batch is still sent for the
+        other callers in it.
+        """
+        if (
+            self._add_coalescer is not None
+            and idempotency_key is None
+            and is_text_data(data)
+        ):
+            return await with_deadline(
+                deadline,
+                self._add_coalescer.add(
+                    data if isinstance(data, list) else [data],
+                    dataset_name=dataset_name,
+                    dataset_id=dataset_id,
+                    node_set=node_set,
+                ),
+            )
+
+        return await self._send_add(
+            data,
+            dataset_name=dataset_name,
+            dataset_id=dataset_id,
+            node_set=node_set,
+            idempotency_key=idempotency_key,
+            deadline=deadline,
+        )
+
+    async def _send_add(
+        self,
+        data: Union[List[AddSource], AddSource],
+        dataset_name: str = "main_dataset",
+        dataset_id: Optional[UUID] = None,
+        node_set: Optional[List[str]] = None,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[AddResponse, AddError]:
+        if is_text_data(data):
+            payload = {
+                "text_data": data if isinstance(data, list) else [data],
+                "dataset_id": dataset_id or "",
+                "dataset_name": dataset_name,
+                "node_set": node_set,
+            }
+        else:
+            payload = stream_add_body(
+                data if isinstance(data, list) else [data],
+                dataset_name,
+                dataset_id,
+                node_set,
+            )
+
         response_data = await send_api_request(
             "/add",
             "post",
             {
                 "X-Api-Key": self.config.api_key,
                 "Content-Type": "application/json",
+                IDEMPOTENCY_KEY_HEADER: idempotency_key or str(uuid4()),
             },
-            {
-                "text_data": data if isinstance(data, list) else [data],
-                "dataset_id": dataset_id or "",
-                "dataset_name": dataset_name,
-                "node_set": node_set,
-            },
+            payload,
+            **self._request_options("/add", deadline),
         )
 
         if isinstance(response_data, SuccessResponse):
-            return AddResponse(
+            add_response = AddResponse(
                 status=response_data.data["status"],
                 dataset_id=UUID(response_data.data["dataset_id"]),
                 pipeline_run_id=UUID(response_data.data["pipeline_run_id"]),
                 dataset_name=response_data.data["dataset_name"],
             )
+            await self._datasets_changed(
+                [add_response.dataset_id, add_response.dataset_name]
+            )
+            return add_response
         else:
             return AddError(
                 status=response_data.status,
                 error=response_data.error,
             )
 
+    async def add_many(
+        self,
+        data: Iterable[str],
+        dataset_name: str = "main_dataset",
+        dataset_id: Optional[UUID] = None,
+        node_set: Optional[List[str]] = None,
+        max_batch_items: int = 100,
+        max_batch_bytes: int = 4 * 1024 * 1024,
+        concurrency: int = 4,
+    ) -> AddManyResponse:
+        """
+        Adds many documents as a series of `/add` requests.
+
+        Documents are split into batches of at most `max_batch_items` documents
+        and about `max_batch_bytes` of encoded JSON, and up to `concurrency`
+        batches are sent at once. A failed batch doesn't stop the others; a
+        batch that raised is reported with status 0.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        batches = enumerate(batch_text_data(data, max_batch_items, max_batch_bytes))
+        results: Dict[int, Union[AddResponse, AddError]] = {}
+        item_counts: Dict[int, int] = {}
+
+        async def add_batch(batch_index: int, batch: List[str]) -> None:
+            item_counts[batch_index] = len(batch)
+            try:
+                results[batch_index] = await self._send_add(
+                    batch,
+                    dataset_name=dataset_name,
+                    dataset_id=dataset_id,
+                    node_set=node_set,
+                )
+            except Exception as error:
+                results[batch_index] = AddError(
+                    status=0, error=str(error) or type(error).__name__
+                )
+
+        async def add_batches() -> None:
+            for batch_index, batch in batches:
+                await add_batch(batch_index, batch)
+
+        first_batch = next(batches, None)
+        if first_batch is not None:
+            # The first batch goes alone so the rest can target the dataset it
+            # created instead of racing to create it.
+            await add_batch(*first_batch)
+            if dataset_id is None and isinstance(results[0], AddResponse):
+                dataset_id = results[0].dataset_id
+
+            await asyncio.gather(*(add_batches() for _ in range(concurrency)))
+
+        ordered_results = [results[batch_index] for batch_index in sorted(results)]
+
+        return AddManyResponse(
+            results=ordered_results,
+            failures=[
+                AddBatchFailure(
+                    batch_index=batch_index,
+                    item_count=item_counts[batch_index],
+                    status=result.status,
+                    error=result.error,
+                )
+                for batch_index, result in enumerate(ordered_results)
+                if isinstance(result, AddError)
+            ],
+        )
+
     async def cognify(
         self,
         datasets: List[str] = ["main_dataset"],
         dataset_ids: List[UUID] = [],
         temporal_cognify: bool = False,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[CognifyResponse, CognifyError]:
+        """
+        Builds the knowledge graph of the given datasets.
+
+        With `single_flight.cognify` enabled, concurrent calls for the same
+        datasets that don't pass an `idempotency_key` share one request.
+        A caller whose `deadline` passes stops waiting for it, and it is
+        cancelled once no caller is left.
+        """
+        if self.config.single_flight.cognify and idempotency_key is None:
+            return await with_deadline(
+                deadline,
+                self._single_flight.do(
+                    (
+                        "/cognify",
+                        frozenset(datasets),
+                        frozenset(str(dataset_id) for dataset_id in dataset_ids),
+                        temporal_cognify,
+                    ),
+                    lambda: self._send_cognify(datasets, dataset_ids, temporal_cognify),
+                ),
+            )
+
+        return await self._send_cognify(
+            datasets, dataset_ids, temporal_cognify, idempotency_key, deadline=deadline
+        )
+
+    async def _send_cognify(
+        self,
+        datasets: List[str],
+        dataset_ids: List[UUID],
+        temporal_cognify: bool,
+        idempotency_key: Optional[str] = None,
+        run_in_background: bool = False,
+        deadline: Optional[float] = None,
     ) -> Union[CognifyResponse, CognifyError]:
+        payload = {
+            "datasets": datasets,
+            "dataset_ids": dataset_ids,
+            "temporal_cognify": temporal_cognify,
+        }
+        if run_in_background:
+            payload["run_in_background"] = True
+
         response_data = await send_api_request(
             "/cognify",
             "post",
             {
                 "X-Api-Key": self.config.api_key,
                 "Content-Type": "application/json",
+                IDEMPOTENCY_KEY_HEADER: idempotency_key or str(uuid4()),
             },
-            {
-                "datasets": datasets,
-                "dataset_ids": dataset_ids,
-                "temporal_cognify": temporal_cognify,
-            },
+            payload,
+            **self._request_options("/cognify", deadline),
         )
 
         if isinstance(response_data, SuccessResponse):
-            return CognifyResponse(
+            cognify_response = CognifyResponse(
                 {
                     dataset_id: CognifyResult(
                         status=result["status"],
@@ -152,29 +649,94 @@ class cogwit:
                     for dataset_id, result in response_data.data.items()
                 }
             )
+            await self._datasets_changed(
+                [
+                    dataset
+                    for result in cognify_response.root.values()
+                    for dataset in (result.dataset_id, result.dataset_name)
+                ]
+            )
+            return cognify_response
         else:
             return CognifyError(
                 status=response_data.status,
                 error=response_data.error,
             )
 
+    async def start_cognify(
+        self,
+        datasets: List[str] = ["main_dataset"],
+        dataset_ids: List[UUID] = [],
+        temporal_cognify: bool = False,
+        idempotency_key: Optional[str] = None,
+    ) -> Union[List[PipelineRunHandle], CognifyError]:
+        """
+        Starts cognify in the background and returns a handle per dataset,
+        without holding a connection open for the whole pipeline run.
+
+        All handles of a client are polled together, see `pipeline_polling`.
+        """
+        cognify_response = await self._send_cognify(
+            datasets,
+            dataset_ids,
+            temporal_cognify,
+            idempotency_key,
+            run_in_background=True,
+        )
+        if isinstance(cognify_response, CognifyError):
+            return cognify_response
+
+        return self._watch_pipeline_runs(cognify_response.root.values())
+
     async def memify(
-        self, dataset_name: str = "main_dataset"
+        self,
+        dataset_name: str = "main_dataset",
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[MemifyResponse, MemifyError]:
+        return await self._send_memify(dataset_name, idempotency_key, deadline=deadline)
+
+    async def start_memify(
+        self,
+        dataset_name: str = "main_dataset",
+        idempotency_key: Optional[str] = None,
+    ) -> Union[List[PipelineRunHandle], MemifyError]:
+        """Starts memify in the background, like `start_cognify`."""
+        memify_response = await self._send_memify(
+            dataset_name, idempotency_key, run_in_background=True
+        )
+        if isinstance(memify_response, MemifyError):
+            return memify_response
+
+        return self._watch_pipeline_runs(memify_response.root.values())
+
+    async def _send_memify(
+        self,
+        dataset_name: str,
+        idempotency_key: Optional[str] = None,
+        run_in_background: bool = False,
+        deadline: Optional[float] = None,
     ) -> Union[MemifyResponse, MemifyError]:
+        payload: Dict[str, Any] = {
+            "dataset_name": dataset_name,
+        }
+        if run_in_background:
+            payload["run_in_background"] = True
+
         response_data = await send_api_request(
             "/memify",
             "post",
             {
                 "X-Api-Key": self.config.api_key,
                 "Content-Type": "application/json",
+                IDEMPOTENCY_KEY_HEADER: idempotency_key or str(uuid4()),
             },
-            {
-                "dataset_name": dataset_name,
-            },
+            payload,
+            **self._request_options("/memify", deadline),
         )
 
         if isinstance(response_data, SuccessResponse):
-            return MemifyResponse(
+            memify_response = MemifyResponse(
                 {
                     dataset_id: CognifyResult(
                         status=result["status"],
@@ -185,42 +747,383 @@ class cogwit:
                     for dataset_id, result in response_data.data.items()
                 }
             )
+            await self._datasets_changed(
+                [
+                    dataset
+                    for result in memify_response.root.values()
+                    for dataset in (result.dataset_id, result.dataset_name)
+                ]
+            )
+            return memify_response
         else:
             return MemifyError(
                 status=response_data.status,
                 error=response_data.error,
             )
 
+    def _watch_pipeline_runs(
+        self, results: Iterable[CognifyResult]
+    ) -> List[PipelineRunHandle]:
+        return [
+            self._pipeline_poller.watch(
+                result.dataset_id,
+                result.dataset_name,
+                result.pipeline_run_id,
+                result.status,
+            )
+            for result in results
+        ]
+
+    async def _fetch_pipeline_statuses(self, dataset_ids: List[UUID]) -> Dict[str, str]:
+        query = urlencode([("dataset", str(dataset_id)) for dataset_id in dataset_ids])
+        response_data = await send_api_request(
+            f"/datasets/status?{query}",
+            "get",
+            {
+                "X-Api-Key": self.config.api_key,
+                "Content-Type": "application/json",
+            },
+            **self._request_options("/datasets/status"),
+        )
+
+        if isinstance(response_data, ErrorResponse):
+            raise PipelineStatusError(response_data.status, response_data.error)
+        return response_data.data
+
+    async def _pipeline_run_completed(self, handle: PipelineRunHandle) -> None:
+        await self._datasets_changed([handle.dataset_id, handle.dataset_name])
+
     async def search(
         self,
         query_text: str,
         query_type: SearchType = SearchType.GRAPH_COMPLETION,
         use_combined_context: bool = False,
         save_interaction: bool = False,
+        deadline: Optional[float] = None,
     ) -> Union[SearchResponse, SearchError]:
-        response_data = await send_api_request(
+        """
+        Searches the knowledge graph.
+
+        `deadline` bounds the whole call like in `add`.
+
+        With `search_cache` or `disk_search_cache` enabled, results of searches
+        that don't save the interaction are cached until they expire or one of
+        their datasets is changed through this client. The in-memory cache is
+        checked first, then the similar-query cache, then the disk cache.
+
+        With `single_flight.search` enabled, identical concurrent searches that
+        don't save the interaction share one request.
+
+        With `hedging.search` enabled, a search that doesn't save the
+        interaction and is slower than usual is sent a second time, and the
+        first answer is used.
+        """
+        if save_interaction:
+            return await self._send_search(
+                query_text,
+                query_type,
+                use_combined_context,
+                save_interaction,
+                deadline=deadline,
+            )
+
+        cache_key = search_cache_key(query_text, query_type, use_combined_context)
+
+        if self._search_cache is not None:
+            cached_result = self._search_cache.get(cache_key)
+            if cached_result is not CACHE_MISS:
+                return cached_result
+
+        if self._similar_search_cache is not None:
+            cached_result = self._similar_search_cache.get(
+                query_text, query_type, use_combined_context
+            )
+            if cached_result is not CACHE_MISS:
+                return cached_result
+
+        if self.config.single_flight.search:
+            # The shared request outlives a caller whose deadline passed while
+            # others still wait for it.
+            return await with_deadline(
+                deadline,
+                self._single_flight.do(
+                    ("/search", cache_key),
+                    lambda: self._search_uncached(
+                        cache_key, query_text, query_type, use_combined_context
+                    ),
+                ),
+            )
+
+        return await self._search_uncached(
+            cache_key, query_text, query_type, use_combined_context, deadline
+        )
+
+    async def _search_uncached(
+        self,
+        cache_key: SearchCacheKey,
+        query_text: str,
+        query_type: SearchType,
+        use_combined_context: bool,
+        deadline: Optional[float] = None,
+    ) -> Union[SearchResponse, SearchError]:
+        """Searches past the in-memory cache and stores the result in the caches."""
+        if self._search_cache is not None:
+            cache_generation = self._search_cache.generation
+        if self._similar_search_cache is not None:
+            similar_cache_generation = self._similar_search_cache.generation
+
+        if self._disk_search_cache is not None:
+            encoded_result = await self._disk_search_cache.get(cache_key)
+            if encoded_result is not None:
+                try:
+                    search_result = search_response_adapter.validate_json(
+                        encoded_result
+                    )
+                except ValidationError:
+                    search_result = json_loads(encoded_result)
+                if self._search_cache is not None:
+                    self._search_cache.put(cache_key, search_result, cache_generation)
+                return search_result
+
+        dataset_changes = self._dataset_changes.generation
+        search_result = await self._send_search(
+            query_text, query_type, use_combined_context, False, deadline=deadline
+        )
+        if isinstance(search_result, SearchError):
+            return search_result
+
+        if self._search_cache is not None:
+            self._search_cache.put(cache_key, search_result, cache_generation)
+
+        if self._similar_search_cache is not None:
+            self._similar_search_cache.put(
+                query_text,
+                query_type,
+                use_combined_context,
+                search_result,
+                similar_cache_generation,
+            )
+
+        if self._disk_search_cache is not None:
+            datasets = search_result_datasets(search_result)
+            if not self._dataset_changes.is_stale(datasets, dataset_changes):
+                await self._disk_search_cache.put(
+                    cache_key,
+                    search_response_adapter.dump_json(search_result),
+                    datasets,
+                )
+
+        return search_result
+
+    def search_many(
+        self,
+        queries: Iterable[str],
+        query_type: SearchType = SearchType.GRAPH_COMPLETION,
+        use_combined_context: bool = False,
+        concurrency: int = 8,
+        ordered: bool = True,
+    ) -> SearchManyRun:
+        """
+        Runs many searches with up to `concurrency` in flight.
+
+        Iterate the returned run with `async for` to get a SearchManyItem per
+        query, in input order or, with `ordered=False`, as they complete. A
+        failed query comes back as a SearchError (status 0 if it raised) and
+        doesn't stop the others. Once iteration is done, `run.summary` holds
+        the throughput and latency percentiles.
+
+        Open the client first so all queries share its connection pool.
+        """
+        return SearchManyRun(
+            queries,
+            lambda query_text: self.search(
+                query_text, query_type, use_combined_context
+            ),
+            is_error=lambda result: isinstance(result, SearchError),
+            error_result=lambda error: SearchError(
+                status=0, error=str(error) or type(error).__name__
+            ),
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    async def search_stream(
+        self,
+        query_text: str,
+        query_type: SearchType = SearchType.CHUNKS,
+        save_interaction: bool = False,
+    ) -> AsyncIterator[Union[SearchResult, Any, SearchError]]:
+        """
+        Searches the knowledge graph and yields results as they arrive.
+
+        The response is parsed incrementally, so only one result at a time is
+        held in memory. Results without the `SearchResult` shape are yielded
+        as they are. A failed search yields a single SearchError. Streamed
+        searches bypass the search caches.
+        """
+        async with open_api_stream(
+            "/search",
+            "post",
+            {
+                "X-Api-Key": self.config.api_key,
+                "Content-Type": "application/json",
+            },
+            {
+                "search_type": query_type.value,
+                "query": query_text,
+                "use_combined_context": False,
+                "save_interaction": save_interaction,
+            },
+            **self._stream_options("/search"),
+        ) as response:
+            if isinstance(response, ErrorResponse):
+                yield SearchError(status=response.status, error=response.error)
+                return
+
+            parser = JsonArrayParser()
+            async for chunk in response.content.iter_any():
+                for item in parser.feed(chunk):
+                    yield self._decode_streamed_result(item)
+            parser.close()
+
+    async def stream_completion(
+        self,
+        query_text: str,
+        query_type: SearchType = SearchType.GRAPH_COMPLETION,
+        use_combined_context: bool = False,
+        save_interaction: bool = False,
+    ) -> AsyncIterator[Union[CompletionDelta, SearchResponse, SearchError]]:
+        """
+        Runs a completion search and yields the answer as it is generated.
+
+        Yields a CompletionDelta per answer fragment and then the complete
+        search response, with the same metadata `search` returns. A server
+        that answers with a plain JSON response instead of server-sent events
+        only yields the complete response. A failed search yields a single
+        SearchError.
+
+        Expected events: `delta` (or events without a name) with
+        `{"delta": "..."}` or plain text, `result` with the search response
+        and `error` with `{"status": ..., "error": ...}`. Other events, such
+        as keep-alive pings, are skipped.
+        """
+        async with open_api_stream(
             "/search",
             "post",
             {
                 "X-Api-Key": self.config.api_key,
                 "Content-Type": "application/json",
+                "Accept": "text/event-stream",
             },
             {
                 "search_type": query_type.value,
                 "query": query_text,
                 "use_combined_context": use_combined_context,
                 "save_interaction": save_interaction,
+                "stream": True,
             },
-        )
+            **self._stream_options("/search"),
+        ) as response:
+            if isinstance(response, ErrorResponse):
+                yield SearchError(status=response.status, error=response.error)
+                return
 
-        if isinstance(response_data, SuccessResponse):
+            if response.content_type != "text/event-stream":
+                data = await response.json(loads=json_loads, content_type=None)
+                yield self._decode_search_response(data)
+                return
+
+            parser = ServerSentEventParser()
+            async for chunk in response.content.iter_any():
+                for event in parser.feed(chunk):
+                    item = self._decode_completion_event(event.event, event.data)
+                    if item is not None:
+                        yield item
+            for event in parser.close():
+                item = self._decode_completion_event(event.event, event.data)
+                if item is not None:
+                    yield item
+
+    def _decode_completion_event(
+        self, event: str, data: str
+    ) -> Optional[Union[CompletionDelta, SearchResponse, SearchError]]:
+        if event == "result":
+            return self._decode_search_response(json_loads(data))
+
+        if event == "error":
             try:
-                return CombinedSearchResult(**response_data.data)
-            except (ValueError, TypeError):
-                try:
-                    return [SearchResult(**result) for result in response_data.data]
-                except (ValueError, TypeError):
-                    return response_data.data
+                error = json_loads(data)
+            except ValueError:
+                error = None
+            if not isinstance(error, dict) or "error" not in error:
+                return SearchError(status=0, error=data)
+            return SearchError(status=error.get("status", 0), error=error["error"])
+
+        if event not in ("message", "delta"):
+            return None
+
+        try:
+            delta = json_loads(data)
+        except ValueError:
+            return CompletionDelta(text=data)
+        if isinstance(delta, dict) and "delta" in delta:
+            return CompletionDelta(text=delta["delta"])
+        return CompletionDelta(text=data if not isinstance(delta, str) else delta)
+
+    def _decode_streamed_result(self, item: Any) -> Union[SearchResult, Any]:
+        if isinstance(item, dict) and "search_result" in item:
+            try:
+                return SearchResult.model_validate(item)
+            except ValidationError:
+                pass
+        return item
+
+    def _decode_search_response(self, data: Any) -> SearchResponse:
+        try:
+            return search_response_adapter.validate_python(data)
+        except ValidationError:
+            return data
+
+    async def _send_search(
+        self,
+        query_text: str,
+        query_type: SearchType,
+        use_combined_context: bool,
+        save_interaction: bool,
+        deadline: Optional[float] = None,
+    ) -> Union[SearchResponse, SearchError]:
+        headers = {
+            "X-Api-Key": self.config.api_key,
+            "Content-Type": "application/json",
+        }
+        if save_interaction:
+            headers[IDEMPOTENCY_KEY_HEADER] = str(uuid4())
+
+        def send_request():
+            return send_api_request(
+                "/search",
+                "post",
+                headers,
+                {
+                    "search_type": query_type.value,
+                    "query": query_text,
+                    "use_combined_context": use_combined_context,
+                    "save_interaction": save_interaction,
+                },
+                **self._request_options("/search", deadline),
+            )
+
+        # Saving the interaction writes to the graph, so it's never sent twice.
+        if self._search_hedger is not None and not save_interaction:
+            response_data = await self._search_hedger.run(
+                send_request,
+                is_failure=lambda response: isinstance(response, ErrorResponse),
+            )
+        else:
+            response_data = await send_request()
+
+        if isinstance(response_data, SuccessResponse):
+            return self._decode_search_response(response_data.data)
         else:
             return SearchError(
                 status=response_data.status,
@@ -0,0 +1,150 @@
+import time
+from enum import Enum
+from collections import deque
+from typing import Callable, Deque, Optional, Set, Tuple
+from pydantic import BaseModel
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerConfig(BaseModel):
+    # Endpoints guarded by a circuit breaker, e.g. `{"/add", "/cognify",
+    # "/memify", "/search"}`. Empty leaves every endpoint unguarded.
+    endpoints: Set[str] = set()
+    # Number of recent requests the error and slow rates are taken over.
+    window_size: int = 20
+    # The circuit doesn't open until the window holds this many requests.
+    min_requests: int = 10
+    # Share of failed requests in the window that opens the circuit.
+    failure_rate: float = 0.5
+    # Requests slower than this many seconds count as slow.
+    slow_request_duration: float = 60
+    # Share of slow requests in the window that opens the circuit.
+    slow_request_rate: float = 0.5
+    # Seconds an open circuit fails calls before it lets trial requests in.
+    open_duration: float = 30
+    # Trial requests that must succeed while half-open to close the circuit.
+    half_open_requests: int = 3
+    # Response statuses that count as failures. Other error statuses are the
+    # caller's fault and count as successes.
+    failure_statuses: Set[int] = {429, 500, 502, 503, 504}
+    # Called with the endpoint, the old state and the new state whenever a
+    # circuit changes state.
+    on_state_change: Optional[Callable[[str, CircuitState, CircuitState], None]] = None
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while its endpoint's circuit is open."""
+
+    def __init__(self, api_endpoint: str, retry_after: float):
+        super().__init__(
+            f"Circuit for {api_endpoint} is open, retry in {retry_after:.1f}s."
+        )
+        self.api_endpoint = api_endpoint
+        # Seconds until the circuit lets trial requests in.
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint.
+
+    Closed, it lets every request through and opens once too many of the
+    recent requests failed or were slow. Open, it fails calls with
+    CircuitOpenError for `open_duration`, then turns half-open and lets
+    `half_open_requests` trial requests through: if they all succeed the
+    circuit closes, and the first failure opens it again.
+
+    `before_request` hands out a ticket naming the state the request was
+    admitted in. Outcomes of requests admitted before the last state change,
+    like the slow requests that opened the circuit, are ignored.
+    """
+
+    def __init__(self, api_endpoint: str, config: CircuitBreakerConfig):
+        self.api_endpoint = api_endpoint
+        self.config = config
+        self.state = CircuitState.CLOSED
+        # Bumped on every state change.
+        self._generation = 0
+        self._opened_at = 0.0
+        # (failed, slow) for each recent request.
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=config.window_size)
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+
+    def is_failure_status(self, status: int) -> bool:
+        return status in self.config.failure_statuses
+
+    def before_request(self) -> int:
+        """
+        Admits a request and returns its ticket for `record` or `release`, or
+        raises CircuitOpenError.
+        """
+        if self.state == CircuitState.OPEN:
+            retry_after = self._opened_at + self.config.open_duration - time.monotonic()
+            if retry_after > 0:
+                raise CircuitOpenError(self.api_endpoint, retry_after)
+            self._change_state(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.HALF_OPEN:
+            trials = self._trials_in_flight + self._trial_successes
+            if trials >= self.config.half_open_requests:
+                raise CircuitOpenError(self.api_endpoint, 0)
+            self._trials_in_flight += 1
+
+        return self._generation
+
+    def record(self, ticket: int, latency: float, failed: bool) -> None:
+        """Records the outcome of a request admitted by `before_request`."""
+        if ticket != self._generation:
+            # Admitted before the last state change, so it says nothing
+            # about the current state.
+            return
+
+        slow = latency >= self.config.slow_request_duration
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._trials_in_flight = max(self._trials_in_flight - 1, 0)
+            if failed or slow:
+                self._open()
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.config.half_open_requests:
+                    self._outcomes.clear()
+                    self._change_state(CircuitState.CLOSED)
+            return
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.config.min_requests:
+            return
+
+        requests = len(self._outcomes)
+        failures = sum(failed for failed, _ in self._outcomes)
+        slow_requests = sum(slow for _, slow in self._outcomes)
+        if (
+            failures >= self.config.failure_rate * requests
+            or slow_requests >= self.config.slow_request_rate * requests
+        ):
+            self._open()
+
+    def release(self, ticket: int) -> None:
+        """Forgets a request admitted by `before_request` that was cancelled."""
+        if ticket == self._generation and self.state == CircuitState.HALF_OPEN:
+            self._trials_in_flight = max(self._trials_in_flight - 1, 0)
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._change_state(CircuitState.OPEN)
+
+    def _change_state(self, state: CircuitState) -> None:
+        old_state, self.state = self.state, state
+        self._generation += 1
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+
+        if self.config.on_state_change is not None:
+            self.config.on_state_change(self.api_endpoint, old_state, state)
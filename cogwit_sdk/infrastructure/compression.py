@@ -0,0 +1,78 @@
+import zlib
+from typing import AsyncIterator, Literal, Optional
+from pydantic import BaseModel, field_validator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# aiohttp decodes these response encodings itself.
+AIOHTTP_ACCEPT_ENCODING = "gzip, deflate"
+
+
+class CompressionConfig(BaseModel):
+    # Codec for request bodies, or None to send them uncompressed. zstd needs
+    # the `zstandard` package.
+    request_encoding: Optional[Literal["gzip", "zstd"]] = None
+    # Bodies smaller than this many bytes are sent uncompressed. Streamed
+    # bodies, whose size isn't known up front, are always compressed.
+    min_size: int = 1024
+    gzip_level: int = 6
+    zstd_level: int = 3
+    # Asks for zstd-compressed responses when `zstandard` is installed.
+    accept_zstd: bool = True
+
+    @field_validator("request_encoding")
+    @classmethod
+    def check_codec_available(cls, encoding: Optional[str]) -> Optional[str]:
+        if encoding == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package.")
+        return encoding
+
+
+def accept_encoding(config: CompressionConfig) -> Optional[str]:
+    """The Accept-Encoding header to send, or None to keep aiohttp's default."""
+    if config.accept_zstd and zstandard is not None:
+        return f"zstd, {AIOHTTP_ACCEPT_ENCODING}"
+    return None
+
+
+def should_compress(config: CompressionConfig, body_size: int) -> bool:
+    return config.request_encoding is not None and body_size >= config.min_size
+
+
+def compress_body(config: CompressionConfig, body: bytes) -> bytes:
+    if config.request_encoding == "zstd":
+        return zstandard.ZstdCompressor(level=config.zstd_level).compress(body)
+
+    compressor = gzip_compressor(config)
+    return compressor.compress(body) + compressor.flush()
+
+
+async def compress_stream(
+    config: CompressionConfig, chunks: AsyncIterator[bytes]
+) -> AsyncIterator[bytes]:
+    if config.request_encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=config.zstd_level).compressobj()
+    else:
+        compressor = gzip_compressor(config)
+
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def decompress_body(content_encoding: str, body: bytes) -> bytes:
+    """Decodes response encodings aiohttp leaves alone."""
+    if content_encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+def gzip_compressor(config: CompressionConfig):
+    # wbits=31 writes the gzip header and trailer.
+    return zlib.compressobj(config.gzip_level, wbits=31)
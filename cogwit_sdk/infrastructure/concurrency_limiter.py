@@ -0,0 +1,119 @@
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Optional, Set
+from pydantic import BaseModel
+
+
+class AdaptiveConcurrencyConfig(BaseModel):
+    # Endpoints whose in-flight requests are limited. Empty leaves every
+    # endpoint unbounded.
+    endpoints: Set[str] = set()
+    initial_limit: int = 10
+    min_limit: int = 1
+    max_limit: int = 200
+    # Factor applied to the limit when the server signals overload.
+    backoff_ratio: float = 0.5
+    # Latency above this multiple of the baseline counts as overload.
+    latency_tolerance: float = 2.0
+    # Weight of the newest sample in the smoothed latency.
+    latency_smoothing: float = 0.1
+    overload_statuses: Set[int] = {429, 503}
+
+
+class ConcurrencyStats(BaseModel):
+    limit: int
+    in_flight: int
+    # Smoothed and baseline request latency, in seconds.
+    latency: Optional[float]
+    baseline_latency: Optional[float]
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits in-flight requests to one endpoint with AIMD.
+
+    Every request that completes in time grows the limit by 1 / limit, about
+    one slot per round trip. Throttling statuses, timeouts or a smoothed
+    latency far above the baseline cut it by `backoff_ratio`, at most once
+    per round trip.
+    """
+
+    def __init__(self, config: AdaptiveConcurrencyConfig):
+        self.config = config
+        self.limit = float(config.initial_limit)
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease_at = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def stats(self) -> ConcurrencyStats:
+        return ConcurrencyStats(
+            limit=int(self.limit),
+            in_flight=self.in_flight,
+            latency=self.latency,
+            baseline_latency=self.baseline_latency,
+        )
+
+    def is_overload_status(self, status: int) -> bool:
+        return status in self.config.overload_statuses
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we got cancelled.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(
+        self, latency: Optional[float] = None, overloaded: bool = False
+    ) -> None:
+        """
+        Frees a slot. `latency` is None when the request failed in a way that
+        says nothing about server load.
+        """
+        self.in_flight -= 1
+
+        if overloaded:
+            self._decrease()
+        elif latency is not None:
+            self._record_latency(latency)
+
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _record_latency(self, latency: float) -> None:
+        smoothing = self.config.latency_smoothing
+        if self.latency is None or self.baseline_latency is None:
+            self.latency = self.baseline_latency = latency
+        else:
+            self.latency = (1 - smoothing) * self.latency + smoothing * latency
+            # Creeps up slowly so the baseline follows a lasting shift in latency.
+            self.baseline_latency = min(latency, self.baseline_latency * 1.01)
+
+        if self.latency > self.config.latency_tolerance * self.baseline_latency:
+            self._decrease()
+        else:
+            self.limit = min(self.config.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease_at < (self.latency or 0):
+            return
+
+        self._last_decrease_at = now
+        self.limit = max(self.config.min_limit, self.limit * self.config.backoff_ratio)
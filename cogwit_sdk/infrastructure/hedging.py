@@ -0,0 +1,126 @@
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class HedgingConfig(BaseModel):
+    # Hedges searches that don't save the interaction.
+    search: bool = False
+    # A second request is sent once the first has taken longer than this
+    # percentile of recent request latencies.
+    percentile: float = 95
+    # Number of recent latencies the percentile is taken over.
+    window: int = 1000
+    # No request is hedged until this many latencies have been seen.
+    min_samples: int = 20
+    # Extra requests allowed per request sent, e.g. 0.05 for at most 5% more.
+    budget_ratio: float = 0.05
+    # Unused budget saved up for bursts of slow requests, in requests.
+    max_budget: float = 10
+
+
+class HedgingStats(BaseModel):
+    requests: int
+    hedges: int
+    # Hedges that answered before the request they backed up.
+    hedge_wins: int
+    # Seconds a request currently waits before it is hedged, None while too
+    # few latencies have been seen.
+    delay: Optional[float]
+
+
+class Hedger:
+    """
+    Sends a second, identical request when the first is slower than usual
+    and returns whichever successful answer arrives first, cancelling the
+    other.
+
+    Each request earns `budget_ratio` of a hedge and each hedge spends a
+    whole one, so hedges add at most that fraction of extra load. Only use
+    it for calls that are safe to send twice.
+    """
+
+    def __init__(self, config: HedgingConfig):
+        self.config = config
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._budget = 0.0
+        self._latencies: Deque[float] = deque(maxlen=config.window)
+
+    def stats(self) -> HedgingStats:
+        return HedgingStats(
+            requests=self.requests,
+            hedges=self.hedges,
+            hedge_wins=self.hedge_wins,
+            delay=self.delay(),
+        )
+
+    def delay(self) -> Optional[float]:
+        if len(self._latencies) < max(self.config.min_samples, 1):
+            return None
+
+        latencies = sorted(self._latencies)
+        rank = math.ceil(self.config.percentile / 100 * len(latencies))
+        return latencies[max(rank, 1) - 1]
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        is_failure: Callable[[T], bool] = lambda result: False,
+    ) -> T:
+        """
+        Returns the first answer of `call` that neither raised nor
+        `is_failure`, or the last one to arrive when both requests failed.
+        """
+        self.requests += 1
+        self._budget = min(
+            self._budget + self.config.budget_ratio, self.config.max_budget
+        )
+
+        delay = self.delay()
+        started_at = time.monotonic()
+        primary = asyncio.ensure_future(call())
+        tasks = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                if not done and self._budget >= 1:
+                    self._budget -= 1
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(call()))
+
+            def failed(task: "asyncio.Future[T]") -> bool:
+                return task.exception() is not None or is_failure(task.result())
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # An answer wins unless it failed and the other request may
+                # still succeed.
+                finished = next(
+                    (task for task in tasks if task in done and not failed(task)),
+                    None,
+                )
+                if finished is None and pending:
+                    continue
+                finished = finished or next(task for task in tasks if task in done)
+
+                if finished.exception() is None:
+                    # What the caller waited, not what the winner took alone.
+                    self._latencies.append(time.monotonic() - started_at)
+                if finished is not primary:
+                    self.hedge_wins += 1
+                return finished.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,35 @@
+import aiohttp
+from typing import Optional
+from pydantic import BaseModel
+
+from .request_tracing import create_trace_config
+
+
+class ConnectionPoolConfig(BaseModel):
+    # Maximum number of simultaneous connections, 0 means unlimited.
+    limit: int = 100
+    # Maximum number of simultaneous connections to one host, 0 means unlimited.
+    limit_per_host: int = 0
+    # Seconds a resolved DNS entry is reused, None caches forever.
+    dns_cache_ttl: Optional[int] = 300
+    # Seconds an idle keep-alive connection stays in the pool.
+    keepalive_timeout: float = 30
+
+
+def create_client_session(pool_config: ConnectionPoolConfig) -> aiohttp.ClientSession:
+    """
+    Creates a long-lived session whose connections are reused across requests.
+
+    Its requests can be traced, see `send_api_request`.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_config.limit,
+        limit_per_host=pool_config.limit_per_host,
+        ttl_dns_cache=pool_config.dns_cache_ttl,
+        use_dns_cache=True,
+        keepalive_timeout=pool_config.keepalive_timeout,
+    )
+
+    return aiohttp.ClientSession(
+        connector=connector, trace_configs=[create_trace_config()]
+    )
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Callable
+from pydantic import BaseModel
+
+from .json_encoder import json_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def stdlib_json_dumps(obj: Any) -> bytes:
+    return json.dumps(
+        obj, default=json_encoder, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+# Values the backend can't serialize natively are converted through
+# `json_encoder` while the body is being written, so the payload is walked once.
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+    json_loads: Callable[[Any], Any] = orjson.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=json_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+    json_loads = msgspec.json.decode
+    _json_dumps = msgspec.json.Encoder(
+        enc_hook=json_encoder, decimal_format="number"
+    ).encode
+
+else:
+    JSON_BACKEND = "json"
+    json_loads = json.loads
+    _json_dumps = stdlib_json_dumps
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serializes a request payload straight to JSON bytes."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json(by_alias=True).encode("utf-8")
+
+    return _json_dumps(obj)
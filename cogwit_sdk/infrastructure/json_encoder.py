@@ -76,6 +76,110 @@ def generate_encoders_by_class_tuples(
 encoders_by_class_tuples = generate_encoders_by_class_tuples(ENCODERS_BY_TYPE)
 
 
+JSON_NATIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Encoder resolved for each concrete type seen by the fast path, so the
+# isinstance chain below runs once per type instead of once per value.
+encoders_by_type_cache: Dict[Type[Any], Callable[[Any], Any]] = {}
+
+
+def fast_json_encoder(obj: Any) -> Any:
+    """
+    Same result as `json_encoder(obj)` with default options.
+
+    JSON-native values are returned without walking them element by element,
+    everything else goes through `encoders_by_type_cache`.
+    """
+    obj_type = type(obj)
+    if obj_type in JSON_NATIVE_TYPES:
+        return obj
+    if obj_type is list or obj_type is tuple:
+        return _encode_sequence(obj)
+    if obj_type is dict:
+        return _encode_mapping(obj)
+
+    encoder = encoders_by_type_cache.get(obj_type)
+    if encoder is None:
+        encoder = encoders_by_type_cache[obj_type] = _resolve_encoder(obj_type)
+    return encoder(obj)
+
+
+def _encode_sequence(obj: Any) -> List[Any]:
+    if JSON_NATIVE_TYPES.issuperset(map(type, obj)):
+        return list(obj)
+    return [fast_json_encoder(item) for item in obj]
+
+
+def _encode_iterator(obj: Any) -> List[Any]:
+    return [fast_json_encoder(item) for item in obj]
+
+
+def _encode_mapping(obj: Any) -> Dict[Any, Any]:
+    encoded_dict = {}
+    for key, value in obj.items():
+        if isinstance(key, str) and key.startswith("_sa"):
+            continue
+        if type(key) is not str:
+            key = fast_json_encoder(key)
+        encoded_dict[key] = (
+            value if type(value) in JSON_NATIVE_TYPES else fast_json_encoder(value)
+        )
+    return encoded_dict
+
+
+def _encode_model(obj: BaseModel) -> Any:
+    obj_dict = obj.model_dump(mode="json", by_alias=True)
+    if "__root__" in obj_dict:
+        obj_dict = obj_dict["__root__"]
+    return fast_json_encoder(obj_dict)
+
+
+def _encode_dataclass(obj: Any) -> Any:
+    return fast_json_encoder(dataclasses.asdict(obj))
+
+
+def _encode_object(obj: Any) -> Any:
+    try:
+        data = dict(obj)
+    except Exception as e:
+        errors: List[Exception] = []
+        errors.append(e)
+        try:
+            data = vars(obj)
+        except Exception as e:
+            errors.append(e)
+            raise ValueError(errors) from e
+    return fast_json_encoder(data)
+
+
+def _resolve_encoder(obj_type: Type[Any]) -> Callable[[Any], Any]:
+    # Mirrors the order of checks in `json_encoder`.
+    if issubclass(obj_type, BaseModel):
+        return _encode_model
+    if dataclasses.is_dataclass(obj_type):
+        return _encode_dataclass
+    if issubclass(obj_type, Enum):
+        return ENCODERS_BY_TYPE[Enum]
+    if issubclass(obj_type, PurePath):
+        return str
+    if issubclass(obj_type, (str, int, float, type(None))):
+        return lambda o: o
+    if issubclass(obj_type, PydanticUndefinedType):
+        return lambda o: None
+    if issubclass(obj_type, dict):
+        return _encode_mapping
+    if issubclass(obj_type, GeneratorType):
+        return _encode_iterator
+    if issubclass(obj_type, (list, set, frozenset, tuple, deque)):
+        return _encode_sequence
+    if obj_type in ENCODERS_BY_TYPE:
+        return ENCODERS_BY_TYPE[obj_type]
+    for encoder, classes_tuple in encoders_by_class_tuples.items():
+        if issubclass(obj_type, classes_tuple):
+            return encoder
+    return _encode_object
+
+
 def json_encoder(
     obj: Annotated[
         Any,
@@ -178,6 +282,18 @@ def json_encoder(
     Read more about it in the
     [FastAPI docs for JSON Compatible Encoder](https://fastapi.tiangolo.com/tutorial/encoder/).
     """
+    if (
+        include is None
+        and exclude is None
+        and by_alias
+        and not exclude_unset
+        and not exclude_defaults
+        and not exclude_none
+        and not custom_encoder
+        and sqlalchemy_safe
+    ):
+        return fast_json_encoder(obj)
+
     custom_encoder = custom_encoder or {}
     if custom_encoder:
         if type(obj) in custom_encoder:
@@ -0,0 +1,138 @@
+import re
+from typing import Any, Callable, List, Optional
+
+from .json_backend import json_loads
+
+
+# Characters that change the nesting or string state outside of a string.
+STRUCTURAL_PATTERN = re.compile(rb'["\[\]{},]')
+# Characters that end or escape inside a string.
+STRING_PATTERN = re.compile(rb'["\\]')
+WHITESPACE = b" \t\r\n"
+
+
+class JsonArrayParser:
+    """
+    Incrementally splits a JSON array into its decoded elements.
+
+    Bytes are fed as they arrive, and every element is decoded as soon as
+    its closing delimiter has been seen. Only the element being received is
+    kept in memory, never the whole array.
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any] = json_loads):
+        self._loads = loads
+        self._buffer = bytearray()
+        # Where scanning resumes, and where the current element starts.
+        self._position = 0
+        self._element_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._saw_element = False
+        self._emitted_container = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Consumes the next bytes and returns the elements they completed."""
+        if self.finished:
+            if chunk.strip(WHITESPACE):
+                raise ValueError("Unexpected data after the end of the JSON array.")
+            return []
+
+        self._buffer += chunk
+        elements: List[Any] = []
+
+        if self._element_start is None and not self._start():
+            return elements
+
+        buffer = self._buffer
+        while not self.finished:
+            if self._in_string:
+                match = STRING_PATTERN.search(buffer, self._position)
+                if match is None:
+                    self._position = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character hasn't arrived yet.
+                        self._position = match.start()
+                        break
+                    self._position = match.end() + 1
+                    continue
+                self._in_string = False
+                self._position = match.end()
+                continue
+
+            match = STRUCTURAL_PATTERN.search(buffer, self._position)
+            if match is None:
+                self._position = len(buffer)
+                break
+
+            character = match.group()
+            self._position = match.end()
+
+            if character == b'"':
+                self._in_string = True
+            elif character in b"[{":
+                self._depth += 1
+            elif character in b"]}":
+                self._depth -= 1
+                if self._depth == 1:
+                    # An object or array element is complete at its closing
+                    # bracket, without waiting for the next delimiter.
+                    self._emit(self._position, elements, last=False)
+                    self._element_start = self._position
+                    self._emitted_container = True
+                elif self._depth == 0:
+                    self._emit(match.start(), elements, last=True)
+                    self.finished = True
+            elif self._depth == 1:
+                self._emit(match.start(), elements, last=False)
+                self._element_start = self._position
+
+        if self.finished:
+            if buffer[self._position :].strip(WHITESPACE):
+                raise ValueError("Unexpected data after the end of the JSON array.")
+            buffer.clear()
+        elif self._element_start:
+            # Drops everything before the element being received.
+            del buffer[: self._element_start]
+            self._position -= self._element_start
+            self._element_start = 0
+
+        return elements
+
+    def close(self) -> None:
+        """Raises if the array wasn't complete."""
+        if not self.finished:
+            raise ValueError("The JSON array ended before its closing bracket.")
+
+    def _start(self) -> bool:
+        content = self._buffer.lstrip(WHITESPACE)
+        if not content:
+            self._buffer.clear()
+            return False
+        if content[:1] != b"[":
+            raise ValueError("Expected a JSON array.")
+
+        self._buffer = bytearray(content[1:])
+        self._depth = 1
+        self._position = self._element_start = 0
+        return True
+
+    def _emit(self, end: int, elements: List[Any], last: bool) -> None:
+        element = bytes(self._buffer[self._element_start : end]).strip(WHITESPACE)
+
+        if self._emitted_container:
+            # Delimiter after an element that was already emitted.
+            self._emitted_container = False
+            if element:
+                raise ValueError("Missing comma in JSON array.")
+            return
+
+        if element:
+            elements.append(self._loads(element))
+        elif not last or self._saw_element:
+            raise ValueError("Empty element in JSON array.")
+
+        self._saw_element = True
@@ -0,0 +1,143 @@
+import os
+import time
+import struct
+import asyncio
+import hashlib
+from typing import Dict, Optional, Union
+from pydantic import BaseModel
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RateLimit(BaseModel):
+    # Sustained requests per second.
+    rate: float
+    # Requests that may be sent back to back before the rate applies.
+    burst: int = 1
+
+
+class RateLimitConfig(BaseModel):
+    """
+    Client-side request rate limits, keyed by endpoint, e.g.
+    `{"/search": RateLimit(rate=5, burst=10), "/add": RateLimit(rate=50)}`.
+    """
+
+    limits: Dict[str, RateLimit] = {}
+    # Directory holding bucket state shared by every process using the same
+    # API key. None keeps the buckets inside this process.
+    shared_state_dir: Optional[str] = None
+
+
+class TokenBucket:
+    """
+    Token bucket for one endpoint.
+
+    Every caller reserves a token up front and sleeps until it is due, so
+    waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        self._tokens -= 1
+
+        return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _release(self) -> None:
+        self._tokens += 1
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay <= 0:
+            return
+
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._release()
+            raise
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a small file guarded by an exclusive
+    `flock`, so every process pointing at the same file shares one budget.
+    """
+
+    _state = struct.Struct("dd")
+
+    def __init__(self, path: str, rate: float, capacity: int):
+        if fcntl is None:
+            raise RuntimeError("Shared rate limits require a POSIX platform.")
+
+        super().__init__(rate, capacity)
+        self.path = path
+
+    def _update(self, change: float) -> float:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            state = os.pread(fd, self._state.size, 0)
+
+            if len(state) == self._state.size:
+                tokens, updated_at = self._state.unpack(state)
+                tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            else:
+                tokens = float(self.capacity)
+
+            tokens += change
+            os.pwrite(fd, self._state.pack(tokens, now), 0)
+            return tokens
+        finally:
+            os.close(fd)
+
+    def _reserve(self) -> float:
+        tokens = self._update(-1)
+        return 0 if tokens >= 0 else -tokens / self.rate
+
+    def _release(self) -> None:
+        self._update(1)
+
+    async def acquire(self) -> None:
+        delay = await asyncio.to_thread(self._reserve)
+        if delay <= 0:
+            return
+
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self._release))
+            raise
+
+
+def create_rate_limiters(
+    config: RateLimitConfig, api_key: str
+) -> Dict[str, Union[TokenBucket, SharedTokenBucket]]:
+    rate_limiters: Dict[str, Union[TokenBucket, SharedTokenBucket]] = {}
+
+    for api_endpoint, limit in config.limits.items():
+        if config.shared_state_dir is None:
+            rate_limiters[api_endpoint] = TokenBucket(limit.rate, limit.burst)
+            continue
+
+        bucket_id = hashlib.sha256(f"{api_key}:{api_endpoint}".encode()).hexdigest()
+        rate_limiters[api_endpoint] = SharedTokenBucket(
+            os.path.join(config.shared_state_dir, f"cogwit-{bucket_id[:32]}.bucket"),
+            limit.rate,
+            limit.burst,
+        )
+
+    return rate_limiters
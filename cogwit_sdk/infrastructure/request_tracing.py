@@ -0,0 +1,162 @@
+import time
+import logging
+import aiohttp
+from pydantic import BaseModel
+from typing import Callable, Dict, List, Optional
+
+
+class RequestTiming(BaseModel):
+    api_endpoint: str
+    method: str
+    # 1 for the first attempt, 2 for the first retry, and so on.
+    attempt: int
+    # None when no response arrived.
+    status: Optional[int] = None
+    # Name of the exception the attempt failed with, if any.
+    error: Optional[str] = None
+    # Request body bytes written to the socket, after compression.
+    request_bytes: int = 0
+    # Response body bytes: its Content-Length, or the size read when the
+    # server didn't send one.
+    response_bytes: int = 0
+    reused_connection: bool = False
+    # Unix time the attempt started at.
+    started_at: float
+    # Seconds spent in each phase, None for phases the attempt skipped:
+    # waiting for a free connection in the pool,
+    queued: Optional[float] = None
+    # resolving the host name,
+    dns: Optional[float] = None
+    # opening the connection, TCP and TLS handshakes included,
+    connect: Optional[float] = None
+    # writing the request,
+    send: Optional[float] = None
+    # waiting for the response headers after the request was written,
+    waiting: Optional[float] = None
+    # and reading the response body.
+    download: Optional[float] = None
+    total: float
+
+
+TraceHook = Callable[[RequestTiming], None]
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTrace:
+    """
+    Collects the timings of one attempt, passed to aiohttp as the
+    `trace_request_ctx` of the request.
+    """
+
+    def __init__(self, api_endpoint: str, method: str, attempt: int):
+        self.api_endpoint = api_endpoint
+        self.method = method
+        self.attempt = attempt
+        self.started_at = time.time()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.content_length: Optional[int] = None
+        self.reused_connection = False
+        self._marks: Dict[str, float] = {"start": time.perf_counter()}
+
+    def mark(self, event: str) -> None:
+        self._marks[event] = time.perf_counter()
+
+    def finish(
+        self,
+        hooks: List[TraceHook],
+        status: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Passes the timings to every hook. A hook that raises is logged and
+        skipped, so tracing never changes how a request turns out.
+        """
+        self.mark("finish")
+        dns = self._between("dns_start", "dns_end")
+        connect = self._between("connection_create_start", "connection_create_end")
+        if connect is not None and dns is not None:
+            connect -= dns
+        sent_at = "request_sent" if "request_sent" in self._marks else "headers_sent"
+
+        timing = RequestTiming(
+            api_endpoint=self.api_endpoint,
+            method=self.method,
+            attempt=self.attempt,
+            status=status,
+            error=type(error).__name__ if error is not None else None,
+            request_bytes=self.request_bytes,
+            response_bytes=(
+                self.content_length
+                if self.content_length is not None
+                else self.response_bytes
+            ),
+            reused_connection=self.reused_connection,
+            started_at=self.started_at,
+            queued=self._between("connection_queued_start", "connection_queued_end"),
+            dns=dns,
+            connect=connect,
+            send=self._between("headers_sent", sent_at),
+            waiting=self._between(sent_at, "response_headers"),
+            download=self._between("response_headers", "response_body"),
+            total=self._marks["finish"] - self._marks["start"],
+        )
+        for hook in hooks:
+            try:
+                hook(timing)
+            except Exception:
+                logger.exception("Trace hook %r failed", hook)
+
+    def _between(self, start: str, end: str) -> Optional[float]:
+        if start not in self._marks or end not in self._marks:
+            return None
+        return max(self._marks[end] - self._marks[start], 0.0)
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """
+    TraceConfig feeding the RequestTrace of each request. Requests sent
+    without one are ignored.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def on(signal, event: str):
+        async def handler(session, context, params) -> None:
+            if isinstance(context.trace_request_ctx, RequestTrace):
+                context.trace_request_ctx.mark(event)
+
+        signal.append(handler)
+
+    on(trace_config.on_connection_queued_start, "connection_queued_start")
+    on(trace_config.on_connection_queued_end, "connection_queued_end")
+    on(trace_config.on_connection_create_start, "connection_create_start")
+    on(trace_config.on_connection_create_end, "connection_create_end")
+    on(trace_config.on_dns_resolvehost_start, "dns_start")
+    on(trace_config.on_dns_resolvehost_end, "dns_end")
+    on(trace_config.on_request_headers_sent, "headers_sent")
+
+    async def on_connection_reused(session, context, params) -> None:
+        if isinstance(context.trace_request_ctx, RequestTrace):
+            context.trace_request_ctx.reused_connection = True
+
+    async def on_chunk_sent(session, context, params) -> None:
+        if isinstance(context.trace_request_ctx, RequestTrace):
+            context.trace_request_ctx.request_bytes += len(params.chunk)
+            context.trace_request_ctx.mark("request_sent")
+
+    async def on_response_headers(session, context, params) -> None:
+        if isinstance(context.trace_request_ctx, RequestTrace):
+            context.trace_request_ctx.mark("response_headers")
+            context.trace_request_ctx.content_length = params.response.content_length
+
+    async def on_chunk_received(session, context, params) -> None:
+        if isinstance(context.trace_request_ctx, RequestTrace):
+            context.trace_request_ctx.response_bytes += len(params.chunk)
+            context.trace_request_ctx.mark("response_body")
+
+    trace_config.on_connection_reuseconn.append(on_connection_reused)
+    trace_config.on_request_chunk_sent.append(on_chunk_sent)
+    trace_config.on_request_end.append(on_response_headers)
+    trace_config.on_response_chunk_received.append(on_chunk_received)
+    return trace_config
@@ -0,0 +1,64 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional, Set
+from pydantic import BaseModel
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+class RetryPolicy(BaseModel):
+    # Total number of attempts, including the first one.
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30
+    retry_on_status: Set[int] = {429, 502, 503, 504}
+    respect_retry_after: bool = True
+    # Endpoints that are safe to repeat without an idempotency key. GET
+    # requests are always treated as idempotent.
+    idempotent_endpoints: Set[str] = {"/search"}
+
+    def is_idempotent(
+        self, api_endpoint: str, method: str, headers: Mapping[str, str]
+    ) -> bool:
+        return (
+            method.lower() == "get"
+            or api_endpoint in self.idempotent_endpoints
+            or IDEMPOTENCY_KEY_HEADER in headers
+        )
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Returns how long to wait after the given (1-based) failed attempt.
+
+        Uses the server's Retry-After when present, full jitter otherwise.
+        Either way the delay is capped at `max_delay`, so a far-off
+        Retry-After can't hold the call for hours.
+        """
+        if self.respect_retry_after and retry_after is not None:
+            return min(max(retry_after, 0), self.max_delay)
+
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
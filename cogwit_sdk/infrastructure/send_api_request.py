@@ -1,10 +1,34 @@
 import os
+import time
+import asyncio
 import aiohttp
+from contextlib import AsyncExitStack, asynccontextmanager
+from aiohttp import ClientConnectionError, ClientConnectorError, ContentTypeError
 from pydantic import BaseModel
-from typing import Any, Dict, Generic, Optional, TypeVar, Union
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, TypeVar, Union
 
 
-from .json_encoder import json_encoder
+from .circuit_breaker import CircuitBreaker
+from .compression import (
+    CompressionConfig,
+    accept_encoding,
+    compress_body,
+    compress_stream,
+    decompress_body,
+    should_compress,
+)
+from .concurrency_limiter import AdaptiveConcurrencyLimiter
+from .json_backend import json_dumps, json_loads
+from .rate_limiter import TokenBucket
+from .request_tracing import RequestTrace, TraceHook, create_trace_config
+from .retry_policy import RetryPolicy, parse_retry_after
+from .streaming_body import StreamingBody
+from .timeout_policy import (
+    DeadlineExceeded,
+    EndpointTimeout,
+    fits_before,
+    with_deadline,
+)
 from enum import Enum
 
 
@@ -34,6 +58,8 @@ class SuccessResponse(BaseModel, Generic[DataType]):
 class ErrorResponse(BaseModel):
     status: int
     error: Union[str, Dict[str, Any]]
+    # Seconds the server asked us to wait before retrying, if it said so.
+    retry_after: Optional[float] = None
 
 
 async def send_api_request(
@@ -41,53 +67,459 @@ async def send_api_request(
     method: str,
     headers,
     payload: Optional[Any] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    compression: Optional[CompressionConfig] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    timeout: Optional[EndpointTimeout] = None,
+    deadline: Optional[float] = None,
+    trace_hooks: Optional[List[TraceHook]] = None,
 ) -> Union[SuccessResponse[Any], ErrorResponse]:
-    async with aiohttp.ClientSession() as session:
-        http_method = HttpMethod(method.lower())
-        method_has_payload = http_method.has_payload()
-        method_func = getattr(session, method)
-
-        if method_has_payload:
-            async with method_func(
-                f"{api_base}/api{api_endpoint}",
-                json=json_encoder(payload),
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=120 * 60, sock_connect=30),
-            ) as response:
-                if response.status >= 200 and response.status < 300:
-                    if headers.get("Content-Type", "") == "application/json":
-                        response_data = await response.json()
-                    else:
-                        response_data = await response.text()
-
-                    return SuccessResponse(
-                        status=response.status,
-                        data=response_data,
-                    )
-                else:
-                    return ErrorResponse(
-                        status=response.status,
-                        error=await response.json()
-                        if response.status != 500
-                        else await response.text(),
-                    )
+    """
+    Sends a request, retrying it as `retry_policy` allows.
+
+    `deadline` is a `time.monotonic()` timestamp bounding the whole call:
+    once it passes the call raises DeadlineExceeded, and a retry whose
+    backoff would end past it isn't attempted.
+
+    Every attempt's RequestTiming is passed to `trace_hooks`. The session,
+    if given, must have been created with the request trace config, see
+    `create_client_session`.
+    """
+    send_options = dict(
+        retry_policy=retry_policy,
+        rate_limiter=rate_limiter,
+        concurrency_limiter=concurrency_limiter,
+        compression=compression,
+        circuit_breaker=circuit_breaker,
+        timeout=timeout,
+        deadline=deadline,
+        trace_hooks=trace_hooks,
+    )
+
+    if session is not None:
+        return await _send_with_retries(
+            session, api_endpoint, method, headers, payload, **send_options
+        )
+
+    async with aiohttp.ClientSession(
+        trace_configs=[create_trace_config()] if trace_hooks else None
+    ) as session:
+        return await _send_with_retries(
+            session, api_endpoint, method, headers, payload, **send_options
+        )
+
+
+async def _send_with_retries(
+    session: aiohttp.ClientSession,
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any],
+    retry_policy: Optional[RetryPolicy],
+    rate_limiter: Optional[TokenBucket],
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter],
+    compression: Optional[CompressionConfig] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    timeout: Optional[EndpointTimeout] = None,
+    deadline: Optional[float] = None,
+    trace_hooks: Optional[List[TraceHook]] = None,
+) -> Union[SuccessResponse[Any], ErrorResponse]:
+    retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+    is_idempotent = retry_policy.is_idempotent(api_endpoint, method, headers)
+    max_attempts = retry_policy.max_attempts
+    if isinstance(payload, StreamingBody) and not payload.replayable:
+        max_attempts = 1
+    attempt = 1
+
+    while True:
+        is_last_attempt = attempt >= max_attempts
+
+        if not fits_before(deadline, 0):
+            raise DeadlineExceeded()
+
+        # An open circuit fails right away, even between retries.
+        circuit_ticket = 0
+        if circuit_breaker is not None:
+            circuit_ticket = circuit_breaker.before_request()
+
+        if rate_limiter is not None:
+            try:
+                await with_deadline(deadline, rate_limiter.acquire())
+            except BaseException:
+                if circuit_breaker is not None:
+                    circuit_breaker.release(circuit_ticket)
+                raise
+
+        try:
+            response = await with_deadline(
+                deadline,
+                _send_attempt(
+                    session,
+                    api_endpoint,
+                    method,
+                    headers,
+                    payload,
+                    concurrency_limiter,
+                    compression,
+                    circuit_breaker,
+                    timeout,
+                    attempt,
+                    trace_hooks,
+                    circuit_ticket,
+                ),
+            )
+        except (ClientConnectionError, asyncio.TimeoutError) as error:
+            # A failed connect never reached the server, so it is safe to repeat
+            # even for endpoints that aren't idempotent.
+            can_retry = is_idempotent or isinstance(error, ClientConnectorError)
+            if is_last_attempt or not can_retry or isinstance(error, DeadlineExceeded):
+                raise
+            delay = retry_policy.compute_delay(attempt)
+            if not fits_before(deadline, delay):
+                raise
+        else:
+            if (
+                is_last_attempt
+                or not is_idempotent
+                or not isinstance(response, ErrorResponse)
+                or response.status not in retry_policy.retry_on_status
+            ):
+                return response
+            delay = retry_policy.compute_delay(attempt, response.retry_after)
+            # A retry that can't start before the deadline would only fail.
+            if not fits_before(deadline, delay):
+                return response
+
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _send_attempt(
+    session: aiohttp.ClientSession,
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any],
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter],
+    compression: Optional[CompressionConfig] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    timeout: Optional[EndpointTimeout] = None,
+    attempt: int = 1,
+    trace_hooks: Optional[List[TraceHook]] = None,
+    circuit_ticket: int = 0,
+) -> Union[SuccessResponse[Any], ErrorResponse]:
+    """
+    Sends one attempt, reporting its outcome to the circuit breaker and the
+    trace hooks.
+    """
+    trace = RequestTrace(api_endpoint, method, attempt) if trace_hooks else None
+    send_options = (concurrency_limiter, compression, timeout, trace)
+
+    if circuit_breaker is None and trace is None:
+        return await _send_limited(
+            session, api_endpoint, method, headers, payload, *send_options
+        )
+
+    started_at = time.monotonic()
+    try:
+        response = await _send_limited(
+            session, api_endpoint, method, headers, payload, *send_options
+        )
+    except (ClientConnectionError, asyncio.TimeoutError) as error:
+        if circuit_breaker is not None:
+            circuit_breaker.record(
+                circuit_ticket, time.monotonic() - started_at, failed=True
+            )
+        if trace is not None:
+            trace.finish(trace_hooks, error=error)
+        raise
+    except BaseException as error:
+        if circuit_breaker is not None:
+            circuit_breaker.release(circuit_ticket)
+        if trace is not None:
+            trace.finish(trace_hooks, error=error)
+        raise
+
+    if circuit_breaker is not None:
+        circuit_breaker.record(
+            circuit_ticket,
+            time.monotonic() - started_at,
+            failed=isinstance(response, ErrorResponse)
+            and circuit_breaker.is_failure_status(response.status),
+        )
+    if trace is not None:
+        trace.finish(trace_hooks, status=response.status)
+    return response
+
+
+async def _send_limited(
+    session: aiohttp.ClientSession,
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any],
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter],
+    compression: Optional[CompressionConfig] = None,
+    timeout: Optional[EndpointTimeout] = None,
+    trace: Optional[RequestTrace] = None,
+) -> Union[SuccessResponse[Any], ErrorResponse]:
+    request_options = (compression, timeout, trace)
+
+    if concurrency_limiter is None:
+        return await _send_request(
+            session, api_endpoint, method, headers, payload, *request_options
+        )
+
+    await concurrency_limiter.acquire()
+    started_at = time.monotonic()
+
+    try:
+        response = await _send_request(
+            session, api_endpoint, method, headers, payload, *request_options
+        )
+    except asyncio.TimeoutError:
+        concurrency_limiter.release(time.monotonic() - started_at, overloaded=True)
+        raise
+    except BaseException:
+        concurrency_limiter.release()
+        raise
+
+    concurrency_limiter.release(
+        time.monotonic() - started_at,
+        overloaded=isinstance(response, ErrorResponse)
+        and concurrency_limiter.is_overload_status(response.status),
+    )
+    return response
+
+
+async def _send_request(
+    session: aiohttp.ClientSession,
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any] = None,
+    compression: Optional[CompressionConfig] = None,
+    timeout: Optional[EndpointTimeout] = None,
+    trace: Optional[RequestTrace] = None,
+) -> Union[SuccessResponse[Any], ErrorResponse]:
+    http_method = HttpMethod(method.lower())
+    client_timeout = (timeout or EndpointTimeout()).client_timeout()
+    method_has_payload = http_method.has_payload()
+    method_func = getattr(session, method)
 
+    if compression is not None and accept_encoding(compression) is not None:
+        headers = {"Accept-Encoding": accept_encoding(compression), **headers}
+
+    if method_has_payload:
+        request_headers = {"Content-Type": "application/json", **headers}
+
+        if isinstance(payload, StreamingBody):
+            data = payload.open()
+            if compression is not None and compression.request_encoding is not None:
+                data = compress_stream(compression, data)
+                request_headers["Content-Encoding"] = compression.request_encoding
         else:
-            async with method_func(
-                f"{api_base}/api{api_endpoint}", headers=headers
-            ) as response:
-                if response.status == 200:
-                    if headers.get("Content-Type", "") == "application/json":
-                        response_data = await response.json()
-                    else:
-                        response_data = await response.text()
-
-                    return SuccessResponse(
-                        status=response.status,
-                        data=response_data,
-                    )
+            data = json_dumps(payload)
+            if compression is not None and should_compress(compression, len(data)):
+                data = compress_body(compression, data)
+                request_headers["Content-Encoding"] = compression.request_encoding
+
+        async with method_func(
+            f"{api_base}/api{api_endpoint}",
+            data=data,
+            headers=request_headers,
+            timeout=client_timeout,
+            trace_request_ctx=trace,
+        ) as response:
+            if response.status >= 200 and response.status < 300:
+                if headers.get("Content-Type", "") == "application/json":
+                    response_data = await _read_json(response)
+                else:
+                    response_data = await _read_text(response)
+
+                return SuccessResponse(
+                    status=response.status,
+                    data=response_data,
+                )
+            else:
+                return ErrorResponse(
+                    status=response.status,
+                    error=await _read_error(response)
+                    if response.status != 500
+                    else await _read_text(response),
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+    else:
+        async with method_func(
+            f"{api_base}/api{api_endpoint}",
+            headers=headers,
+            timeout=client_timeout,
+            trace_request_ctx=trace,
+        ) as response:
+            if response.status == 200:
+                if headers.get("Content-Type", "") == "application/json":
+                    response_data = await _read_json(response)
                 else:
-                    return ErrorResponse(
-                        status=response.status,
-                        error=await response.json(),
-                    )
+                    response_data = await _read_text(response)
+
+                return SuccessResponse(
+                    status=response.status,
+                    data=response_data,
+                )
+            else:
+                return ErrorResponse(
+                    status=response.status,
+                    error=await _read_error(response),
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+
+@asynccontextmanager
+async def open_api_stream(
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    timeout: Optional[EndpointTimeout] = None,
+) -> AsyncIterator[Union[aiohttp.ClientResponse, ErrorResponse]]:
+    """
+    Sends a request and yields the response with its body still unread, or
+    an ErrorResponse for non-2xx statuses.
+
+    Streams are never retried, since part of the body may already have been
+    consumed. A concurrency slot is held until the stream is closed. The
+    circuit breaker judges the request by its status and the time to the
+    response headers.
+    """
+    circuit_ticket = 0
+    if circuit_breaker is not None:
+        circuit_ticket = circuit_breaker.before_request()
+    started_at = time.monotonic()
+    recorded = circuit_breaker is None
+
+    try:
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+
+        async with _open_limited_stream(
+            api_endpoint,
+            method,
+            headers,
+            payload,
+            session,
+            concurrency_limiter,
+            timeout,
+        ) as response:
+            if not recorded:
+                recorded = True
+                circuit_breaker.record(
+                    circuit_ticket,
+                    time.monotonic() - started_at,
+                    failed=isinstance(response, ErrorResponse)
+                    and circuit_breaker.is_failure_status(response.status),
+                )
+            yield response
+    except (ClientConnectionError, asyncio.TimeoutError):
+        if not recorded:
+            recorded = True
+            circuit_breaker.record(
+                circuit_ticket, time.monotonic() - started_at, failed=True
+            )
+        raise
+    finally:
+        if not recorded:
+            circuit_breaker.release(circuit_ticket)
+
+
+@asynccontextmanager
+async def _open_limited_stream(
+    api_endpoint,
+    method: str,
+    headers,
+    payload: Optional[Any],
+    session: Optional[aiohttp.ClientSession],
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter],
+    timeout: Optional[EndpointTimeout] = None,
+) -> AsyncIterator[Union[aiohttp.ClientResponse, ErrorResponse]]:
+    async with AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+
+        if concurrency_limiter is not None:
+            await concurrency_limiter.acquire()
+        started_at = time.monotonic()
+        latency: Optional[float] = None
+        overloaded = False
+
+        try:
+            response = await stack.enter_async_context(
+                session.request(
+                    method.upper(),
+                    f"{api_base}/api{api_endpoint}",
+                    data=json_dumps(payload)
+                    if HttpMethod(method.lower()).has_payload()
+                    else None,
+                    headers={"Content-Type": "application/json", **headers},
+                    timeout=(timeout or EndpointTimeout()).client_timeout(),
+                )
+            )
+            latency = time.monotonic() - started_at
+
+            if 200 <= response.status < 300:
+                yield response
+            else:
+                overloaded = (
+                    concurrency_limiter is not None
+                    and concurrency_limiter.is_overload_status(response.status)
+                )
+                yield ErrorResponse(
+                    status=response.status,
+                    error=await _read_error(response),
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+        except asyncio.TimeoutError:
+            overloaded = True
+            raise
+        finally:
+            if concurrency_limiter is not None:
+                concurrency_limiter.release(latency, overloaded=overloaded)
+
+
+async def _read_error(response: aiohttp.ClientResponse) -> Union[str, Dict[str, Any]]:
+    # Proxies in front of the API answer 502/503/504 with plain text or HTML.
+    try:
+        return await _read_json(response)
+    except (ContentTypeError, ValueError):
+        return await _read_text(response)
+
+
+def _undecoded_encoding(response: aiohttp.ClientResponse) -> Optional[str]:
+    content_encoding = response.headers.get("Content-Encoding")
+    if isinstance(content_encoding, str) and content_encoding.lower() == "zstd":
+        return "zstd"
+    return None
+
+
+async def _read_json(response: aiohttp.ClientResponse) -> Any:
+    content_encoding = _undecoded_encoding(response)
+    if content_encoding is None:
+        return await response.json(loads=json_loads)
+
+    return json_loads(decompress_body(content_encoding, await response.read()))
+
+
+async def _read_text(response: aiohttp.ClientResponse) -> str:
+    content_encoding = _undecoded_encoding(response)
+    if content_encoding is None:
+        return await response.text()
+
+    body = decompress_body(content_encoding, await response.read())
+    return body.decode(response.get_encoding())
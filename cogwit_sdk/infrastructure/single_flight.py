@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class SingleFlightConfig(BaseModel):
+    # Identical concurrent searches share one request.
+    search: bool = False
+    # Identical concurrent cognify calls without an idempotency key share one
+    # request.
+    cognify: bool = False
+
+
+class Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.callers = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; callers arriving while it runs
+    wait for the same result.
+
+    A caller that is cancelled stops waiting without affecting the others.
+    The shared call is cancelled only once every caller has given up.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+
+        if flight is None:
+            flight = self._flights[key] = Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.callers += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.callers -= 1
+            if flight.callers == 0 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
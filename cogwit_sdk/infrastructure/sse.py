@@ -0,0 +1,94 @@
+import re
+import codecs
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+LINE_END_PATTERN = re.compile(r"\r\n|\r|\n")
+
+
+class ServerSentEvent(BaseModel):
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+    # Reconnection delay the server asked for, in milliseconds.
+    retry: Optional[int] = None
+
+
+class ServerSentEventParser:
+    """
+    Incrementally parses a `text/event-stream` body into events.
+
+    Follows the WHATWG event stream format: fields up to the first colon,
+    `data` lines joined with newlines, comments and unknown fields ignored,
+    and an event dispatched at every blank line.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        # Text after the last line break, waiting for the rest of its line.
+        self._pending = ""
+        self._event: Optional[str] = None
+        self._data: List[str] = []
+        self._id: Optional[str] = None
+        self._retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[ServerSentEvent]:
+        """Consumes the next bytes and returns the events they completed."""
+        text = self._pending + self._decoder.decode(chunk)
+        lines = LINE_END_PATTERN.split(text)
+        self._pending = lines.pop()
+        if self._pending == "" and text.endswith("\r"):
+            # The "\r" may be the first half of a "\r\n" split across chunks.
+            self._pending = lines.pop() + "\r"
+
+        events: List[ServerSentEvent] = []
+        for line in lines:
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def close(self) -> List[ServerSentEvent]:
+        """
+        Returns the events completed by the end of the stream. An event that
+        wasn't terminated by a blank line is discarded.
+        """
+        events = self.feed(b"\n") if self._pending.endswith("\r") else []
+        self._pending = ""
+        return events
+
+    def _process_line(self, line: str) -> Optional[ServerSentEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "event":
+            self._event = value
+        elif field == "data":
+            self._data.append(value)
+        elif field == "id" and "\0" not in value:
+            self._id = value
+        elif field == "retry" and value.isdigit():
+            self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[ServerSentEvent]:
+        if not self._data:
+            self._event = None
+            return None
+
+        event = ServerSentEvent(
+            event=self._event or "message",
+            data="\n".join(self._data),
+            id=self._id,
+            retry=self._retry,
+        )
+        self._event = None
+        self._data = []
+        return event
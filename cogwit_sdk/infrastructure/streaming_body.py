@@ -0,0 +1,25 @@
+from typing import AsyncIterator, Callable
+
+
+class StreamingBody:
+    """
+    A request body produced while it is sent, with chunked transfer encoding.
+
+    `open_stream` is called for every attempt. Bodies that can't be produced
+    a second time, such as ones read from an async iterator, are marked as
+    not `replayable` and are never retried.
+    """
+
+    def __init__(
+        self, open_stream: Callable[[], AsyncIterator[bytes]], replayable: bool
+    ):
+        self._open_stream = open_stream
+        self.replayable = replayable
+        self._opened = False
+
+    def open(self) -> AsyncIterator[bytes]:
+        if self._opened and not self.replayable:
+            raise RuntimeError("This request body can only be sent once.")
+
+        self._opened = True
+        return self._open_stream()
@@ -0,0 +1,80 @@
+import time
+import asyncio
+import aiohttp
+from pydantic import BaseModel, Field
+from typing import Awaitable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class EndpointTimeout(BaseModel):
+    # Seconds for a whole request, from connecting to reading the last byte
+    # of the response. None never times out.
+    total: Optional[float] = 120 * 60
+    # Seconds to open a connection.
+    connect: Optional[float] = 30
+    # Seconds to wait for the next bytes of the response.
+    read: Optional[float] = None
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            total=self.total, sock_connect=self.connect, sock_read=self.read
+        )
+
+
+class TimeoutPolicy(BaseModel):
+    """
+    Request timeouts, keyed by endpoint, e.g.
+    `{"/search": EndpointTimeout(total=10), "/cognify": EndpointTimeout(total=3600)}`.
+    Endpoints without their own entry use `default`.
+
+    Each attempt gets the full timeout; use a deadline to bound a call
+    including its retries.
+    """
+
+    default: EndpointTimeout = Field(default_factory=EndpointTimeout)
+    endpoints: Dict[str, EndpointTimeout] = {}
+
+    def for_endpoint(self, api_endpoint: str) -> EndpointTimeout:
+        return self.endpoints.get(api_endpoint, self.default)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a call's deadline passes before it completes."""
+
+    def __init__(self):
+        super().__init__("The deadline passed before the call completed.")
+
+
+def deadline_after(seconds: float) -> float:
+    """The deadline `seconds` from now, as a `time.monotonic()` timestamp."""
+    return time.monotonic() + seconds
+
+
+def fits_before(deadline: Optional[float], seconds: float) -> bool:
+    """True when `seconds` from now is still before the deadline."""
+    return deadline is None or time.monotonic() + seconds < deadline
+
+
+async def with_deadline(deadline: Optional[float], awaitable: Awaitable[T]) -> T:
+    """
+    Awaits `awaitable`, cancelling it and raising DeadlineExceeded once the
+    deadline passes.
+    """
+    if deadline is None:
+        return await awaitable
+
+    time_left = deadline - time.monotonic()
+    if time_left <= 0:
+        # Don't leave the coroutine un-awaited.
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded()
+
+    try:
+        return await asyncio.wait_for(awaitable, time_left)
+    except asyncio.TimeoutError:
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded() from None
+        raise
@@ -0,0 +1,103 @@
+import asyncio
+from uuid import UUID
+from pydantic import BaseModel
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class AddCoalescingConfig(BaseModel):
+    enabled: bool = False
+    # Seconds the first document of a batch waits for others to join it.
+    flush_interval: float = 0.005
+    # A batch is sent right away once it holds this many documents.
+    max_batch_items: int = 100
+
+
+BatchKey = Tuple[str, Optional[UUID], Optional[Tuple[str, ...]]]
+
+
+class PendingBatch:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.text_data: List[str] = []
+        self.result: asyncio.Future = loop.create_future()
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class AddCoalescer:
+    """
+    Merges concurrent `add` calls that target the same dataset and node set
+    into one `/add` request, and hands its response to every caller.
+    """
+
+    def __init__(
+        self,
+        config: AddCoalescingConfig,
+        send_batch: Callable[..., Awaitable[Any]],
+    ):
+        self.config = config
+        self._send_batch = send_batch
+        self._pending: Dict[BatchKey, PendingBatch] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def add(
+        self,
+        text_data: List[str],
+        dataset_name: str,
+        dataset_id: Optional[UUID],
+        node_set: Optional[List[str]],
+    ) -> Any:
+        key = (
+            dataset_name,
+            dataset_id,
+            tuple(node_set) if node_set is not None else None,
+        )
+        batch = self._pending.get(key)
+
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self._pending[key] = PendingBatch(loop)
+            batch.flush_handle = loop.call_later(
+                self.config.flush_interval, self._flush, key
+            )
+
+        batch.text_data.extend(text_data)
+        result = batch.result
+
+        if len(batch.text_data) >= self.config.max_batch_items:
+            self._flush(key)
+
+        # A caller that gives up doesn't cancel the request shared with others.
+        return await asyncio.shield(result)
+
+    async def flush(self) -> None:
+        """Sends every pending batch and waits until all batches are answered."""
+        for key in list(self._pending):
+            self._flush(key)
+
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush(self, key: BatchKey) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+
+        task = asyncio.create_task(self._send(key, batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, key: BatchKey, batch: PendingBatch) -> None:
+        dataset_name, dataset_id, node_set = key
+        try:
+            response = await self._send_batch(
+                batch.text_data,
+                dataset_name=dataset_name,
+                dataset_id=dataset_id,
+                node_set=list(node_set) if node_set is not None else None,
+            )
+        except Exception as error:
+            batch.result.set_exception(error)
+        else:
+            batch.result.set_result(response)
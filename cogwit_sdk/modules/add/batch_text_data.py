@@ -0,0 +1,31 @@
+from typing import Iterable, Iterator, List
+
+from cogwit_sdk.infrastructure.json_backend import json_dumps
+
+
+def batch_text_data(
+    text_data: Iterable[str], max_items: int, max_bytes: int
+) -> Iterator[List[str]]:
+    """
+    Lazily splits documents into batches holding at most `max_items` documents
+    and about `max_bytes` of encoded JSON.
+
+    A document that is larger than `max_bytes` on its own gets its own batch.
+    """
+    batch: List[str] = []
+    batch_bytes = 0
+
+    for item in text_data:
+        # Encoded size plus the separating comma.
+        item_bytes = len(json_dumps(item)) + 1
+
+        if batch and (len(batch) >= max_items or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+
+        batch.append(item)
+        batch_bytes += item_bytes
+
+    if batch:
+        yield batch
@@ -0,0 +1,110 @@
+import os
+import json
+import mmap
+import codecs
+import asyncio
+from uuid import UUID
+from typing import AsyncIterable, AsyncIterator, List, Optional, Union
+
+from cogwit_sdk.infrastructure.json_backend import json_dumps
+from cogwit_sdk.infrastructure.streaming_body import StreamingBody
+
+
+# A document to add: text, a file path, raw UTF-8 bytes (including mmap'd
+# files), or an async iterator whose every item is a document.
+AddSource = Union[
+    str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, AsyncIterable[str]
+]
+
+# Bytes read or encoded at a time.
+CHUNK_SIZE = 64 * 1024
+
+
+def is_text_data(data) -> bool:
+    """True when `data` is plain text that can be sent as a regular JSON body."""
+    if isinstance(data, list):
+        return all(isinstance(item, str) for item in data)
+
+    return isinstance(data, str)
+
+
+def stream_add_body(
+    sources: List[AddSource],
+    dataset_name: str,
+    dataset_id: Optional[UUID],
+    node_set: Optional[List[str]],
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamingBody:
+    """
+    Builds an `/add` body that is encoded while it is sent, holding at most
+    `chunk_size` bytes of any document in memory.
+
+    Every source is one entry of `text_data`, except async iterators, which
+    contribute one entry per item. A body with async iterators can't be
+    produced twice, so it won't be retried.
+    """
+    return StreamingBody(
+        lambda: _encode_add_body(
+            sources, dataset_name, dataset_id, node_set, chunk_size
+        ),
+        replayable=not any(isinstance(source, AsyncIterable) for source in sources),
+    )
+
+
+async def _encode_add_body(
+    sources: List[AddSource],
+    dataset_name: str,
+    dataset_id: Optional[UUID],
+    node_set: Optional[List[str]],
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    separator = b""
+    yield b'{"text_data":['
+
+    for source in sources:
+        if isinstance(source, AsyncIterable):
+            async for text in source:
+                yield separator + json_dumps(text)
+                separator = b","
+            continue
+
+        yield separator + b'"'
+        separator = b","
+        async for text in _read_text(source, chunk_size):
+            yield _escape(text)
+        yield b'"'
+
+    # The remaining fields, spliced in after the streamed list.
+    rest = json_dumps(
+        {
+            "dataset_id": dataset_id or "",
+            "dataset_name": dataset_name,
+            "node_set": node_set,
+        }
+    )
+    yield b"]," + rest[1:]
+
+
+def _escape(text: str) -> bytes:
+    return json.dumps(text, ensure_ascii=False)[1:-1].encode("utf-8")
+
+
+async def _read_text(source: AddSource, chunk_size: int) -> AsyncIterator[str]:
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    if isinstance(source, os.PathLike):
+        with open(source, "rb") as file:
+            while chunk := await asyncio.to_thread(file.read, chunk_size):
+                yield decoder.decode(chunk)
+    else:
+        # Slices of a memoryview don't copy, so only the decoded chunk is new.
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield decoder.decode(view[start : start + chunk_size])
+
+    yield decoder.decode(b"", final=True)
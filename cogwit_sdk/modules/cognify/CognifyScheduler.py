@@ -0,0 +1,186 @@
+import time
+import asyncio
+from uuid import UUID
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from cogwit_sdk.cogwit.cogwit import (
+    AddResponse,
+    CognifyError,
+    CognifyResponse,
+    cogwit,
+)
+
+
+class CognifySchedulerConfig(BaseModel):
+    # Seconds without new data after which a dataset is cognified.
+    quiet_period: float = 30.0
+    # Seconds after its first unprocessed add after which a dataset is
+    # cognified even if data keeps arriving.
+    max_staleness: float = 300.0
+    # Seconds before a failed cognify is retried, doubling with every failure
+    # in a row up to `max_retry_delay`.
+    retry_delay: float = 5.0
+    max_retry_delay: float = 300.0
+
+
+class DatasetSchedule:
+    def __init__(self):
+        # Monotonic times of the first and the latest add not yet cognified.
+        self.first_added_at: Optional[float] = None
+        self.last_added_at: Optional[float] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.running: Optional[asyncio.Task] = None
+        # Failed cognify calls in a row, and when the next one may start.
+        self.failures = 0
+        self.retry_at: Optional[float] = None
+
+
+class CognifyScheduler:
+    """
+    Cognifies datasets once their ingestion settles down.
+
+    Datasets that receive data through `add` (or are passed to `notify`) are
+    cognified with one `cognify(dataset_ids=[...])` call per dataset once no
+    data arrived for `quiet_period` seconds, or at the latest `max_staleness`
+    seconds after the first add it hasn't processed. At most one cognify per
+    dataset is in flight; data arriving meanwhile is picked up by the next one.
+    A dataset whose cognify failed stays pending and is retried with backoff.
+    """
+
+    def __init__(self, client: cogwit, config: CognifySchedulerConfig):
+        self.client = client
+        self.config = config
+        self._schedules: Dict[UUID, DatasetSchedule] = {}
+        # Latest cognify outcome per dataset.
+        self.results: Dict[UUID, Union[CognifyResponse, CognifyError]] = {}
+        self._closed = False
+
+    async def add(self, data, **add_options) -> Any:
+        """Calls `cogwit.add` and schedules a cognify of the dataset it added to."""
+        add_response = await self.client.add(data, **add_options)
+        if isinstance(add_response, AddResponse):
+            self.notify(add_response.dataset_id)
+        return add_response
+
+    def notify(self, dataset_id: UUID) -> None:
+        """Records that the dataset got new data."""
+        schedule = self._schedules.setdefault(dataset_id, DatasetSchedule())
+        now = time.monotonic()
+        if schedule.first_added_at is None:
+            schedule.first_added_at = now
+        schedule.last_added_at = now
+
+        if schedule.running is None:
+            self._schedule(dataset_id, schedule)
+
+    def pending(self) -> List[UUID]:
+        """Datasets with data that no successful or running cognify has seen."""
+        return [
+            dataset_id
+            for dataset_id, schedule in self._schedules.items()
+            if schedule.first_added_at is not None
+        ]
+
+    async def flush(self) -> None:
+        """
+        Cognifies every pending dataset right away and waits for all runs.
+
+        A dataset whose cognify fails is tried once per flush and then left
+        to its retry schedule.
+        """
+        started: Set[UUID] = set()
+        while True:
+            for dataset_id, schedule in list(self._schedules.items()):
+                if (
+                    schedule.first_added_at is not None
+                    and schedule.running is None
+                    and not (dataset_id in started and schedule.failures)
+                ):
+                    started.add(dataset_id)
+                    self._start(dataset_id)
+
+            running: Set[asyncio.Task] = {
+                schedule.running
+                for schedule in self._schedules.values()
+                if schedule.running is not None
+            }
+            if not running:
+                return
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancels pending cognify calls without running them."""
+        self._closed = True
+        for schedule in self._schedules.values():
+            if schedule.timer is not None:
+                schedule.timer.cancel()
+            if schedule.running is not None:
+                schedule.running.cancel()
+
+        running = [s.running for s in self._schedules.values() if s.running]
+        await asyncio.gather(*running, return_exceptions=True)
+        self._schedules.clear()
+
+    def _schedule(self, dataset_id: UUID, schedule: DatasetSchedule) -> None:
+        if schedule.timer is not None:
+            schedule.timer.cancel()
+        if self._closed:
+            return
+
+        due_at = min(
+            schedule.last_added_at + self.config.quiet_period,
+            schedule.first_added_at + self.config.max_staleness,
+        )
+        if schedule.retry_at is not None:
+            due_at = max(due_at, schedule.retry_at)
+        schedule.timer = asyncio.get_running_loop().call_later(
+            max(due_at - time.monotonic(), 0), self._start, dataset_id
+        )
+
+    def _start(self, dataset_id: UUID) -> None:
+        schedule = self._schedules[dataset_id]
+        if schedule.timer is not None:
+            schedule.timer.cancel()
+            schedule.timer = None
+
+        added_at = (schedule.first_added_at, schedule.last_added_at)
+        schedule.first_added_at = schedule.last_added_at = None
+        schedule.running = asyncio.create_task(self._cognify(dataset_id, added_at))
+
+    async def _cognify(self, dataset_id: UUID, added_at: Tuple[float, float]) -> None:
+        failed = True
+        try:
+            result = await self.client.cognify(datasets=[], dataset_ids=[dataset_id])
+            self.results[dataset_id] = result
+            failed = isinstance(result, CognifyError)
+        except Exception as error:
+            self.results[dataset_id] = CognifyError(status=0, error=str(error))
+        finally:
+            schedule = self._schedules.get(dataset_id)
+            if schedule is not None:
+                schedule.running = None
+                if failed:
+                    self._retry_later(schedule, added_at)
+                else:
+                    schedule.failures = 0
+                    schedule.retry_at = None
+                if schedule.first_added_at is not None:
+                    self._schedule(dataset_id, schedule)
+
+    def _retry_later(
+        self, schedule: DatasetSchedule, added_at: Tuple[float, float]
+    ) -> None:
+        """Puts back the data a failed cognify didn't process and backs off."""
+        first_added_at, last_added_at = added_at
+        if schedule.first_added_at is not None:
+            first_added_at = min(first_added_at, schedule.first_added_at)
+            last_added_at = max(last_added_at, schedule.last_added_at)
+        schedule.first_added_at = first_added_at
+        schedule.last_added_at = last_added_at
+
+        schedule.failures += 1
+        schedule.retry_at = time.monotonic() + min(
+            self.config.retry_delay * 2 ** (schedule.failures - 1),
+            self.config.max_retry_delay,
+        )
@@ -0,0 +1,258 @@
+import time
+import asyncio
+import logging
+from uuid import UUID
+from pydantic import BaseModel
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+
+class PipelinePollingConfig(BaseModel):
+    # Seconds between status checks of a run right after it starts or changes
+    # status.
+    initial_interval: float = 1.0
+    # Factor applied to a run's interval after every check that shows no change.
+    backoff: float = 1.5
+    max_interval: float = 30.0
+    # Datasets whose status is fetched in a single request.
+    max_batch_size: int = 100
+    # Failed status checks in a row after which a run's waiters get the error.
+    max_failed_polls: int = 10
+    # Failed status responses worth checking again. Any other status, e.g.
+    # 401 or 404, fails the runs right away.
+    retry_on_status: Set[int] = {408, 429, 500, 502, 503, 504}
+
+
+COMPLETED_STATUSES = {"PipelineRunCompleted", "DATASET_PROCESSING_COMPLETED"}
+ERRORED_STATUSES = {"PipelineRunErrored", "DATASET_PROCESSING_ERRORED"}
+FINAL_STATUSES = COMPLETED_STATUSES | ERRORED_STATUSES
+
+# Fetches the current pipeline status of each dataset, keyed by dataset id.
+# Raises PipelineStatusError when the server answers with an error.
+FetchStatuses = Callable[[List[UUID]], Awaitable[Dict[str, str]]]
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStatusError(Exception):
+    """Raised when the status of pipeline runs can't be fetched."""
+
+    def __init__(self, status: int, error: Any):
+        super().__init__(f"Fetching pipeline statuses failed with {status}: {error}")
+        self.status = status
+        self.error = error
+
+
+class PipelineRunHandle:
+    """A pipeline run started in the background, tracked by polling its dataset."""
+
+    def __init__(
+        self,
+        poller: "PipelineRunPoller",
+        dataset_id: UUID,
+        dataset_name: str,
+        pipeline_run_id: UUID,
+        status: str,
+    ):
+        self.dataset_id = dataset_id
+        self.dataset_name = dataset_name
+        self.pipeline_run_id = pipeline_run_id
+        # Last status reported by the server.
+        self.last_status = status
+        self._poller = poller
+        self._done: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._refreshes: List[asyncio.Future] = []
+        self._interval = poller.config.initial_interval
+        self._failed_polls = 0
+        self._next_poll_at = time.monotonic() + self._interval
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.last_status in COMPLETED_STATUSES
+
+    async def wait(self, timeout: Optional[float] = None) -> str:
+        """
+        Waits until the run completes or fails and returns its final status.
+
+        Raises `asyncio.TimeoutError` after `timeout` seconds, leaving the
+        run tracked, `asyncio.CancelledError` if the handle is cancelled, and
+        the status check's error once the run's status can't be fetched.
+        """
+        return await asyncio.wait_for(asyncio.shield(self._done), timeout)
+
+    async def status(self) -> str:
+        """Fetches the run's current status, batched with other due checks."""
+        if self.done:
+            return self.last_status
+
+        return await self._poller.refresh(self)
+
+    def cancel(self) -> None:
+        """
+        Stops tracking the run and cancels everyone waiting on it.
+
+        The pipeline itself keeps running on the server.
+        """
+        self._poller.unwatch(self)
+        self._done.cancel()
+        for refresh in self._refreshes:
+            refresh.cancel()
+        self._refreshes.clear()
+
+    def _fail(self, error: Exception) -> None:
+        self._poller.unwatch(self)
+        for refresh in self._refreshes:
+            if not refresh.done():
+                refresh.set_exception(error)
+        self._refreshes.clear()
+        if not self._done.done():
+            self._done.set_exception(error)
+
+    def _update(self, status: Optional[str], now: float) -> None:
+        changed = status is not None and status != self.last_status
+        if status is not None:
+            self.last_status = status
+
+        for refresh in self._refreshes:
+            if not refresh.done():
+                refresh.set_result(self.last_status)
+        self._refreshes.clear()
+
+        if self.last_status in FINAL_STATUSES:
+            self._poller.unwatch(self)
+            if not self._done.done():
+                self._done.set_result(self.last_status)
+            return
+
+        config = self._poller.config
+        self._interval = (
+            config.initial_interval
+            if changed
+            else min(config.max_interval, self._interval * config.backoff)
+        )
+        self._next_poll_at = now + self._interval
+
+
+class PipelineRunPoller:
+    """
+    Tracks background pipeline runs with a single polling loop.
+
+    Every run is checked on its own schedule, backing off while its status
+    doesn't change, and all runs due at the same time are checked with one
+    status request per `max_batch_size` datasets. The loop only runs while
+    there are runs to track.
+    """
+
+    def __init__(
+        self,
+        config: PipelinePollingConfig,
+        fetch_statuses: FetchStatuses,
+        on_completed: Optional[Callable[[PipelineRunHandle], Awaitable[None]]] = None,
+    ):
+        self.config = config
+        self._fetch_statuses = fetch_statuses
+        # Awaited by the polling loop for every run it sees complete. Errors
+        # it raises are logged, so one failing callback can't stop the loop.
+        self._on_completed = on_completed
+        self._handles: Set[PipelineRunHandle] = set()
+        self._wake_up = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(
+        self,
+        dataset_id: UUID,
+        dataset_name: str,
+        pipeline_run_id: UUID,
+        status: str,
+    ) -> PipelineRunHandle:
+        handle = PipelineRunHandle(
+            self, dataset_id, dataset_name, pipeline_run_id, status
+        )
+        if status in FINAL_STATUSES:
+            handle._done.set_result(status)
+            return handle
+
+        self._handles.add(handle)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return handle
+
+    def unwatch(self, handle: PipelineRunHandle) -> None:
+        self._handles.discard(handle)
+
+    async def refresh(self, handle: PipelineRunHandle) -> str:
+        refresh = asyncio.get_running_loop().create_future()
+        handle._refreshes.append(refresh)
+        handle._next_poll_at = 0
+        self._wake_up.set()
+        return await refresh
+
+    def tracked(self) -> int:
+        return len(self._handles)
+
+    async def close(self) -> None:
+        """Stops polling and cancels every tracked run's waiters."""
+        for handle in list(self._handles):
+            handle.cancel()
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while self._handles:
+            now = time.monotonic()
+            due = [h for h in self._handles if h._next_poll_at <= now]
+
+            if not due:
+                next_poll_at = min(h._next_poll_at for h in self._handles)
+                self._wake_up.clear()
+                try:
+                    await asyncio.wait_for(self._wake_up.wait(), next_poll_at - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for start in range(0, len(due), self.config.max_batch_size):
+                await self._poll(due[start : start + self.config.max_batch_size])
+
+    async def _poll(self, handles: List[PipelineRunHandle]) -> None:
+        dataset_ids = list(dict.fromkeys(handle.dataset_id for handle in handles))
+
+        error: Optional[Exception] = None
+        try:
+            statuses = await self._fetch_statuses(dataset_ids)
+        except Exception as fetch_error:
+            # Treated like an unchanged status, so the runs back off, unless
+            # it won't clear up by checking again.
+            statuses, error = None, fetch_error
+
+        now = time.monotonic()
+        for handle in handles:
+            if handle not in self._handles:
+                continue
+
+            if error is None:
+                handle._failed_polls = 0
+            else:
+                handle._failed_polls += 1
+                if (
+                    isinstance(error, PipelineStatusError)
+                    and error.status not in self.config.retry_on_status
+                ) or handle._failed_polls >= self.config.max_failed_polls:
+                    handle._fail(error)
+                    continue
+
+            handle._update((statuses or {}).get(str(handle.dataset_id)), now)
+            if handle.done and handle.succeeded and self._on_completed is not None:
+                try:
+                    await self._on_completed(handle)
+                except Exception:
+                    logger.exception(
+                        "Completion callback failed for pipeline run %s",
+                        handle.pipeline_run_id,
+                    )
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pydantic import BaseModel
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from .SearchResultCache import SearchCacheKey, SearchCacheStats
+
+
+class DiskSearchCacheConfig(BaseModel):
+    # SQLite file shared by every process that should share cached results.
+    # None disables the disk cache.
+    path: Optional[str] = None
+    max_bytes: int = 256 * 1024 * 1024
+    # Seconds a cached result stays valid.
+    ttl: float = 3600
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_results_accessed_at
+    ON search_results (accessed_at);
+CREATE TABLE IF NOT EXISTS search_result_datasets (
+    dataset TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES search_results (key) ON DELETE CASCADE,
+    PRIMARY KEY (dataset, key)
+);
+CREATE INDEX IF NOT EXISTS search_result_datasets_key
+    ON search_result_datasets (key);
+"""
+
+# Recorded for entries whose result names no dataset, so that any write
+# invalidates them.
+UNSCOPED_DATASET = ""
+
+
+class DiskSearchResultCache:
+    """
+    Search results cached in SQLite, shared across processes and restarts.
+
+    The database runs in WAL mode and hits don't write: when each entry was
+    last read is kept in memory and written along with the next write, so
+    reads never wait for the write lock. Every process sees the others'
+    writes.
+    Results are stored as the JSON the caller encoded them to and handed back
+    as bytes. Least recently read entries are evicted once the stored results
+    exceed `max_bytes`, going by the reads each process has written so far.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        ttl: float,
+        namespace: str = "",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Keeps entries written with different API keys apart.
+        self._namespace = hashlib.sha256(namespace.encode()).hexdigest()[:16]
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        # Read times not yet written to the database, by key.
+        self._reads: Dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    async def get(self, key: SearchCacheKey) -> Optional[bytes]:
+        return await asyncio.to_thread(self._run, self._get, self._key(key))
+
+    async def put(
+        self, key: SearchCacheKey, value: bytes, datasets: FrozenSet[str]
+    ) -> None:
+        await asyncio.to_thread(self._run, self._put, self._key(key), value, datasets)
+
+    async def invalidate_datasets(self, datasets: Iterable[str]) -> None:
+        await asyncio.to_thread(
+            self._run, self._invalidate_datasets, [*datasets, UNSCOPED_DATASET]
+        )
+
+    async def stats(self) -> SearchCacheStats:
+        size = await asyncio.to_thread(self._run, self._count)
+
+        return SearchCacheStats(
+            size=size,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                if self._reads and self._connection_pid == os.getpid():
+                    self._write_reads(self._connection)
+                    self._reads.clear()
+                self._connection.close()
+                self._connection = None
+
+    def _key(self, key: SearchCacheKey) -> str:
+        return f"{self._namespace}:{json.dumps(key)}"
+
+    def _run(self, operation: Callable, *args):
+        with self._lock:
+            return operation(self._connect(), *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), e.g. by preloading
+        # gunicorn workers, so every process opens its own.
+        if self._connection is not None and self._connection_pid == os.getpid():
+            return self._connection
+
+        connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(SCHEMA)
+
+        self._connection = connection
+        self._connection_pid = os.getpid()
+        return connection
+
+    def _get(self, connection: sqlite3.Connection, key: str) -> Optional[bytes]:
+        now = self._clock()
+        row = connection.execute(
+            "SELECT value FROM search_results WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+
+        if row is None:
+            self._misses += 1
+            return None
+
+        self._reads[key] = now
+        self._hits += 1
+        return row[0]
+
+    def _put(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        value: bytes,
+        datasets: FrozenSet[str],
+    ) -> None:
+        now = self._clock()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM search_results WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO search_results VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + self.ttl, now),
+            )
+            connection.executemany(
+                "INSERT INTO search_result_datasets VALUES (?, ?)",
+                [(dataset, key) for dataset in datasets or {UNSCOPED_DATASET}],
+            )
+            expired = connection.execute(
+                "DELETE FROM search_results WHERE expires_at <= ?", (now,)
+            )
+            self._expirations += expired.rowcount
+            self._write_reads(connection)
+            self._evict(connection)
+            connection.execute("COMMIT")
+            self._reads.clear()
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _write_reads(self, connection: sqlite3.Connection) -> None:
+        connection.executemany(
+            "UPDATE search_results SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._reads.items()],
+        )
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (total_size,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM search_results"
+        ).fetchone()
+        excess = total_size - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted_keys = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM search_results ORDER BY accessed_at"
+        ):
+            evicted_keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        connection.executemany("DELETE FROM search_results WHERE key = ?", evicted_keys)
+        self._evictions += len(evicted_keys)
+
+    def _invalidate_datasets(
+        self, connection: sqlite3.Connection, datasets: Iterable[str]
+    ) -> None:
+        datasets = list(datasets)
+        cursor = connection.execute(
+            f"""
+            DELETE FROM search_results WHERE key IN (
+                SELECT key FROM search_result_datasets
+                WHERE dataset IN ({", ".join("?" * len(datasets))})
+            )
+            """,
+            datasets,
+        )
+        self._invalidations += cursor.rowcount
+
+    def _count(self, connection: sqlite3.Connection) -> int:
+        return connection.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
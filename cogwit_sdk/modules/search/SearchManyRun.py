@@ -0,0 +1,177 @@
+import math
+import time
+import asyncio
+from pydantic import BaseModel
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+
+class SearchManyItem(BaseModel):
+    # Position of the query in the input.
+    index: int
+    query_text: str
+    result: Any
+    # Seconds the query took.
+    latency: float
+
+
+class SearchManySummary(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    # Seconds from the first query sent to the last result received.
+    elapsed: float
+    # Queries answered per second.
+    throughput: float
+    # Latency percentiles in seconds, None when no query ran.
+    latency_p50: Optional[float]
+    latency_p90: Optional[float]
+    latency_p99: Optional[float]
+    latency_max: Optional[float]
+
+
+def latency_percentile(sorted_latencies: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of latencies sorted in ascending order."""
+    rank = math.ceil(percentile / 100 * len(sorted_latencies))
+    return sorted_latencies[max(rank, 1) - 1]
+
+
+class SearchManyRun:
+    """
+    Runs many queries with at most `concurrency` in flight and yields a
+    SearchManyItem per query, in input or completion order.
+
+    Queries are pulled from the input lazily. In input order, a slow query
+    holds back the results after it, and at most `4 * concurrency` results
+    are buffered before new queries wait. `summary` is set once every result
+    has been yielded.
+    """
+
+    def __init__(
+        self,
+        queries: Iterable[str],
+        run_query: Callable[[str], Awaitable[Any]],
+        is_error: Callable[[Any], bool],
+        error_result: Callable[[Exception], Any],
+        concurrency: int,
+        ordered: bool,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        self._queries = enumerate(queries)
+        self._run_query = run_query
+        self._is_error = is_error
+        self._error_result = error_result
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._iterator: Optional[AsyncIterator[SearchManyItem]] = None
+        self.summary: Optional[SearchManySummary] = None
+
+    def __aiter__(self) -> AsyncIterator[SearchManyItem]:
+        if self._iterator is None:
+            self._iterator = self._run()
+        return self._iterator
+
+    async def collect(self) -> List[SearchManyItem]:
+        """Runs every query and returns all items."""
+        return [item async for item in self]
+
+    async def _run(self) -> AsyncIterator[SearchManyItem]:
+        # Unordered results wait for the consumer; ordered ones are bounded by
+        # the window.
+        completed: asyncio.Queue = asyncio.Queue(
+            0 if self._ordered else self._concurrency
+        )
+        window = asyncio.Semaphore(4 * self._concurrency) if self._ordered else None
+        started_at = time.monotonic()
+        latencies: List[float] = []
+        failed = 0
+
+        async def run_queries() -> None:
+            while True:
+                if window is not None:
+                    await window.acquire()
+                next_query = next(self._queries, None)
+                if next_query is None:
+                    if window is not None:
+                        window.release()
+                    return
+
+                index, query_text = next_query
+                query_started_at = time.monotonic()
+                try:
+                    result = await self._run_query(query_text)
+                except Exception as error:
+                    result = self._error_result(error)
+                latency = time.monotonic() - query_started_at
+                await completed.put(
+                    SearchManyItem(
+                        index=index,
+                        query_text=query_text,
+                        result=result,
+                        latency=latency,
+                    )
+                )
+
+        async def run_workers() -> None:
+            try:
+                await asyncio.gather(*(run_queries() for _ in range(self._concurrency)))
+            finally:
+                # Never waits: once iteration stops nobody drains the queue.
+                # A full queue is drained before the loop below sees the
+                # workers are done, so the marker isn't needed then.
+                if not completed.full():
+                    completed.put_nowait(None)
+
+        workers = asyncio.create_task(run_workers())
+        pending: Dict[int, SearchManyItem] = {}
+        next_index = 0
+
+        try:
+            while True:
+                if completed.empty() and workers.done():
+                    break
+                item = await completed.get()
+                if item is None:
+                    break
+
+                latencies.append(item.latency)
+                failed += self._is_error(item.result)
+
+                if not self._ordered:
+                    yield item
+                    continue
+
+                pending[item.index] = item
+                while next_index in pending:
+                    window.release()
+                    yield pending.pop(next_index)
+                    next_index += 1
+
+            await workers
+        finally:
+            workers.cancel()
+            await asyncio.gather(workers, return_exceptions=True)
+
+        elapsed = time.monotonic() - started_at
+        latencies.sort()
+        self.summary = SearchManySummary(
+            total=len(latencies),
+            succeeded=len(latencies) - failed,
+            failed=failed,
+            elapsed=elapsed,
+            throughput=len(latencies) / elapsed if elapsed > 0 else 0.0,
+            latency_p50=latency_percentile(latencies, 50) if latencies else None,
+            latency_p90=latency_percentile(latencies, 90) if latencies else None,
+            latency_p99=latency_percentile(latencies, 99) if latencies else None,
+            latency_max=latencies[-1] if latencies else None,
+        )
@@ -0,0 +1,224 @@
+import time
+from collections import OrderedDict
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from .SearchType import SearchType
+
+
+class SearchCacheConfig(BaseModel):
+    enabled: bool = False
+    max_entries: int = 1024
+    # Seconds a cached result stays valid.
+    ttl: float = 300
+
+
+class SearchCacheStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+SearchCacheKey = Tuple[str, str, bool]
+
+CACHE_MISS = object()
+
+
+def search_cache_key(
+    query_text: str, query_type: SearchType, use_combined_context: bool
+) -> SearchCacheKey:
+    return (" ".join(query_text.split()), query_type.value, use_combined_context)
+
+
+def search_result_datasets(result: Any) -> FrozenSet[str]:
+    """Ids and names of the datasets a search result was built from."""
+    datasets: Set[str] = set()
+
+    for dataset in getattr(result, "datasets", None) or []:
+        datasets.update((str(dataset.id), dataset.name))
+
+    if isinstance(result, list):
+        for item in result:
+            if getattr(item, "dataset_id", None) is not None:
+                datasets.add(str(item.dataset_id))
+            if getattr(item, "dataset_name", None) is not None:
+                datasets.add(item.dataset_name)
+
+    return frozenset(datasets)
+
+
+class DatasetInvalidations:
+    """
+    Tracks when each dataset was last invalidated, so a result fetched
+    across an invalidation can be told apart from a fresh one without
+    discarding results built from other datasets.
+    """
+
+    def __init__(self):
+        # Bumped on every invalidation. Read it before sending a search and
+        # pass it to `is_stale` once the result arrives.
+        self.generation = 0
+        self._invalidated_at: Dict[str, int] = {}
+        self._cleared_at = 0
+
+    def invalidate(self, datasets: Iterable[str]) -> None:
+        self.generation += 1
+        for dataset in datasets:
+            self._invalidated_at[dataset] = self.generation
+
+    def invalidate_all(self) -> None:
+        self.generation += 1
+        self._cleared_at = self.generation
+
+    def is_stale(self, datasets: FrozenSet[str], generation: int) -> bool:
+        """
+        True when a result built from `datasets` may predate an invalidation
+        made after `generation`. Results that name no dataset go stale on any
+        invalidation.
+        """
+        if self._cleared_at > generation or not datasets:
+            return self.generation > generation
+
+        return any(
+            self._invalidated_at.get(dataset, 0) > generation for dataset in datasets
+        )
+
+
+class SearchResultCache:
+    """
+    In-memory LRU cache of search results with a TTL.
+
+    Each entry remembers the datasets its result came from, so writes to a
+    dataset drop only the entries built from it. Entries that don't name any
+    dataset are dropped on every write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        on_remove: Optional[Callable[[SearchCacheKey], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        # Called with the key of every entry that leaves the cache, for
+        # indexes kept alongside it.
+        self._on_remove = on_remove
+        # Expiry time, result and the datasets it was built from.
+        self._entries: OrderedDict[
+            SearchCacheKey, Tuple[float, Any, FrozenSet[str]]
+        ] = OrderedDict()
+        self._keys_by_dataset: Dict[str, Set[SearchCacheKey]] = {}
+        self._unscoped_keys: Set[SearchCacheKey] = set()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._dataset_invalidations = DatasetInvalidations()
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every invalidation, see `put`."""
+        return self._dataset_invalidations.generation
+
+    def __contains__(self, key: SearchCacheKey) -> bool:
+        """True while an entry is stored for `key`, even an expired one."""
+        return key in self._entries
+
+    def get(self, key: SearchCacheKey) -> Any:
+        """Returns the cached result, or `CACHE_MISS`."""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self._misses += 1
+            return CACHE_MISS
+
+        expires_at, result, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return CACHE_MISS
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return result
+
+    def put(
+        self, key: SearchCacheKey, result: Any, generation: Optional[int] = None
+    ) -> None:
+        """
+        Stores a result. Passing the `generation` read before the search was
+        sent skips results that may predate a later invalidation of one of
+        their datasets.
+        """
+        datasets = search_result_datasets(result)
+        if generation is not None and self._dataset_invalidations.is_stale(
+            datasets, generation
+        ):
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (self._clock() + self.ttl, result, datasets)
+
+        for dataset in datasets:
+            self._keys_by_dataset.setdefault(dataset, set()).add(key)
+        if not datasets:
+            self._unscoped_keys.add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def invalidate_datasets(self, datasets: Iterable[str]) -> None:
+        """Drops entries built from any of the given dataset ids or names."""
+        datasets = list(datasets)
+        self._dataset_invalidations.invalidate(datasets)
+        keys = set(self._unscoped_keys)
+        for dataset in datasets:
+            keys.update(self._keys_by_dataset.get(dataset, ()))
+
+        for key in keys:
+            self._remove(key)
+        self._invalidations += len(keys)
+
+    def clear(self) -> None:
+        self._dataset_invalidations.invalidate_all()
+        self._invalidations += len(self._entries)
+        if self._on_remove is not None:
+            for key in self._entries:
+                self._on_remove(key)
+        self._entries.clear()
+        self._keys_by_dataset.clear()
+        self._unscoped_keys.clear()
+
+    def stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            size=len(self._entries),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+        )
+
+    def _remove(self, key: SearchCacheKey) -> None:
+        _, _, datasets = self._entries.pop(key)
+
+        for dataset in datasets:
+            keys = self._keys_by_dataset[dataset]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_dataset[dataset]
+        self._unscoped_keys.discard(key)
+
+        if self._on_remove is not None:
+            self._on_remove(key)
@@ -0,0 +1,216 @@
+import re
+import time
+import hashlib
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .SearchResultCache import CACHE_MISS, SearchCacheStats, SearchResultCache
+from .SearchType import SearchType
+
+
+class SimilarSearchCacheConfig(BaseModel):
+    enabled: bool = False
+    # Minimum Jaccard similarity between the normalized words of two queries
+    # for one to reuse the other's result.
+    threshold: float = 0.8
+    max_entries: int = 1024
+    # Seconds a cached result stays valid.
+    ttl: float = 300
+    # LSH layout: `bands` buckets of `rows` MinHash values each. More rows per
+    # band make a bucket match stricter, more bands make it likelier.
+    bands: int = 16
+    rows: int = 4
+
+
+# Words that rarely change what a question asks for.
+STOP_WORDS = frozenset(
+    {"a", "an", "the", "of", "to", "do", "does", "did", "please", "me", "my"}
+)
+
+CONTRACTIONS = {
+    "'s": " is",
+    "'re": " are",
+    "'m": " am",
+    "'ve": " have",
+    "'ll": " will",
+    "'d": " would",
+    "n't": " not",
+}
+
+CONTRACTION_PATTERN = re.compile("|".join(re.escape(c) for c in CONTRACTIONS))
+WORD_PATTERN = re.compile(r"\w+")
+
+# Modulus of the MinHash permutations, a Mersenne prime above 2^32.
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def query_words(query_text: str) -> FrozenSet[str]:
+    """Lowercased words of a query, contractions expanded, stop words dropped."""
+    text = CONTRACTION_PATTERN.sub(
+        lambda match: CONTRACTIONS[match.group()],
+        query_text.lower().replace("’", "'"),
+    )
+    return frozenset(WORD_PATTERN.findall(text)) - STOP_WORDS
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    if not first and not second:
+        return 1.0
+
+    return len(first & second) / len(first | second)
+
+
+class MinHasher:
+    """MinHash signatures of word sets, with deterministic permutations."""
+
+    def __init__(self, num_permutations: int):
+        self._permutations = [
+            (
+                int.from_bytes(
+                    hashlib.blake2b(b"a%d" % i, digest_size=8).digest(), "big"
+                )
+                | 1,
+                int.from_bytes(
+                    hashlib.blake2b(b"b%d" % i, digest_size=8).digest(), "big"
+                ),
+            )
+            for i in range(num_permutations)
+        ]
+
+    def signature(self, words: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(word.encode(), digest_size=8).digest(), "big"
+            )
+            for word in words
+        ] or [0]
+
+        return tuple(
+            min((a * h + b) % MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        )
+
+
+# Query type, combined-context flag and normalized words.
+SimilarSearchKey = Tuple[str, bool, FrozenSet[str]]
+BucketKey = Tuple[str, bool, int, Tuple[int, ...]]
+
+
+class SimilarSearchCache:
+    """
+    In-memory LRU cache of search results looked up by query similarity.
+
+    Results are kept in a SearchResultCache keyed by normalized words, which
+    handles expiry, eviction and invalidation. Alongside it, the word sets
+    are indexed by MinHash signature in LSH buckets, so a lookup only
+    compares the query against entries sharing a bucket with it. A candidate
+    is reused when the Jaccard similarity of the word sets reaches
+    `threshold`. Results are only reused for the same search type and
+    combined-context flag.
+    """
+
+    def __init__(
+        self,
+        config: SimilarSearchCacheConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config
+        self._min_hasher = MinHasher(config.bands * config.rows)
+        self._results = SearchResultCache(
+            config.max_entries, config.ttl, clock, on_remove=self._unindex
+        )
+        self._buckets: Dict[BucketKey, Set[SimilarSearchKey]] = {}
+        self._buckets_by_key: Dict[SimilarSearchKey, List[BucketKey]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every invalidation, see `SearchResultCache.generation`."""
+        return self._results.generation
+
+    def get(
+        self, query_text: str, query_type: SearchType, use_combined_context: bool
+    ) -> Any:
+        """Returns the result cached for the most similar query, or `CACHE_MISS`."""
+        words = query_words(query_text)
+
+        candidates: Set[SimilarSearchKey] = set()
+        for bucket in self._bucket_keys(words, query_type, use_combined_context):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        similar_keys = sorted(
+            (
+                (similarity, key)
+                for key in candidates
+                if (similarity := jaccard(words, key[2])) >= self.config.threshold
+            ),
+            key=lambda candidate: candidate[0],
+            reverse=True,
+        )
+        # The most similar entry may have expired, in which case the
+        # SearchResultCache drops it and the next one is tried.
+        for _, key in similar_keys:
+            result = self._results.get(key)
+            if result is not CACHE_MISS:
+                self._hits += 1
+                return result
+
+        self._misses += 1
+        return CACHE_MISS
+
+    def put(
+        self,
+        query_text: str,
+        query_type: SearchType,
+        use_combined_context: bool,
+        result: Any,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Stores a result. Passing the `generation` read before the search was
+        sent skips results that may predate a later invalidation of one of
+        their datasets.
+        """
+        words = query_words(query_text)
+        key = (query_type.value, use_combined_context, words)
+        self._results.put(key, result, generation)
+
+        if key in self._results and key not in self._buckets_by_key:
+            buckets = self._bucket_keys(words, query_type, use_combined_context)
+            self._buckets_by_key[key] = buckets
+            for bucket in buckets:
+                self._buckets.setdefault(bucket, set()).add(key)
+
+    def invalidate_datasets(self, datasets: Iterable[str]) -> None:
+        """Drops entries built from any of the given dataset ids or names."""
+        self._results.invalidate_datasets(datasets)
+
+    def stats(self) -> SearchCacheStats:
+        # Lookups try several entries, so hits and misses are counted here.
+        return self._results.stats().model_copy(
+            update={"hits": self._hits, "misses": self._misses}
+        )
+
+    def _bucket_keys(
+        self, words: FrozenSet[str], query_type: SearchType, use_combined_context: bool
+    ) -> List[BucketKey]:
+        signature = self._min_hasher.signature(words)
+        rows = self.config.rows
+
+        return [
+            (
+                query_type.value,
+                use_combined_context,
+                band,
+                signature[band * rows : (band + 1) * rows],
+            )
+            for band in range(self.config.bands)
+        ]
+
+    def _unindex(self, key: SimilarSearchKey) -> None:
+        for bucket in self._buckets_by_key.pop(key, ()):
+            keys = self._buckets[bucket]
+            keys.discard(key)
+            if not keys:
+                del self._buckets[bucket]
@@ -1,6 +1,8 @@
 from .cogwit.cogwit import (
     AddResponse,  # noqa: F401
+    AddManyResponse,  # noqa: F401
     CognifyResponse,  # noqa: F401
+    CompletionDelta,  # noqa: F401
     SearchResponse,  # noqa: F401
     CombinedSearchResult,  # noqa: F401
     SearchResult,  # noqa: F401
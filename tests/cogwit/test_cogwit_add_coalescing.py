@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from cogwit_sdk.cogwit.cogwit import AddResponse, CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from cogwit_sdk.modules.add.AddCoalescer import AddCoalescingConfig
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+
+def add_response(api_endpoint, method, headers, payload, **kwargs):
+    return SuccessResponse(
+        status=200,
+        data={
+            "status": "PipelineRunCompleted",
+            "dataset_id": str(uuid4()),
+            "pipeline_run_id": str(uuid4()),
+            "dataset_name": payload["dataset_name"],
+        },
+    )
+
+
+def make_client(**coalescing):
+    return cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            add_coalescing=AddCoalescingConfig(enabled=True, **coalescing),
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_share_one_request():
+    cogwit_instance = make_client(flush_interval=0.01)
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        results = await asyncio.gather(
+            cogwit_instance.add("first", dataset_name="docs"),
+            cogwit_instance.add(["second", "third"], dataset_name="docs"),
+            cogwit_instance.add("other", dataset_name="notes"),
+        )
+
+    assert mock_send_api_request.call_count == 2
+    payloads = {
+        call.args[3]["dataset_name"]: call.args[3]["text_data"]
+        for call in mock_send_api_request.call_args_list
+    }
+    assert payloads == {"docs": ["first", "second", "third"], "notes": ["other"]}
+
+    assert all(isinstance(result, AddResponse) for result in results)
+    assert results[0] is results[1]
+    assert results[0] is not results[2]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_interval():
+    cogwit_instance = make_client(flush_interval=60, max_batch_items=2)
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.wait_for(
+            asyncio.gather(cogwit_instance.add("a"), cogwit_instance.add("b")),
+            timeout=1,
+        )
+
+    assert mock_send_api_request.call_args.args[3]["text_data"] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_different_node_sets_are_not_merged():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.gather(
+            cogwit_instance.add("a", node_set=["x"]),
+            cogwit_instance.add("b", node_set=["y"]),
+            cogwit_instance.add("c"),
+        )
+
+    assert mock_send_api_request.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_adds_with_own_idempotency_key_are_not_merged():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.gather(
+            cogwit_instance.add("a", idempotency_key="first"),
+            cogwit_instance.add("b", idempotency_key="second"),
+        )
+
+    assert mock_send_api_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiting_caller():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(side_effect=ConnectionResetError("reset"))
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        results = await asyncio.gather(
+            cogwit_instance.add("a"),
+            cogwit_instance.add("b"),
+            return_exceptions=True,
+        )
+
+    assert mock_send_api_request.call_count == 1
+    assert all(isinstance(result, ConnectionResetError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request():
+    cogwit_instance = make_client(flush_interval=0.01)
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        cancelled = asyncio.create_task(cogwit_instance.add("a"))
+        kept = asyncio.create_task(cogwit_instance.add("b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert isinstance(await kept, AddResponse)
+
+    assert mock_send_api_request.call_args.args[3]["text_data"] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_pending_batches():
+    cogwit_instance = make_client(flush_interval=60)
+    mock_send_api_request = AsyncMock(side_effect=add_response)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        pending = asyncio.create_task(cogwit_instance.add("a"))
+        await asyncio.sleep(0)
+        await cogwit_instance.aclose()
+
+        assert isinstance(await pending, AddResponse)
@@ -0,0 +1,128 @@
+import asyncio
+import random
+
+import pytest
+from cogwit_sdk.cogwit.cogwit import (
+    AddError,
+    AddManyResponse,
+    AddResponse,
+    CogwitConfig,
+    cogwit,
+)
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse, SuccessResponse
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+class FakeAddApi:
+    def __init__(self, failing_documents=(), raising_documents=()):
+        self.failing_documents = set(failing_documents)
+        self.raising_documents = set(raising_documents)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, api_endpoint, method, headers, payload, **kwargs):
+        self.requests.append(payload)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(random.uniform(0, 0.01))
+        finally:
+            self.in_flight -= 1
+
+        if self.raising_documents & set(payload["text_data"]):
+            raise ConnectionResetError("connection reset")
+
+        if self.failing_documents & set(payload["text_data"]):
+            return ErrorResponse(status=413, error="too large")
+
+        return SuccessResponse(
+            status=200,
+            data={
+                "status": "PipelineRunCompleted",
+                "dataset_id": str(dataset_id),
+                "pipeline_run_id": str(uuid4()),
+                "dataset_name": payload["dataset_name"],
+            },
+        )
+
+
+async def add_many(api, documents, **kwargs):
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", api):
+        return await cogwit_instance.add_many(documents, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_add_many_returns_one_result_per_batch_in_order():
+    api = FakeAddApi()
+    documents = (f"document {i}" for i in range(25))
+
+    result = await add_many(api, documents, max_batch_items=4, concurrency=3)
+
+    assert isinstance(result, AddManyResponse)
+    assert len(result.results) == 7
+    assert all(isinstance(batch, AddResponse) for batch in result.results)
+    assert result.failures == []
+
+    sent_documents = sorted(
+        (document for request in api.requests for document in request["text_data"]),
+        key=lambda document: int(document.split()[1]),
+    )
+    assert sent_documents == [f"document {i}" for i in range(25)]
+    assert api.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_add_many_reuses_dataset_created_by_first_batch():
+    api = FakeAddApi()
+
+    await add_many(api, ["a", "b", "c"], max_batch_items=1, dataset_name="docs")
+
+    assert api.requests[0]["dataset_id"] == ""
+    assert [request["dataset_id"] for request in api.requests[1:]] == [
+        dataset_id,
+        dataset_id,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_add_many_reports_failed_batches_without_stopping():
+    api = FakeAddApi(failing_documents={"c"}, raising_documents={"e"})
+
+    result = await add_many(api, ["a", "b", "c", "d", "e"], max_batch_items=2)
+
+    assert [type(batch) for batch in result.results] == [
+        AddResponse,
+        AddError,
+        AddError,
+    ]
+    assert [
+        (failure.batch_index, failure.item_count, failure.status)
+        for failure in result.failures
+    ] == [(1, 2, 413), (2, 1, 0)]
+    assert result.failures[1].error == "connection reset"
+
+
+@pytest.mark.asyncio
+async def test_add_many_with_no_documents_sends_nothing():
+    api = FakeAddApi()
+
+    result = await add_many(api, [])
+
+    assert result == AddManyResponse(results=[], failures=[])
+    assert api.requests == []
+
+
+@pytest.mark.asyncio
+async def test_add_many_rejects_concurrency_below_one():
+    api = FakeAddApi()
+
+    with pytest.raises(ValueError):
+        await add_many(api, ["one", "two"], concurrency=0)
+
+    assert api.requests == []
@@ -0,0 +1,57 @@
+import pytest
+from cogwit_sdk import CircuitOpenError
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, SearchError, cogwit
+from cogwit_sdk.infrastructure.circuit_breaker import (
+    CircuitBreakerConfig,
+    CircuitState,
+)
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse
+from unittest.mock import AsyncMock, patch
+
+
+@pytest.mark.asyncio
+async def test_each_guarded_endpoint_gets_its_own_circuit():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            circuit_breaker=CircuitBreakerConfig(endpoints={"/add", "/search"}),
+        )
+    )
+    mock_send_api_request = AsyncMock(
+        return_value=ErrorResponse(status=503, error="unavailable")
+    )
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="q")
+
+    options = mock_send_api_request.call_args.kwargs
+    assert options["circuit_breaker"].api_endpoint == "/search"
+    assert cogwit_instance.circuit_states() == {
+        "/add": CircuitState.CLOSED,
+        "/search": CircuitState.CLOSED,
+    }
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_surfaces_as_circuit_open_error():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            circuit_breaker=CircuitBreakerConfig(endpoints={"/search"}),
+        )
+    )
+    mock_send_api_request = AsyncMock(side_effect=CircuitOpenError("/search", 12))
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        with pytest.raises(CircuitOpenError):
+            await cogwit_instance.search(query_text="q")
+
+        items = await cogwit_instance.search_many(["q"]).collect()
+
+    assert items[0].result == SearchError(
+        status=0, error="Circuit for /search is open, retry in 12.0s."
+    )
+
+
+def test_no_circuits_by_default():
+    assert cogwit(CogwitConfig(api_key="dummy")).circuit_states() == {}
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.hedging import HedgingConfig
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from unittest.mock import AsyncMock, patch
+
+
+def make_client(**hedging):
+    return cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            hedging=HedgingConfig(
+                search=True, min_samples=5, budget_ratio=1.0, **hedging
+            ),
+        )
+    )
+
+
+def stalling_api(stall_query):
+    calls = []
+
+    async def send(api_endpoint, method, headers, payload, **kwargs):
+        calls.append(payload["query"])
+        stalls = payload["query"] == stall_query and calls.count(stall_query) == 1
+        await asyncio.sleep(1 if stalls else 0.001)
+        attempt = calls.count(payload["query"])
+        return SuccessResponse(
+            status=200, data=[{"search_result": f"{payload['query']} {attempt}"}]
+        )
+
+    return calls, send
+
+
+@pytest.mark.asyncio
+async def test_slow_search_is_answered_by_the_hedge():
+    cogwit_instance = make_client()
+    calls, send = stalling_api("slow")
+
+    with patch(
+        "cogwit_sdk.cogwit.cogwit.send_api_request", AsyncMock(side_effect=send)
+    ):
+        for _ in range(10):
+            await cogwit_instance.search(query_text="fast")
+        result = await asyncio.wait_for(cogwit_instance.search(query_text="slow"), 0.5)
+
+    assert result == [{"search_result": "slow 2"}]
+    assert calls.count("slow") == 2
+    assert cogwit_instance.hedging_stats().hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_search_saving_the_interaction_is_never_hedged():
+    cogwit_instance = make_client()
+    calls, send = stalling_api("slow")
+
+    with patch(
+        "cogwit_sdk.cogwit.cogwit.send_api_request", AsyncMock(side_effect=send)
+    ):
+        for _ in range(10):
+            await cogwit_instance.search(query_text="fast")
+        hedges = cogwit_instance.hedging_stats().hedges
+        await cogwit_instance.search(query_text="slow", save_interaction=True)
+
+    assert calls.count("slow") == 1
+    assert cogwit_instance.hedging_stats().hedges == hedges
+
+
+def test_hedging_is_off_by_default():
+    assert cogwit(CogwitConfig(api_key="dummy")).hedging_stats() is None
@@ -0,0 +1,141 @@
+from uuid import uuid4
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.cogwit.cogwit import AddResponse, CogwitConfig, CognifyResponse
+from cogwit_sdk.infrastructure.retry_policy import IDEMPOTENCY_KEY_HEADER, RetryPolicy
+
+
+class IdempotentApi:
+    """
+    Stand-in for the API that remembers responses by idempotency key.
+
+    The first response for every key is "lost" behind a 503, like a request
+    that was processed but timed out on the way back.
+    """
+
+    def __init__(self):
+        self.ingested = []
+        self.responses = {}
+        self.keys_seen = []
+
+    async def add(self, request):
+        key = request.headers[IDEMPOTENCY_KEY_HEADER]
+        self.keys_seen.append(key)
+
+        if key in self.responses:
+            return web.json_response(self.responses[key])
+
+        body = await request.json()
+        self.ingested.extend(body["text_data"])
+        self.responses[key] = {
+            "status": "PipelineRunCompleted",
+            "dataset_id": str(uuid4()),
+            "pipeline_run_id": str(uuid4()),
+            "dataset_name": body["dataset_name"],
+        }
+        return web.Response(status=503, text="upstream timeout")
+
+    async def cognify(self, request):
+        key = request.headers[IDEMPOTENCY_KEY_HEADER]
+        self.keys_seen.append(key)
+
+        if key not in self.responses:
+            self.responses[key] = {}
+            return web.Response(status=503, text="upstream timeout")
+
+        return web.json_response(self.responses[key])
+
+    async def search(self, request):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        self.keys_seen.append(key)
+
+        if len(self.keys_seen) == 1:
+            return web.Response(status=504, text="upstream timeout")
+
+        return web.json_response([{"search_result": "answer"}])
+
+
+@pytest.fixture
+def run_client(api_client):
+    def open_client(api):
+        return api_client(
+            CogwitConfig(
+                api_key="dummy",
+                retry_policy=RetryPolicy(base_delay=0.001, max_delay=0.01),
+            ),
+            post={"/add": api.add, "/cognify": api.cognify, "/search": api.search},
+        )
+
+    return open_client
+
+
+@pytest.mark.asyncio
+async def test_retried_add_is_ingested_once(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        result = await client.add(data="Test data", dataset_name="test_dataset")
+
+    assert isinstance(result, AddResponse)
+    assert api.ingested == ["Test data"]
+    assert len(api.keys_seen) == 2
+    assert len(set(api.keys_seen)) == 1
+
+
+@pytest.mark.asyncio
+async def test_each_logical_call_gets_its_own_key(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        await client.add(data="first")
+        await client.add(data="second")
+
+    assert api.ingested == ["first", "second"]
+    assert len(set(api.keys_seen)) == 2
+
+
+@pytest.mark.asyncio
+async def test_caller_supplied_key_is_sent_and_deduplicated(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        await client.add(data="document", idempotency_key="import-42")
+        await client.add(data="document", idempotency_key="import-42")
+
+    assert api.ingested == ["document"]
+    assert set(api.keys_seen) == {"import-42"}
+
+
+@pytest.mark.asyncio
+async def test_cognify_is_retried_with_its_key(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        result = await client.cognify(idempotency_key="cognify-1")
+
+    assert isinstance(result, CognifyResponse)
+    assert api.keys_seen == ["cognify-1", "cognify-1"]
+
+
+@pytest.mark.asyncio
+async def test_search_saving_the_interaction_is_retried_with_one_key(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        await client.search(query_text="q", save_interaction=True)
+
+    assert len(api.keys_seen) == 2
+    assert api.keys_seen[0] is not None
+    assert len(set(api.keys_seen)) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_only_search_is_sent_without_a_key(run_client):
+    api = IdempotentApi()
+
+    async with run_client(api) as client:
+        await client.search(query_text="q")
+
+    assert api.keys_seen == [None, None]
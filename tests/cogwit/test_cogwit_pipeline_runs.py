@@ -0,0 +1,113 @@
+import pytest
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, CognifyError, cogwit
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse, SuccessResponse
+from cogwit_sdk.modules.cognify.PipelineRunPoller import (
+    PipelinePollingConfig,
+    PipelineStatusError,
+)
+from cogwit_sdk.modules.search.SearchResultCache import SearchCacheConfig
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlparse
+from uuid import UUID, uuid4
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+def pipeline_run(status):
+    return {
+        str(dataset_id): {
+            "status": status,
+            "dataset_id": str(dataset_id),
+            "pipeline_run_id": str(uuid4()),
+            "dataset_name": "docs",
+        }
+    }
+
+
+async def fake_api(api_endpoint, method, headers, payload=None, **kwargs):
+    if api_endpoint.startswith("/datasets/status"):
+        dataset_ids = parse_qs(urlparse(api_endpoint).query)["dataset"]
+        return SuccessResponse(
+            status=200,
+            data={dataset: "DATASET_PROCESSING_COMPLETED" for dataset in dataset_ids},
+        )
+
+    if api_endpoint == "/search":
+        return SuccessResponse(
+            status=200,
+            data=[{"search_result": "a", "dataset_id": str(dataset_id)}],
+        )
+
+    return SuccessResponse(status=200, data=pipeline_run("PipelineRunStarted"))
+
+
+def make_client():
+    return cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            search_cache=SearchCacheConfig(enabled=True),
+            pipeline_polling=PipelinePollingConfig(initial_interval=0.01),
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_cognify_returns_handles_polled_until_completed():
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        async with make_client() as cogwit_instance:
+            handles = await cogwit_instance.start_cognify(datasets=["docs"])
+
+            assert [handle.dataset_id for handle in handles] == [dataset_id]
+            assert await handles[0].wait(timeout=1) == "DATASET_PROCESSING_COMPLETED"
+
+    start_call, status_call = mock_send_api_request.call_args_list
+    assert start_call[0][0] == "/cognify"
+    assert start_call[0][3]["run_in_background"] is True
+    assert status_call[0][:2] == (f"/datasets/status?dataset={dataset_id}", "get")
+
+
+@pytest.mark.asyncio
+async def test_completed_background_runs_invalidate_cached_searches():
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        async with make_client() as cogwit_instance:
+            (handle,) = await cogwit_instance.start_memify(dataset_name="docs")
+            await cogwit_instance.search(query_text="query")
+            await handle.wait(timeout=1)
+            await cogwit_instance.search(query_text="query")
+
+    endpoints = [call[0][0] for call in mock_send_api_request.call_args_list]
+    assert endpoints.count("/search") == 2
+
+
+@pytest.mark.asyncio
+async def test_start_cognify_returns_errors_without_handles():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(
+        return_value=ErrorResponse(status=409, error="conflict")
+    )
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        result = await cogwit_instance.start_cognify()
+
+    assert result == CognifyError(status=409, error="conflict")
+
+
+@pytest.mark.asyncio
+async def test_run_fails_when_the_status_endpoint_refuses_the_key():
+    async def refusing_api(api_endpoint, method, headers, payload=None, **kwargs):
+        if api_endpoint.startswith("/datasets/status"):
+            return ErrorResponse(status=401, error={"detail": "Invalid API key"})
+        return await fake_api(api_endpoint, method, headers, payload, **kwargs)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", refusing_api):
+        async with make_client() as cogwit_instance:
+            [handle] = await cogwit_instance.start_cognify(datasets=["docs"])
+
+            with pytest.raises(PipelineStatusError) as error:
+                await handle.wait(timeout=1)
+
+    assert error.value.status == 401
@@ -0,0 +1,156 @@
+import pytest
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, SearchError, cogwit
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse, SuccessResponse
+from cogwit_sdk.modules.search.DiskSearchResultCache import DiskSearchCacheConfig
+from cogwit_sdk.modules.search.SearchResultCache import SearchCacheConfig
+from cogwit_sdk.modules.search.SimilarSearchCache import SimilarSearchCacheConfig
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+async def fake_api(api_endpoint, method, headers, payload, **kwargs):
+    if api_endpoint == "/search":
+        return SuccessResponse(
+            status=200,
+            data=[
+                {
+                    "search_result": payload["query"],
+                    "dataset_id": str(dataset_id),
+                    "dataset_name": "docs",
+                }
+            ],
+        )
+
+    return SuccessResponse(
+        status=200,
+        data={
+            "status": "PipelineRunCompleted",
+            "dataset_id": str(dataset_id),
+            "pipeline_run_id": str(uuid4()),
+            "dataset_name": "docs",
+        },
+    )
+
+
+def make_client():
+    return cogwit(
+        CogwitConfig(api_key="dummy", search_cache=SearchCacheConfig(enabled=True))
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        first = await cogwit_instance.search(query_text="What is in data?")
+        second = await cogwit_instance.search(query_text="What is in  data? ")
+        await cogwit_instance.search(
+            query_text="What is in data?", use_combined_context=True
+        )
+
+    assert first == second
+    assert mock_send_api_request.call_count == 2
+    stats = cogwit_instance.search_cache_stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_add_to_dataset_invalidates_its_cached_searches():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="query")
+        await cogwit_instance.add(data="new document", dataset_name="docs")
+        await cogwit_instance.search(query_text="query")
+
+    assert mock_send_api_request.call_count == 3
+    assert cogwit_instance.search_cache_stats().invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_and_saved_interactions_are_not_cached():
+    cogwit_instance = make_client()
+    mock_send_api_request = AsyncMock(
+        return_value=ErrorResponse(status=503, error="unavailable")
+    )
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        assert isinstance(await cogwit_instance.search(query_text="q"), SearchError)
+        mock_send_api_request.side_effect = fake_api
+        await cogwit_instance.search(query_text="q", save_interaction=True)
+        await cogwit_instance.search(query_text="q", save_interaction=True)
+
+    assert mock_send_api_request.call_count == 3
+    assert cogwit_instance.search_cache_stats().size == 0
+
+
+def test_search_cache_stats_is_none_when_disabled():
+    assert cogwit(CogwitConfig(api_key="dummy")).search_cache_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_is_shared_between_clients(tmp_path):
+    config = CogwitConfig(
+        api_key="dummy",
+        disk_search_cache=DiskSearchCacheConfig(path=str(tmp_path / "cache.db")),
+    )
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        async with cogwit(config) as first_client:
+            first = await first_client.search(query_text="query")
+        async with cogwit(config) as second_client:
+            second = await second_client.search(query_text="query")
+            assert (await second_client.disk_search_cache_stats()).hits == 1
+
+            await second_client.add(data="new document", dataset_name="docs")
+            await second_client.search(query_text="query")
+
+    assert first == second
+    assert mock_send_api_request.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_hands_back_unrecognised_results_untouched(tmp_path):
+    config = CogwitConfig(
+        api_key="dummy",
+        disk_search_cache=DiskSearchCacheConfig(path=str(tmp_path / "cache.db")),
+    )
+    mock_send_api_request = AsyncMock(
+        return_value=SuccessResponse(status=200, data=[{"search_result": "x"}])
+    )
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        async with cogwit(config) as first_client:
+            first = await first_client.search(query_text="query")
+        async with cogwit(config) as second_client:
+            second = await second_client.search(query_text="query")
+
+    assert first == second == [{"search_result": "x"}]
+    assert mock_send_api_request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_queries_are_served_from_similar_cache():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            similar_search_cache=SimilarSearchCacheConfig(enabled=True),
+        )
+    )
+    mock_send_api_request = AsyncMock(side_effect=fake_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        first = await cogwit_instance.search(query_text="What is in data?")
+        second = await cogwit_instance.search(query_text="what's in the data")
+        await cogwit_instance.add(data="new document", dataset_name="docs")
+        await cogwit_instance.search(query_text="what's in the data")
+
+    assert first == second
+    assert mock_send_api_request.call_count == 3
+    assert cogwit_instance.similar_search_cache_stats().hits == 1
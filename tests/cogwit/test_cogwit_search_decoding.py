@@ -0,0 +1,80 @@
+import pytest
+from cogwit_sdk.cogwit.cogwit import (
+    cogwit,
+    CogwitConfig,
+    CombinedSearchResult,
+    SearchResult,
+    search_response_adapter,
+)
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+async def search_with_payload(payload, **kwargs):
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+    mock_send_api_request = AsyncMock()
+    mock_send_api_request.return_value = SuccessResponse(status=200, data=payload)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        return await cogwit_instance.search(query_text="query", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_search_decodes_list_of_search_results():
+    result = await search_with_payload(
+        [
+            {
+                "search_result": [{"text": "chunk"}],
+                "dataset_id": str(dataset_id),
+                "dataset_name": "main_dataset",
+            }
+        ]
+    )
+
+    assert result == [
+        SearchResult(
+            search_result=[{"text": "chunk"}],
+            dataset_id=dataset_id,
+            dataset_name="main_dataset",
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_decodes_combined_search_result():
+    result = await search_with_payload(
+        {
+            "result": "answer",
+            "context": {},
+            "datasets": [{"id": str(dataset_id), "name": "main_dataset"}],
+        },
+        use_combined_context=True,
+    )
+
+    assert isinstance(result, CombinedSearchResult)
+    assert result.datasets[0].id == dataset_id
+
+
+@pytest.mark.asyncio
+async def test_search_returns_raw_data_for_unknown_shapes():
+    assert await search_with_payload(["plain", "strings"]) == ["plain", "strings"]
+    assert await search_with_payload([]) == []
+    assert await search_with_payload({"unexpected": True}) == {"unexpected": True}
+    assert await search_with_payload([{"search_result": 1}, "mixed"]) == [
+        {"search_result": 1},
+        "mixed",
+    ]
+
+
+def test_search_response_adapter_validates_json_bytes():
+    result = search_response_adapter.validate_json(
+        b'[{"search_result": "a", "dataset_id": null, "dataset_name": null}]'
+    )
+
+    assert result == [
+        SearchResult(search_result="a", dataset_id=None, dataset_name=None)
+    ]
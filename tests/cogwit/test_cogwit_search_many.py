@@ -0,0 +1,32 @@
+import pytest
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, SearchError, cogwit
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse, SuccessResponse
+from unittest.mock import AsyncMock, patch
+
+
+async def search_api(api_endpoint, method, headers, payload, **kwargs):
+    if payload["query"] == "bad":
+        return ErrorResponse(status=422, error="Unprocessable")
+    if payload["query"] == "broken":
+        raise RuntimeError("connection reset")
+
+    return SuccessResponse(status=200, data=[{"search_result": payload["query"]}])
+
+
+@pytest.mark.asyncio
+async def test_search_many_returns_a_result_or_error_per_query():
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+    mock_send_api_request = AsyncMock(side_effect=search_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        run = cogwit_instance.search_many(["first", "bad", "broken", "last"])
+        items = [item async for item in run]
+
+    assert [item.query_text for item in items] == ["first", "bad", "broken", "last"]
+    assert items[0].result == [{"search_result": "first"}]
+    assert items[1].result == SearchError(status=422, error="Unprocessable")
+    assert items[2].result == SearchError(status=0, error="connection reset")
+    assert items[3].result == [{"search_result": "last"}]
+    assert run.summary.succeeded == 2
+    assert run.summary.failed == 2
+    assert mock_send_api_request.call_count == 4
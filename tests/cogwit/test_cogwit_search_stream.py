@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.cogwit.cogwit import SearchError, SearchResult
+
+
+class StreamingSearchApi:
+    """Stand-in for /search that sends its results one by one."""
+
+    def __init__(self, results):
+        self.results = results
+        self.sent = 0
+        self.release_rest = asyncio.Event()
+
+    async def search(self, request):
+        body = await request.json()
+        if body["query"] == "fail":
+            return web.json_response({"detail": "Bad query"}, status=422)
+
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b"[")
+        for index, result in enumerate(self.results):
+            if index == 1:
+                await self.release_rest.wait()
+            separator = b"," if index else b""
+            await response.write(separator + json.dumps(result).encode())
+            self.sent += 1
+        await response.write(b"]")
+        await response.write_eof()
+        return response
+
+
+@pytest.mark.asyncio
+async def test_results_are_yielded_before_the_response_is_complete(api_client):
+    api = StreamingSearchApi(
+        [
+            {"search_result": f"chunk {index}", "dataset_id": None, "dataset_name": "d"}
+            for index in range(3)
+        ]
+        + ["raw item"]
+    )
+
+    async with api_client(post={"/search": api.search}) as client:
+        results = client.search_stream(query_text="query")
+
+        first = await results.__anext__()
+        assert first == SearchResult(
+            search_result="chunk 0", dataset_id=None, dataset_name="d"
+        )
+        assert api.sent == 1
+
+        api.release_rest.set()
+        rest = [result async for result in results]
+
+    assert [result.search_result for result in rest[:2]] == ["chunk 1", "chunk 2"]
+    assert rest[2] == "raw item"
+
+
+@pytest.mark.asyncio
+async def test_failed_search_yields_a_search_error(api_client):
+    api = StreamingSearchApi([])
+
+    async with api_client(post={"/search": api.search}) as client:
+        results = [result async for result in client.search_stream(query_text="fail")]
+
+    assert results == [SearchError(status=422, error={"detail": "Bad query"})]
+
+
+@pytest.mark.asyncio
+async def test_results_without_the_search_result_shape_are_yielded_as_is(api_client):
+    api = StreamingSearchApi([{"search_result": "x"}])
+    api.release_rest.set()
+
+    async with api_client(post={"/search": api.search}) as client:
+        results = [result async for result in client.search_stream(query_text="q")]
+
+    assert results == [{"search_result": "x"}]
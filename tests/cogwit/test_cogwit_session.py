@@ -0,0 +1,61 @@
+import pytest
+from cogwit_sdk.cogwit.cogwit import cogwit, CogwitConfig
+from cogwit_sdk.infrastructure.http_session import ConnectionPoolConfig
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from unittest.mock import AsyncMock, patch
+
+
+@pytest.mark.asyncio
+async def test_cogwit_context_manager_owns_pooled_session():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            connection_pool=ConnectionPoolConfig(
+                limit=7, limit_per_host=3, keepalive_timeout=12
+            ),
+        )
+    )
+
+    async with cogwit_instance as client:
+        assert client is cogwit_instance
+        session = cogwit_instance._session
+        assert session is not None
+        assert not session.closed
+        assert session.connector.limit == 7
+        assert session.connector.limit_per_host == 3
+
+    assert session.closed
+    assert cogwit_instance._session is None
+
+
+@pytest.mark.asyncio
+async def test_cogwit_calls_share_one_session():
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+    await cogwit_instance.open()
+
+    mock_send_api_request = AsyncMock()
+    mock_send_api_request.return_value = SuccessResponse(status=200, data=[])
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="first")
+        await cogwit_instance.search(query_text="second")
+
+    sessions = [call.kwargs["session"] for call in mock_send_api_request.call_args_list]
+    assert sessions == [cogwit_instance._session, cogwit_instance._session]
+
+    await cogwit_instance.aclose()
+    await cogwit_instance.aclose()
+    assert cogwit_instance._session is None
+
+
+@pytest.mark.asyncio
+async def test_cogwit_without_open_uses_one_shot_sessions():
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+
+    mock_send_api_request = AsyncMock()
+    mock_send_api_request.return_value = SuccessResponse(status=200, data=[])
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="query")
+
+    assert mock_send_api_request.call_args.kwargs["session"] is None
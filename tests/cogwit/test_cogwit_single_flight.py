@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from cogwit_sdk.infrastructure.single_flight import SingleFlightConfig
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+async def slow_api(api_endpoint, method, headers, payload, **kwargs):
+    await asyncio.sleep(0.01)
+
+    if api_endpoint == "/search":
+        return SuccessResponse(status=200, data=[{"search_result": payload["query"]}])
+
+    return SuccessResponse(
+        status=200,
+        data={
+            str(dataset_id): {
+                "status": "PipelineRunCompleted",
+                "dataset_id": str(dataset_id),
+                "pipeline_run_id": str(uuid4()),
+                "dataset_name": "docs",
+            }
+        },
+    )
+
+
+def make_client(**single_flight):
+    return cogwit(
+        CogwitConfig(api_key="dummy", single_flight=SingleFlightConfig(**single_flight))
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_searches_share_one_request():
+    cogwit_instance = make_client(search=True)
+    mock_send_api_request = AsyncMock(side_effect=slow_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        results = await asyncio.gather(
+            *(cogwit_instance.search(query_text="popular question") for _ in range(20)),
+            cogwit_instance.search(query_text="other question"),
+        )
+
+    assert mock_send_api_request.call_count == 2
+    assert all(result == results[0] for result in results[:20])
+
+
+@pytest.mark.asyncio
+async def test_searches_saving_the_interaction_are_not_shared():
+    cogwit_instance = make_client(search=True)
+    mock_send_api_request = AsyncMock(side_effect=slow_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.gather(
+            cogwit_instance.search(query_text="q", save_interaction=True),
+            cogwit_instance.search(query_text="q", save_interaction=True),
+        )
+
+    assert mock_send_api_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_cognify_calls_share_one_request():
+    cogwit_instance = make_client(cognify=True)
+    mock_send_api_request = AsyncMock(side_effect=slow_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.gather(
+            cogwit_instance.cognify(datasets=["docs", "notes"]),
+            cogwit_instance.cognify(datasets=["notes", "docs"]),
+            cogwit_instance.cognify(datasets=["docs", "notes"], idempotency_key="k"),
+        )
+
+    assert mock_send_api_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_is_disabled_by_default():
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+    mock_send_api_request = AsyncMock(side_effect=slow_api)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await asyncio.gather(
+            cogwit_instance.search(query_text="q"),
+            cogwit_instance.search(query_text="q"),
+        )
+
+    assert mock_send_api_request.call_count == 2
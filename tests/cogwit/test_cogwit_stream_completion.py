@@ -0,0 +1,125 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.cogwit.cogwit import (
+    CombinedSearchResult,
+    CompletionDelta,
+    SearchError,
+    SearchResult,
+)
+
+dataset_id = uuid4()
+
+
+class CompletionApi:
+    """Stand-in for /search that streams the answer as server-sent events."""
+
+    def __init__(self):
+        self.requests = []
+        self.continue_answer = asyncio.Event()
+
+    async def search(self, request):
+        body = await request.json()
+        self.requests.append((dict(request.headers), body))
+
+        if body["query"] == "no streaming":
+            return web.json_response(
+                [
+                    {
+                        "search_result": "whole answer",
+                        "dataset_id": str(dataset_id),
+                        "dataset_name": "geo",
+                    }
+                ]
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        if body["query"] == "fail":
+            await response.write(
+                b'event: error\ndata: {"status": 500, "error": "LLM failed"}\n\n'
+            )
+            return response
+
+        if body["query"] == "fail with text":
+            await response.write(b"event: error\ndata: LLM failed\n\n")
+            return response
+
+        await response.write(
+            b': connected\n\nevent: delta\ndata: {"delta": "Paris "}\n\n'
+        )
+        await self.continue_answer.wait()
+        await response.write(b"event: ping\ndata: {}\n\n")
+        await response.write(b"event: delta\ndata: is the capital\n\n")
+        result = {
+            "result": "Paris is the capital",
+            "context": {},
+            "datasets": [{"id": str(dataset_id), "name": "geo"}],
+        }
+        await response.write(
+            b"event: result\ndata: " + json.dumps(result).encode() + b"\n\n"
+        )
+        return response
+
+
+@pytest.mark.asyncio
+async def test_answer_fragments_arrive_before_the_final_result(api_client):
+    api = CompletionApi()
+
+    async with api_client(post={"/search": api.search}) as client:
+        stream = client.stream_completion(
+            query_text="capital of France?", use_combined_context=True
+        )
+
+        assert await stream.__anext__() == CompletionDelta(text="Paris ")
+        api.continue_answer.set()
+        rest = [item async for item in stream]
+
+    assert rest[0] == CompletionDelta(text="is the capital")
+    assert isinstance(rest[1], CombinedSearchResult)
+    assert rest[1].datasets[0].id == dataset_id
+
+    headers, body = api.requests[0]
+    assert headers["Accept"] == "text/event-stream"
+    assert body["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_plain_json_response_yields_only_the_result(api_client):
+    api = CompletionApi()
+
+    async with api_client(post={"/search": api.search}) as client:
+        items = [item async for item in client.stream_completion("no streaming")]
+
+    assert items == [
+        [
+            SearchResult(
+                search_result="whole answer", dataset_id=dataset_id, dataset_name="geo"
+            )
+        ]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_error_event_yields_a_search_error(api_client):
+    api = CompletionApi()
+
+    async with api_client(post={"/search": api.search}) as client:
+        items = [item async for item in client.stream_completion("fail")]
+
+    assert items == [SearchError(status=500, error="LLM failed")]
+
+
+@pytest.mark.asyncio
+async def test_error_event_that_is_not_json_yields_a_search_error(api_client):
+    api = CompletionApi()
+
+    async with api_client(post={"/search": api.search}) as client:
+        items = [item async for item in client.stream_completion("fail with text")]
+
+    assert items == [SearchError(status=0, error="LLM failed")]
@@ -0,0 +1,73 @@
+from uuid import uuid4
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.cogwit.cogwit import AddError, AddResponse, CogwitConfig
+from cogwit_sdk.infrastructure.retry_policy import RetryPolicy
+
+
+class StreamingAddApi:
+    """Stand-in for /add that fails the first request with a 503."""
+
+    def __init__(self):
+        self.bodies = []
+        self.chunked = []
+
+    async def add(self, request):
+        self.chunked.append(request.headers.get("Transfer-Encoding") == "chunked")
+        body = await request.json()
+        self.bodies.append(body)
+
+        if len(self.bodies) == 1:
+            return web.Response(status=503, text="try again")
+
+        return web.json_response(
+            {
+                "status": "PipelineRunCompleted",
+                "dataset_id": str(uuid4()),
+                "pipeline_run_id": str(uuid4()),
+                "dataset_name": body["dataset_name"],
+            }
+        )
+
+
+config = CogwitConfig(
+    api_key="dummy", retry_policy=RetryPolicy(base_delay=0.001, max_delay=0.01)
+)
+
+
+@pytest.mark.asyncio
+async def test_file_is_streamed_in_a_chunked_body_and_retried(api_client, tmp_path):
+    api = StreamingAddApi()
+    path = tmp_path / "corpus.txt"
+    path.write_text("large corpus\n" * 10_000, encoding="utf-8")
+
+    async with api_client(config, post={"/add": api.add}) as client:
+        result = await client.add([path, b"raw bytes"], dataset_name="corpus")
+
+    assert isinstance(result, AddResponse)
+    assert api.chunked == [True, True]
+    assert api.bodies[1]["text_data"] == [path.read_text(), "raw bytes"]
+
+
+@pytest.mark.asyncio
+async def test_async_iterator_body_is_not_retried(api_client):
+    api = StreamingAddApi()
+
+    async def documents():
+        yield "first"
+        yield "second"
+
+    async with api_client(config, post={"/add": api.add}) as client:
+        result = await client.add(documents(), dataset_name="stream")
+
+    assert result == AddError(status=503, error="try again")
+    assert api.bodies == [
+        {
+            "text_data": ["first", "second"],
+            "dataset_id": "",
+            "dataset_name": "stream",
+            "node_set": None,
+        }
+    ]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from cogwit_sdk import DeadlineExceeded, deadline_after
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse
+from cogwit_sdk.infrastructure.single_flight import SingleFlightConfig
+from cogwit_sdk.infrastructure.timeout_policy import EndpointTimeout, TimeoutPolicy
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+pipeline_run_id = UUID("87654321-4321-4321-4321-cba987654321")
+
+
+@pytest.mark.asyncio
+async def test_each_endpoint_gets_its_timeout_and_the_callers_deadline():
+    search_timeout = EndpointTimeout(total=2, connect=1)
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            timeout_policy=TimeoutPolicy(endpoints={"/search": search_timeout}),
+        )
+    )
+    mock_send_api_request = AsyncMock(
+        return_value=SuccessResponse(
+            status=200,
+            data={
+                "status": "PipelineRunCompleted",
+                "dataset_id": str(dataset_id),
+                "pipeline_run_id": str(pipeline_run_id),
+                "dataset_name": "docs",
+            },
+        )
+    )
+    deadline = deadline_after(2)
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="q", deadline=deadline)
+        await cogwit_instance.add("text", dataset_name="docs")
+
+    search_options = mock_send_api_request.call_args_list[0].kwargs
+    add_options = mock_send_api_request.call_args_list[1].kwargs
+    assert search_options["timeout"] == search_timeout
+    assert search_options["deadline"] == deadline
+    assert add_options["timeout"] == EndpointTimeout()
+    assert add_options["deadline"] is None
+
+
+@pytest.mark.asyncio
+async def test_caller_of_a_shared_search_stops_waiting_at_its_deadline():
+    cogwit_instance = cogwit(
+        CogwitConfig(api_key="dummy", single_flight=SingleFlightConfig(search=True))
+    )
+
+    async def slow_search(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return SuccessResponse(status=200, data=[{"search_result": "answer"}])
+
+    with patch(
+        "cogwit_sdk.cogwit.cogwit.send_api_request",
+        AsyncMock(side_effect=slow_search),
+    ):
+        patient = asyncio.ensure_future(cogwit_instance.search(query_text="q"))
+        with pytest.raises(DeadlineExceeded):
+            await cogwit_instance.search(query_text="q", deadline=deadline_after(0.01))
+
+        assert await patient == [{"search_result": "answer"}]
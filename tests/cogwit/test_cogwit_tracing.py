@@ -0,0 +1,32 @@
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+
+
+async def search(request):
+    return web.json_response([{"search_result": "answer"}])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pooled", [True, False])
+async def test_trace_hooks_receive_every_request(serve_api, pooled):
+    timings = []
+    cogwit_instance = cogwit(CogwitConfig(api_key="dummy"))
+    cogwit_instance.add_trace_hook(timings.append)
+
+    async with serve_api(post={"/search": search}):
+        if pooled:
+            await cogwit_instance.open()
+        await cogwit_instance.search(query_text="q")
+        await cogwit_instance.search(query_text="q")
+
+        cogwit_instance.remove_trace_hook(timings.append)
+        await cogwit_instance.search(query_text="q")
+        await cogwit_instance.aclose()
+
+    assert [(timing.api_endpoint, timing.status) for timing in timings] == [
+        ("/search", 200),
+        ("/search", 200),
+    ]
+    assert timings[1].reused_connection == pooled
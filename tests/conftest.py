@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def serve_api():
+    """
+    Starts a stand-in API that `send_api_request` talks to, e.g.
+    `async with serve_api(post={"/search": handler}) as server:`.
+
+    Routes are keyed by API endpoint, without the `/api` prefix.
+    """
+
+    @asynccontextmanager
+    async def serve(
+        post: Optional[Dict[str, Handler]] = None,
+        get: Optional[Dict[str, Handler]] = None,
+    ):
+        app = web.Application()
+        for api_endpoint, handler in (post or {}).items():
+            app.router.add_post(f"/api{api_endpoint}", handler)
+        for api_endpoint, handler in (get or {}).items():
+            app.router.add_get(f"/api{api_endpoint}", handler)
+
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            with patch(
+                "cogwit_sdk.infrastructure.send_api_request.api_base",
+                str(server.make_url("")).rstrip("/"),
+            ):
+                yield server
+        finally:
+            await server.close()
+
+    return serve
+
+
+@pytest.fixture
+def api_client(serve_api):
+    """
+    Starts a stand-in API like `serve_api` and yields an open client for it,
+    e.g. `async with api_client(post={"/add": handler}) as client:`.
+    """
+
+    @asynccontextmanager
+    async def open_client(
+        config: Optional[CogwitConfig] = None,
+        post: Optional[Dict[str, Handler]] = None,
+        get: Optional[Dict[str, Handler]] = None,
+    ):
+        async with serve_api(post=post, get=get):
+            async with cogwit(config or CogwitConfig(api_key="dummy")) as client:
+                yield client
+
+    return open_client
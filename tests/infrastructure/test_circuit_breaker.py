@@ -0,0 +1,242 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.infrastructure.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+    CircuitState,
+)
+from cogwit_sdk.infrastructure.retry_policy import RetryPolicy
+from cogwit_sdk.infrastructure.send_api_request import (
+    ErrorResponse,
+    SuccessResponse,
+    send_api_request,
+)
+
+
+def make_breaker(**config):
+    changes = []
+    config = {
+        "window_size": 4,
+        "min_requests": 4,
+        "open_duration": 0.05,
+        "half_open_requests": 2,
+        "on_state_change": lambda *change: changes.append(change),
+        **config,
+    }
+    return CircuitBreaker("/search", CircuitBreakerConfig(**config)), changes
+
+
+def send(breaker, failed=False, latency=0.01):
+    ticket = breaker.before_request()
+    breaker.record(ticket, latency, failed=failed)
+
+
+def test_circuit_opens_at_the_failure_rate():
+    breaker, changes = make_breaker()
+
+    for failed in (True, False, True):
+        send(breaker, failed)
+    assert breaker.state == CircuitState.CLOSED
+
+    send(breaker, failed=False)
+    assert breaker.state == CircuitState.OPEN
+    assert changes == [("/search", CircuitState.CLOSED, CircuitState.OPEN)]
+
+
+def test_circuit_opens_when_requests_are_slow():
+    breaker, _ = make_breaker(slow_request_duration=1, slow_request_rate=0.75)
+
+    for latency in (2, 2, 0.1, 2):
+        send(breaker, latency=latency)
+
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_circuit_stays_closed_with_few_failures():
+    breaker, changes = make_breaker()
+
+    for _ in range(10):
+        send(breaker, failed=False)
+        send(breaker, failed=False)
+        send(breaker, failed=False)
+        send(breaker, failed=True)
+
+    assert breaker.state == CircuitState.CLOSED
+    assert changes == []
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_then_lets_trial_requests_in():
+    breaker, changes = make_breaker()
+    for _ in range(4):
+        send(breaker, failed=True)
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_request()
+    assert error.value.api_endpoint == "/search"
+    assert 0 < error.value.retry_after <= 0.05
+
+    await asyncio.sleep(0.06)
+    tickets = [breaker.before_request(), breaker.before_request()]
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only `half_open_requests` trials are let in at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    for ticket in tickets:
+        breaker.record(ticket, 0.01, failed=False)
+    assert breaker.state == CircuitState.CLOSED
+    assert [new_state for _, _, new_state in changes] == [
+        CircuitState.OPEN,
+        CircuitState.HALF_OPEN,
+        CircuitState.CLOSED,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_trial_reopens_the_circuit():
+    breaker, _ = make_breaker()
+    for _ in range(4):
+        send(breaker, failed=True)
+
+    await asyncio.sleep(0.06)
+    send(breaker, failed=True)
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_frees_its_slot():
+    breaker, _ = make_breaker(half_open_requests=1)
+    for _ in range(4):
+        send(breaker, failed=True)
+
+    await asyncio.sleep(0.06)
+    breaker.release(breaker.before_request())
+    send(breaker)
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_requests_admitted_before_the_circuit_opened_are_ignored():
+    breaker, _ = make_breaker(slow_request_duration=1)
+    stale_tickets = [breaker.before_request() for _ in range(3)]
+    for _ in range(4):
+        send(breaker, failed=True)
+
+    await asyncio.sleep(0.06)
+    trial = breaker.before_request()
+    # The requests in flight when the circuit opened finish during the trial:
+    # slow ones don't reopen it, quick ones don't close it.
+    breaker.record(stale_tickets[0], 2, failed=False)
+    breaker.record(stale_tickets[1], 0.01, failed=False)
+    breaker.record(stale_tickets[2], 0.01, failed=False)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    breaker.record(trial, 0.01, failed=False)
+    assert breaker.state == CircuitState.HALF_OPEN
+    send(breaker)
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_send_api_request_fails_fast_while_the_circuit_is_open(serve_api):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=503, text="unavailable")
+
+    breaker, _ = make_breaker(open_duration=60)
+
+    async with serve_api(post={"/search": handler}):
+        for _ in range(4):
+            response = await send_api_request(
+                "/search", "post", {}, {}, circuit_breaker=breaker
+            )
+            assert isinstance(response, ErrorResponse)
+
+        with pytest.raises(CircuitOpenError):
+            await send_api_request("/search", "post", {}, {}, circuit_breaker=breaker)
+
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_once_the_circuit_opens(serve_api):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=503, text="unavailable")
+
+    breaker, _ = make_breaker(window_size=2, min_requests=2, open_duration=60)
+    retry_policy = RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.001)
+
+    async with serve_api(post={"/search": handler}):
+        with pytest.raises(CircuitOpenError):
+            await send_api_request(
+                "/search",
+                "post",
+                {},
+                {},
+                retry_policy=retry_policy,
+                circuit_breaker=breaker,
+            )
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_dont_open_the_circuit(serve_api):
+    async def handler(request):
+        return web.Response(status=422, text="bad query")
+
+    breaker, _ = make_breaker()
+
+    async with serve_api(post={"/search": handler}):
+        for _ in range(8):
+            await send_api_request("/search", "post", {}, {}, circuit_breaker=breaker)
+        response = await send_api_request(
+            "/search", "post", {}, {}, circuit_breaker=breaker
+        )
+
+    assert isinstance(response, ErrorResponse)
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_recovered_backend_closes_the_circuit(serve_api):
+    healthy = False
+
+    async def handler(request):
+        if healthy:
+            return web.json_response({"ok": True})
+        return web.Response(status=500, text="boom")
+
+    breaker, _ = make_breaker(half_open_requests=1)
+
+    async with serve_api(post={"/search": handler}):
+        for _ in range(4):
+            await send_api_request("/search", "post", {}, {}, circuit_breaker=breaker)
+        assert breaker.state == CircuitState.OPEN
+
+        healthy = True
+        await asyncio.sleep(0.06)
+        response = await send_api_request(
+            "/search",
+            "post",
+            {"Content-Type": "application/json"},
+            {},
+            circuit_breaker=breaker,
+        )
+
+    assert isinstance(response, SuccessResponse)
+    assert breaker.state == CircuitState.CLOSED
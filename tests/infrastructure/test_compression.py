@@ -0,0 +1,120 @@
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.infrastructure import compression
+from cogwit_sdk.infrastructure.compression import (
+    CompressionConfig,
+    accept_encoding,
+    compress_body,
+    compress_stream,
+)
+from cogwit_sdk.infrastructure.send_api_request import SuccessResponse, send_api_request
+from cogwit_sdk.infrastructure.streaming_body import StreamingBody
+
+gzip_config = CompressionConfig(request_encoding="gzip", min_size=100)
+
+
+def test_gzip_body_round_trips():
+    body = b"highly compressible text " * 100
+
+    compressed = compress_body(gzip_config, body)
+
+    assert gzip.decompress(compressed) == body
+    assert len(compressed) < len(body) / 10
+
+
+@pytest.mark.asyncio
+async def test_gzip_stream_round_trips():
+    async def chunks():
+        for _ in range(100):
+            yield b"chunk of text "
+
+    compressed = b"".join(
+        [chunk async for chunk in compress_stream(gzip_config, chunks())]
+    )
+
+    assert gzip.decompress(compressed) == b"chunk of text " * 100
+
+
+def test_zstd_needs_the_zstandard_package():
+    with patch.object(compression, "zstandard", None):
+        with pytest.raises(ValueError):
+            CompressionConfig(request_encoding="zstd")
+        assert accept_encoding(CompressionConfig()) is None
+
+
+def test_zstd_round_trips():
+    zstandard = pytest.importorskip("zstandard")
+    config = CompressionConfig(request_encoding="zstd")
+    body = b"highly compressible text " * 100
+
+    assert zstandard.ZstdDecompressor().decompress(compress_body(config, body)) == body
+    assert accept_encoding(config) == "zstd, gzip, deflate"
+
+
+class EchoApi:
+    def __init__(self):
+        self.requests = []
+
+    async def echo(self, request):
+        # aiohttp decodes the request body, so only its headers show what was
+        # on the wire.
+        self.requests.append(
+            (
+                request.headers.get("Content-Encoding"),
+                request.headers.get("Content-Length"),
+            )
+        )
+
+        response = web.json_response({"received": await request.json()})
+        response.enable_compression()
+        return response
+
+
+async def send_to_echo(serve_api, api, payload, config):
+    async with serve_api(post={"/echo": api.echo}):
+        return await send_api_request(
+            "/echo",
+            "post",
+            {"Content-Type": "application/json"},
+            payload,
+            compression=config,
+        )
+
+
+@pytest.mark.asyncio
+async def test_request_bodies_above_the_threshold_are_compressed(serve_api):
+    api = EchoApi()
+    large = {"text_data": ["compressible " * 50]}
+
+    small_response = await send_to_echo(
+        serve_api, api, {"text_data": ["tiny"]}, gzip_config
+    )
+    large_response = await send_to_echo(serve_api, api, large, gzip_config)
+
+    assert small_response == SuccessResponse(
+        status=200, data={"received": {"text_data": ["tiny"]}}
+    )
+    assert large_response.data == {"received": large}
+    assert [encoding for encoding, _ in api.requests] == [None, "gzip"]
+    assert int(api.requests[1][1]) < len(json.dumps(large)) / 5
+
+
+@pytest.mark.asyncio
+async def test_streamed_bodies_are_always_compressed(serve_api):
+    api = EchoApi()
+
+    async def chunks():
+        yield b'{"text_data": '
+        yield b'["streamed"]}'
+
+    response = await send_to_echo(
+        serve_api, api, StreamingBody(chunks, replayable=True), gzip_config
+    )
+
+    assert response.data == {"received": {"text_data": ["streamed"]}}
+    assert api.requests[0][0] == "gzip"
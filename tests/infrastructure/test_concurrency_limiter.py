@@ -0,0 +1,136 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.concurrency_limiter import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+)
+from cogwit_sdk.infrastructure.send_api_request import send_api_request
+
+
+def make_limiter(**config):
+    return AdaptiveConcurrencyLimiter(
+        AdaptiveConcurrencyConfig(endpoints={"/search"}, **config)
+    )
+
+
+@pytest.mark.asyncio
+async def test_limits_in_flight_requests_and_wakes_waiters_in_order():
+    limiter = make_limiter(initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    started = []
+
+    async def wait_for_slot(name):
+        await limiter.acquire()
+        started.append(name)
+
+    waiters = [asyncio.create_task(wait_for_slot(name)) for name in ("a", "b")]
+    await asyncio.sleep(0)
+    assert started == []
+    assert limiter.in_flight == 2
+
+    limiter.release()
+    await asyncio.sleep(0)
+    assert started == ["a"]
+
+    limiter.release()
+    await asyncio.gather(*waiters)
+    assert started == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    limiter = make_limiter(initial_limit=1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    limiter.release()
+    assert limiter.in_flight == 0
+    assert not limiter._waiters
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_by_about_one_per_window_of_fast_requests():
+    limiter = make_limiter(initial_limit=4)
+
+    for _ in range(4):
+        await limiter.acquire()
+        limiter.release(0.01)
+
+    assert 4.9 < limiter.limit < 5
+
+
+@pytest.mark.asyncio
+async def test_throttling_cuts_limit_once_per_round_trip():
+    limiter = make_limiter(initial_limit=16, backoff_ratio=0.5)
+    limiter.latency = 60
+
+    for _ in range(3):
+        await limiter.acquire()
+        limiter.release(0.01, overloaded=True)
+
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_latency_spike_cuts_limit():
+    limiter = make_limiter(initial_limit=10, latency_smoothing=1)
+
+    await limiter.acquire()
+    limiter.release(0.1)
+    await limiter.acquire()
+    limiter.release(1.0)
+
+    stats = limiter.stats()
+    assert stats.limit == 5
+    assert stats.latency == 1.0
+    assert stats.baseline_latency == pytest.approx(0.101)
+
+
+@pytest.mark.asyncio
+async def test_send_api_request_reports_throttling_to_limiter():
+    limiter = make_limiter(initial_limit=10)
+
+    mock_response = MagicMock()
+    mock_response.status = 429
+    mock_response.json = AsyncMock(return_value={"error": "slow down"})
+    mock_response.headers = {}
+    mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_response.__aexit__ = AsyncMock(return_value=None)
+    mock_session = MagicMock()
+    mock_session.post = MagicMock(return_value=mock_response)
+
+    await send_api_request(
+        "/search", "post", {}, {}, session=mock_session, concurrency_limiter=limiter
+    )
+
+    assert limiter.stats().limit == 5
+    assert limiter.in_flight == 0
+
+
+def test_cogwit_exposes_concurrency_stats():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            adaptive_concurrency=AdaptiveConcurrencyConfig(
+                endpoints={"/search", "/add"}, initial_limit=3
+            ),
+        )
+    )
+
+    stats = cogwit_instance.concurrency_stats()
+
+    assert set(stats) == {"/search", "/add"}
+    assert stats["/search"].limit == 3
+    assert stats["/search"].in_flight == 0
+    assert cogwit_instance._request_options("/memify")["concurrency_limiter"] is None
@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+from cogwit_sdk.infrastructure.hedging import Hedger, HedgingConfig
+
+
+def make_hedger(**config):
+    config = {"min_samples": 5, "budget_ratio": 1.0, "max_budget": 100, **config}
+    return Hedger(HedgingConfig(search=True, **config))
+
+
+def warm_up(hedger, count=10, latency=0.001):
+    hedger._latencies.extend([latency] * count)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_enough_samples():
+    hedger = make_hedger(min_samples=5)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    assert hedger.delay() is None
+    assert await hedger.run(call) == 1
+    assert calls == 1
+    assert hedger.stats().hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_delay_is_a_percentile_of_recent_latencies():
+    hedger = make_hedger(percentile=50, window=4, min_samples=1)
+    hedger._latencies.extend([10.0, 1.0, 2.0, 3.0, 4.0])
+
+    # The oldest latency fell out of the window.
+    assert hedger.delay() == 2.0
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_the_faster_answer_wins():
+    hedger = make_hedger()
+    warm_up(hedger)
+
+    calls = 0
+    cancelled = []
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        attempt = calls
+        try:
+            await asyncio.sleep(1 if attempt == 1 else 0.001)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    assert await asyncio.wait_for(hedger.run(call), 0.5) == 2
+    assert cancelled == [1]
+
+    stats = hedger.stats()
+    assert stats.requests == 1
+    assert stats.hedges == 1
+    assert stats.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    hedger = make_hedger()
+    warm_up(hedger, latency=0.02)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await hedger.run(call) == 1
+    assert calls == 1
+    assert hedger.stats().hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_the_extra_requests():
+    hedger = make_hedger(budget_ratio=0.1, max_budget=1)
+    warm_up(hedger, count=20)
+    calls = 0
+
+    async def slow_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "slow"
+
+    await asyncio.gather(*(hedger.run(slow_call) for _ in range(20)))
+
+    # Budget never saves up beyond one hedge, even though the 20 requests
+    # earned two.
+    assert hedger.stats().hedges == 1
+    assert calls == 21
+
+
+@pytest.mark.asyncio
+async def test_failed_answer_waits_for_the_other_request():
+    hedger = make_hedger()
+    warm_up(hedger)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            raise RuntimeError("replica went away")
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    assert await hedger.run(call) == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_when_both_requests_fail():
+    hedger = make_hedger()
+    warm_up(hedger)
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError, match="down"):
+        await hedger.run(call)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_caller_cancels_both_requests():
+    hedger = make_hedger()
+    warm_up(hedger)
+    cancelled = 0
+
+    async def call():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    task = asyncio.ensure_future(hedger.run(call))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert cancelled == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_answer_from_the_hedge_does_not_beat_the_primary():
+    hedger = make_hedger()
+    warm_up(hedger)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.05)
+            return {"status": 200}
+        return {"status": 503}
+
+    result = await hedger.run(call, is_failure=lambda result: result["status"] >= 500)
+
+    assert result == {"status": 200}
+    assert hedger.stats().hedge_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_latency_is_measured_from_the_first_request_to_the_answer():
+    hedger = make_hedger()
+    warm_up(hedger, latency=0.05)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1 if calls == 1 else 0.01)
+        return calls
+
+    assert await hedger.run(call) == 2
+    # The hedge took 0.01s, but only started after the 0.05s delay.
+    assert hedger._latencies[-1] >= 0.06
+    assert len(hedger._latencies) == 11
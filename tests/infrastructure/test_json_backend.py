@@ -0,0 +1,49 @@
+import json
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from cogwit_sdk.infrastructure.json_backend import (
+    json_dumps,
+    json_loads,
+    stdlib_json_dumps,
+)
+from cogwit_sdk.infrastructure.json_encoder import json_encoder
+
+
+class Node(BaseModel):
+    id: UUID
+    weight: Decimal
+
+
+payload = {
+    "text_data": ["first", "second ünïcode"],
+    "dataset_id": UUID("12345678-1234-1234-1234-123456789abc"),
+    "dataset_name": "main_dataset",
+    "node_set": None,
+    "tags": {"only"},
+    "nodes": [Node(id=UUID("87654321-4321-4321-4321-cba987654321"), weight="1.5")],
+}
+
+
+def test_json_dumps_matches_json_encoder():
+    body = json_dumps(payload)
+
+    assert isinstance(body, bytes)
+    assert json.loads(body) == json_encoder(payload)
+
+
+def test_stdlib_json_dumps_matches_json_encoder():
+    assert json.loads(stdlib_json_dumps(payload)) == json_encoder(payload)
+
+
+def test_json_dumps_serializes_models_directly():
+    node = Node(id=UUID("87654321-4321-4321-4321-cba987654321"), weight="1.5")
+
+    assert json_loads(json_dumps(node)) == json_encoder(node)
+
+
+def test_json_loads_accepts_text_and_bytes():
+    assert json_loads('{"a": [1, "b"]}') == {"a": [1, "b"]}
+    assert json_loads(b'{"a": null}') == {"a": None}
@@ -0,0 +1,144 @@
+import dataclasses
+import datetime
+import re
+from collections import deque
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path, PurePosixPath
+from types import GeneratorType
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel, RootModel
+from pydantic.types import SecretBytes, SecretStr
+
+from cogwit_sdk.infrastructure.json_encoder import (
+    ENCODERS_BY_TYPE,
+    encoders_by_type_cache,
+    fast_json_encoder,
+    json_encoder,
+)
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Label(str, Enum):
+    KEY = "key"
+
+
+class Item(BaseModel):
+    id: UUID
+    tags: set
+
+
+class Items(RootModel[list]):
+    pass
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: Decimal
+
+
+class Mapping:
+    def __init__(self):
+        self.value = 1
+
+
+def make_generator():
+    return (value for value in [1, "two"])
+
+
+SAMPLES_BY_TYPE = {
+    bytes: b"bytes",
+    datetime.date: datetime.date(2024, 1, 2),
+    datetime.datetime: datetime.datetime(2024, 1, 2, 3, 4, 5),
+    datetime.time: datetime.time(3, 4, 5),
+    datetime.timedelta: datetime.timedelta(seconds=90),
+    Decimal: Decimal("1.5"),
+    Enum: Color.RED,
+    frozenset: frozenset({1}),
+    deque: deque([1, 2]),
+    Path: Path("/tmp/file.txt"),
+    re.Pattern: re.compile("a+"),
+    SecretBytes: SecretBytes(b"secret"),
+    SecretStr: SecretStr("secret"),
+    set: {"a"},
+    UUID: UUID("12345678-1234-1234-1234-123456789abc"),
+}
+
+
+def reference_encoder(obj):
+    # Any non-default option skips the fast path; sqlalchemy_safe only matters
+    # for keys starting with "_sa", which the samples below do not use.
+    return json_encoder(obj, sqlalchemy_safe=False)
+
+
+def test_samples_cover_every_registered_encoder():
+    assert set(SAMPLES_BY_TYPE) == set(ENCODERS_BY_TYPE) - {GeneratorType}
+
+
+@pytest.mark.parametrize("obj_type", list(SAMPLES_BY_TYPE))
+def test_fast_path_matches_reference_for_registered_types(obj_type):
+    sample = SAMPLES_BY_TYPE[obj_type]
+
+    assert json_encoder(sample) == reference_encoder(sample)
+    assert json_encoder([sample, {"key": sample}]) == reference_encoder(
+        [sample, {"key": sample}]
+    )
+
+
+def test_fast_path_matches_reference_for_generators():
+    assert json_encoder(make_generator()) == reference_encoder(make_generator())
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        ["a", 1, 2.5, None, True],
+        ("a", "b"),
+        {"text_data": ["one", "two"], "dataset_id": "", "node_set": None},
+        {UUID("12345678-1234-1234-1234-123456789abc"): [Decimal("2")]},
+        {Label.KEY: Label.KEY},
+        Item(id=UUID("12345678-1234-1234-1234-123456789abc"), tags={"x"}),
+        Items([1, Color.RED]),
+        Point(x=1, y=Decimal("0.5")),
+        Mapping(),
+        [[{"nested": ({"deep": Path("a")},)}]],
+        PurePosixPath("relative/path"),
+    ],
+)
+def test_fast_path_matches_reference_for_containers_and_objects(sample):
+    assert json_encoder(sample) == reference_encoder(sample)
+
+
+def test_fast_path_drops_sqlalchemy_state():
+    assert json_encoder({"_sa_instance_state": object(), "name": "x"}) == {"name": "x"}
+
+
+def test_fast_path_returns_copies_of_native_containers():
+    payload = {"text_data": ["one", "two"]}
+    encoded = fast_json_encoder(payload)
+
+    assert encoded == payload
+    assert encoded is not payload
+    assert encoded["text_data"] is not payload["text_data"]
+
+
+def test_fast_path_resolves_each_type_once():
+    encoders_by_type_cache.clear()
+
+    fast_json_encoder([Decimal("1"), Decimal("2"), Decimal("3")])
+
+    assert list(encoders_by_type_cache) == [Decimal]
+
+
+def test_options_still_apply_outside_the_fast_path():
+    assert json_encoder({"a": None, "b": 1}, exclude_none=True) == {"b": 1}
+    assert json_encoder(
+        Item(id=UUID("12345678-1234-1234-1234-123456789abc"), tags=set()),
+        exclude={"tags"},
+    ) == {"id": "12345678-1234-1234-1234-123456789abc"}
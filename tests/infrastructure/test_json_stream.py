@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from cogwit_sdk.infrastructure.json_stream import JsonArrayParser
+
+items = [
+    {"search_result": 'quoted "text" with [brackets], {braces}', "dataset_id": None},
+    {"search_result": ["nested", {"list": [1, 2]}], "escape": "back\\slash"},
+    "plain string",
+    12.5,
+    None,
+    [],
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1024])
+def test_yields_every_element_regardless_of_chunking(chunk_size):
+    body = json.dumps(items, indent=2).encode()
+    parser = JsonArrayParser()
+    parsed = []
+
+    for start in range(0, len(body), chunk_size):
+        parsed.extend(parser.feed(body[start : start + chunk_size]))
+    parser.close()
+
+    assert parsed == items
+
+
+def test_elements_are_returned_as_soon_as_they_are_complete():
+    parser = JsonArrayParser()
+
+    assert parser.feed(b' [{"a": 1}') == [{"a": 1}]
+    assert parser.feed(b', {"b"') == []
+    assert parser.feed(b": 2}") == [{"b": 2}]
+    assert parser.feed(b", 3") == []
+    assert parser.feed(b"]") == [3]
+    assert parser.finished
+
+
+def test_keeps_only_the_element_being_received():
+    parser = JsonArrayParser()
+    parser.feed(b"[" + b'"' + b"x" * 10_000 + b'", {"partial": ')
+
+    assert len(parser._buffer) < 20
+
+
+def test_empty_array():
+    parser = JsonArrayParser()
+
+    assert parser.feed(b"[ ]") == []
+    parser.close()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'{"result": 1}', b"[1,]", b"[,1]", b"[1] [2]", b"[1, {", b"[{} {}]", b"[{},]"],
+)
+def test_rejects_bodies_that_are_not_a_single_array(body):
+    parser = JsonArrayParser()
+
+    with pytest.raises(ValueError):
+        parser.feed(body)
+        parser.close()
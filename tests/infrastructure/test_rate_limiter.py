@@ -0,0 +1,121 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from cogwit_sdk.cogwit.cogwit import CogwitConfig, cogwit
+from cogwit_sdk.infrastructure.rate_limiter import (
+    RateLimit,
+    RateLimitConfig,
+    SharedTokenBucket,
+    TokenBucket,
+    create_rate_limiters,
+)
+from cogwit_sdk.infrastructure.send_api_request import ErrorResponse, send_api_request
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_paces_requests():
+    bucket = TokenBucket(rate=50, capacity=5)
+    started_at = time.monotonic()
+
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - started_at < 0.02
+
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - started_at >= 5 / 50 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_returns_token_when_waiter_is_cancelled():
+    bucket = TokenBucket(rate=10, capacity=1)
+    await bucket.acquire()
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert bucket._reserve() <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_shared_token_buckets_share_one_budget(tmp_path):
+    path = str(tmp_path / "search.bucket")
+    # Two buckets on the same file stand in for two worker processes.
+    first_worker = SharedTokenBucket(path, rate=20, capacity=2)
+    second_worker = SharedTokenBucket(path, rate=20, capacity=2)
+
+    started_at = time.monotonic()
+    await first_worker.acquire()
+    await second_worker.acquire()
+    assert time.monotonic() - started_at < 0.05
+
+    await first_worker.acquire()
+    await second_worker.acquire()
+    assert time.monotonic() - started_at >= 2 / 20 * 0.9
+
+
+def test_create_rate_limiters_keys_shared_state_by_api_key(tmp_path):
+    config = RateLimitConfig(
+        limits={"/search": RateLimit(rate=5, burst=10), "/add": RateLimit(rate=50)},
+        shared_state_dir=str(tmp_path),
+    )
+
+    first = create_rate_limiters(config, "first-key")
+    second = create_rate_limiters(config, "second-key")
+
+    assert set(first) == {"/search", "/add"}
+    assert first["/search"].path != first["/add"].path
+    assert first["/search"].path != second["/search"].path
+    assert create_rate_limiters(config, "first-key")["/add"].path == first["/add"].path
+    assert isinstance(
+        create_rate_limiters(RateLimitConfig(limits=config.limits), "key")["/add"],
+        TokenBucket,
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_api_request_waits_for_rate_limiter():
+    rate_limiter = MagicMock()
+    rate_limiter.acquire = AsyncMock()
+
+    mock_response = MagicMock()
+    mock_response.status = 200
+    mock_response.text = AsyncMock(return_value="success")
+    mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_response.__aexit__ = AsyncMock(return_value=None)
+    mock_session = MagicMock()
+    mock_session.post = MagicMock(return_value=mock_response)
+
+    await send_api_request(
+        "/search", "post", {}, {}, session=mock_session, rate_limiter=rate_limiter
+    )
+
+    rate_limiter.acquire.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cogwit_passes_endpoint_rate_limiter():
+    cogwit_instance = cogwit(
+        CogwitConfig(
+            api_key="dummy",
+            rate_limits=RateLimitConfig(limits={"/search": RateLimit(rate=1)}),
+        )
+    )
+    mock_send_api_request = AsyncMock()
+    mock_send_api_request.return_value = ErrorResponse(status=400, error="invalid")
+
+    with patch("cogwit_sdk.cogwit.cogwit.send_api_request", mock_send_api_request):
+        await cogwit_instance.search(query_text="query")
+        await cogwit_instance.add(data="document")
+
+    search_call, add_call = mock_send_api_request.call_args_list
+    assert (
+        search_call.kwargs["rate_limiter"] is cogwit_instance._rate_limiters["/search"]
+    )
+    assert add_call.kwargs["rate_limiter"] is None
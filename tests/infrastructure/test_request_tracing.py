@@ -0,0 +1,145 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp import ClientConnectorError
+from aiohttp.test_utils import unused_port
+
+from cogwit_sdk.infrastructure.compression import CompressionConfig
+from cogwit_sdk.infrastructure.http_session import (
+    ConnectionPoolConfig,
+    create_client_session,
+)
+from cogwit_sdk.infrastructure.json_backend import json_dumps
+from cogwit_sdk.infrastructure.retry_policy import RetryPolicy
+from cogwit_sdk.infrastructure.send_api_request import send_api_request
+
+response_body = json_dumps({"search_result": "x" * 1000})
+
+
+async def search_handler(request):
+    await request.read()
+    await asyncio.sleep(0.01)
+    return web.Response(body=response_body, content_type="application/json")
+
+
+def search(**options):
+    return send_api_request(
+        "/search",
+        "post",
+        {"Content-Type": "application/json"},
+        {"query": "what"},
+        **options,
+    )
+
+
+@pytest.mark.asyncio
+async def test_each_request_reports_its_timing_breakdown(serve_api):
+    timings = []
+
+    async with serve_api(post={"/search": search_handler}):
+        await search(trace_hooks=[timings.append])
+
+    [timing] = timings
+    assert timing.api_endpoint == "/search"
+    assert timing.method == "post"
+    assert timing.attempt == 1
+    assert timing.status == 200
+    assert timing.error is None
+    assert timing.request_bytes == len(json_dumps({"query": "what"}))
+    assert timing.response_bytes == len(response_body)
+    assert not timing.reused_connection
+    assert timing.connect is not None
+    assert timing.waiting >= 0.01
+    assert timing.download is not None
+    assert timing.total >= timing.connect + timing.waiting
+
+
+@pytest.mark.asyncio
+async def test_pooled_connections_are_reported_as_reused(serve_api):
+    timings = []
+    session = create_client_session(ConnectionPoolConfig())
+
+    async with serve_api(post={"/search": search_handler}):
+        try:
+            await search(session=session, trace_hooks=[timings.append])
+            await search(session=session, trace_hooks=[timings.append])
+        finally:
+            await session.close()
+
+    first, second = timings
+    assert not first.reused_connection and first.connect is not None
+    assert second.reused_connection and second.connect is None
+
+
+@pytest.mark.asyncio
+async def test_retries_are_reported_per_attempt(serve_api):
+    timings = []
+    calls = 0
+
+    async def flaky_handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return web.Response(status=503, text="busy")
+        return web.Response(body=response_body, content_type="application/json")
+
+    retry_policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+    async with serve_api(post={"/search": flaky_handler}):
+        await search(retry_policy=retry_policy, trace_hooks=[timings.append])
+
+    assert [(timing.attempt, timing.status) for timing in timings] == [
+        (1, 503),
+        (2, 200),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compressed_bodies_are_counted_as_sent(serve_api):
+    timings = []
+
+    async with serve_api(post={"/search": search_handler}):
+        await send_api_request(
+            "/search",
+            "post",
+            {"Content-Type": "application/json"},
+            {"query": "what " * 1000},
+            compression=CompressionConfig(request_encoding="gzip", min_size=0),
+            trace_hooks=[timings.append],
+        )
+
+    assert 0 < timings[0].request_bytes < 1000
+
+
+@pytest.mark.asyncio
+async def test_failed_attempts_report_the_error():
+    timings = []
+
+    with patch(
+        "cogwit_sdk.infrastructure.send_api_request.api_base",
+        f"http://127.0.0.1:{unused_port()}",
+    ):
+        with pytest.raises(ClientConnectorError):
+            await search(trace_hooks=[timings.append])
+
+    [timing] = timings
+    assert timing.status is None
+    assert timing.error == "ClientConnectorError"
+    assert timing.waiting is None
+
+
+@pytest.mark.asyncio
+async def test_failing_hooks_do_not_change_the_response(serve_api, caplog):
+    timings = []
+
+    def failing_hook(timing):
+        raise RuntimeError("hook failed")
+
+    async with serve_api(post={"/search": search_handler}):
+        response = await search(trace_hooks=[failing_hook, timings.append])
+
+    assert response.status == 200
+    assert len(timings) == 1
+    assert "hook failed" in caplog.text
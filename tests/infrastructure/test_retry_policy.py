@@ -0,0 +1,165 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.infrastructure.retry_policy import (
+    IDEMPOTENCY_KEY_HEADER,
+    RetryPolicy,
+    parse_retry_after,
+)
+from cogwit_sdk.infrastructure.send_api_request import (
+    ErrorResponse,
+    SuccessResponse,
+    send_api_request,
+)
+
+fast_retry_policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+
+def failing_handler(statuses, headers=None):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) <= len(statuses):
+            return web.Response(
+                status=statuses[len(calls) - 1], text="busy", headers=headers
+            )
+        return web.json_response({"ok": True})
+
+    return handler, calls
+
+
+def test_compute_delay_uses_full_jitter_within_bounds():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    for attempt in range(1, 10):
+        delay = policy.compute_delay(attempt)
+        assert 0 <= delay <= min(5, 2 ** (attempt - 1))
+
+
+def test_compute_delay_honours_retry_after():
+    assert RetryPolicy().compute_delay(1, retry_after=7) == 7
+    assert RetryPolicy(max_delay=30).compute_delay(1, retry_after=3600) == 30
+    assert (
+        RetryPolicy(respect_retry_after=False, max_delay=1).compute_delay(
+            1, retry_after=7
+        )
+        <= 1
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("not a date") is None
+
+    in_a_minute = format_datetime(
+        datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True
+    )
+    assert 50 < parse_retry_after(in_a_minute) <= 60
+
+
+def test_is_idempotent():
+    policy = RetryPolicy()
+
+    assert policy.is_idempotent("/search", "post", {})
+    assert policy.is_idempotent("/datasets", "get", {})
+    assert not policy.is_idempotent("/add", "post", {})
+    assert policy.is_idempotent("/add", "post", {IDEMPOTENCY_KEY_HEADER: "key"})
+
+
+@pytest.mark.asyncio
+async def test_retries_idempotent_request_on_retryable_status(serve_api):
+    handler, calls = failing_handler([503, 429], headers={"Retry-After": "0"})
+
+    async with serve_api(post={"/search": handler}):
+        result = await send_api_request(
+            "/search",
+            "post",
+            {"Content-Type": "application/json"},
+            {},
+            retry_policy=fast_retry_policy,
+        )
+
+    assert result == SuccessResponse(status=200, data={"ok": True})
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_returns_last_error_when_attempts_run_out(serve_api):
+    handler, calls = failing_handler([502, 502, 502])
+
+    async with serve_api(post={"/search": handler}):
+        result = await send_api_request(
+            "/search", "post", {}, {}, retry_policy=fast_retry_policy
+        )
+
+    assert result == ErrorResponse(status=502, error="busy")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors(serve_api):
+    handler, calls = failing_handler([400])
+
+    async with serve_api(post={"/search": handler}):
+        result = await send_api_request(
+            "/search", "post", {}, {}, retry_policy=fast_retry_policy
+        )
+
+    assert isinstance(result, ErrorResponse)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_non_idempotent_request_only_with_idempotency_key(serve_api):
+    handler, calls = failing_handler([503, 503])
+
+    async with serve_api(post={"/add": handler}):
+        result = await send_api_request(
+            "/add", "post", {}, {}, retry_policy=fast_retry_policy
+        )
+        assert isinstance(result, ErrorResponse)
+        assert len(calls) == 1
+
+        result = await send_api_request(
+            "/add",
+            "post",
+            {"Content-Type": "application/json", IDEMPOTENCY_KEY_HEADER: "key"},
+            {},
+            retry_policy=fast_retry_policy,
+        )
+
+    assert result == SuccessResponse(status=200, data={"ok": True})
+    assert len(calls) == 3
+    assert {request.headers[IDEMPOTENCY_KEY_HEADER] for request in calls[1:]} == {"key"}
+
+
+@pytest.mark.asyncio
+async def test_retries_connection_failures_then_raises():
+    attempts = 0
+    original_request = aiohttp.ClientSession._request
+
+    async def counting_request(self, *args, **kwargs):
+        nonlocal attempts
+        attempts += 1
+        return await original_request(self, *args, **kwargs)
+
+    with (
+        patch(
+            "cogwit_sdk.infrastructure.send_api_request.api_base",
+            "http://127.0.0.1:1",
+        ),
+        patch.object(aiohttp.ClientSession, "_request", counting_request),
+    ):
+        with pytest.raises(aiohttp.ClientConnectorError):
+            await send_api_request(
+                "/add", "post", {}, {}, retry_policy=fast_retry_policy
+            )
+
+    assert attempts == 3
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from cogwit_sdk.infrastructure.send_api_request import send_api_request, SuccessResponse
@@ -66,3 +67,58 @@ async def test_send_api_request_throws_on_invalid_http_method():
             await send_api_request(
                 "/test", "invalid_method", {"X-Api-Key": "test"}, {"message": "test"}
             )
+
+
+@pytest.mark.asyncio
+async def test_send_api_request_reuses_provided_session():
+    with patch("cogwit_sdk.infrastructure.send_api_request.aiohttp") as mock_aiohttp:
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.text = AsyncMock(return_value="success")
+        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+        mock_response.__aexit__ = AsyncMock(return_value=None)
+
+        mock_session = MagicMock()
+        mock_session.post = MagicMock(return_value=mock_response)
+
+        for _ in range(3):
+            result = await send_api_request(
+                "/test",
+                "post",
+                {"X-Api-Key": "test"},
+                {"message": "test"},
+                session=mock_session,
+            )
+            assert isinstance(result, SuccessResponse)
+
+        mock_aiohttp.ClientSession.assert_not_called()
+        mock_session.close.assert_not_called()
+        assert mock_session.post.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_send_api_request_sends_encoded_json_body():
+    with patch("cogwit_sdk.infrastructure.send_api_request.aiohttp"):
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.text = AsyncMock(return_value="success")
+        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+        mock_response.__aexit__ = AsyncMock(return_value=None)
+
+        mock_session = MagicMock()
+        mock_session.post = MagicMock(return_value=mock_response)
+
+        await send_api_request(
+            "/test",
+            "post",
+            {"X-Api-Key": "test"},
+            {"text_data": ["a", "b"]},
+            session=mock_session,
+        )
+
+        request_kwargs = mock_session.post.call_args.kwargs
+        assert json.loads(request_kwargs["data"]) == {"text_data": ["a", "b"]}
+        assert request_kwargs["headers"] == {
+            "Content-Type": "application/json",
+            "X-Api-Key": "test",
+        }
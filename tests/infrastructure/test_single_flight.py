@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from cogwit_sdk.infrastructure.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_with_the_same_key_share_one_call():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        single_flight.do("a", lambda: call(1)),
+        single_flight.do("a", lambda: call(2)),
+        single_flight.do("b", lambda: call(3)),
+    )
+
+    assert results == [1, 1, 3]
+    assert calls == [1, 3]
+    assert single_flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_exceptions_reach_every_caller_and_are_not_remembered():
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        single_flight.do("a", fail),
+        single_flight.do("a", fail),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await single_flight.do("a", lambda: asyncio.sleep(0, "ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_leaves_the_others_waiting():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(single_flight.do("a", call))
+    second = asyncio.create_task(single_flight.do("a", call))
+    await started.wait()
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_shared_call_is_cancelled_once_every_caller_gives_up():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def call():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.create_task(single_flight.do("a", call)) for _ in range(2)]
+    await started.wait()
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert single_flight.in_flight() == 0
@@ -0,0 +1,55 @@
+import pytest
+
+from cogwit_sdk.infrastructure.sse import ServerSentEvent, ServerSentEventParser
+
+body = (
+    "retry: 1500\n"
+    ": keep-alive comment\n"
+    "event: delta\n"
+    'data: {"delta": "Hé"}\r\n'
+    "\r\n"
+    "data:first line\n"
+    "data: second line\n"
+    "id: 7\n"
+    "\n"
+    "event: result\n"
+    "data: []\r\r"
+).encode()
+
+expected = [
+    ServerSentEvent(event="delta", data='{"delta": "Hé"}', retry=1500),
+    ServerSentEvent(data="first line\nsecond line", id="7", retry=1500),
+    ServerSentEvent(event="result", data="[]", id="7", retry=1500),
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 4096])
+def test_parses_events_regardless_of_chunking(chunk_size):
+    parser = ServerSentEventParser()
+    events = []
+
+    for start in range(0, len(body), chunk_size):
+        events.extend(parser.feed(body[start : start + chunk_size]))
+    events.extend(parser.close())
+
+    assert events == expected
+
+
+def test_events_are_dispatched_at_the_blank_line():
+    parser = ServerSentEventParser()
+
+    assert parser.feed(b"data: partial\n") == []
+    assert parser.feed(b"\n") == [ServerSentEvent(data="partial")]
+
+
+def test_unterminated_event_is_discarded_at_the_end():
+    parser = ServerSentEventParser()
+    parser.feed(b"data: complete\n\ndata: cut off")
+
+    assert parser.close() == []
+
+
+def test_blocks_without_data_are_not_dispatched():
+    parser = ServerSentEventParser()
+
+    assert parser.feed(b"event: ping\n\n: comment\n\n") == []
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from cogwit_sdk.infrastructure.retry_policy import RetryPolicy
+from cogwit_sdk.infrastructure.send_api_request import (
+    ErrorResponse,
+    SuccessResponse,
+    send_api_request,
+)
+from cogwit_sdk.infrastructure.timeout_policy import (
+    DeadlineExceeded,
+    EndpointTimeout,
+    TimeoutPolicy,
+    deadline_after,
+    with_deadline,
+)
+
+
+def slow_handler(delay, status=200, headers=None):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(delay)
+        return web.json_response({"ok": True}, status=status, headers=headers)
+
+    return handler, calls
+
+
+def test_endpoints_fall_back_to_the_default_timeout():
+    policy = TimeoutPolicy(endpoints={"/search": EndpointTimeout(total=5)})
+
+    assert policy.for_endpoint("/search").total == 5
+    assert policy.for_endpoint("/cognify") == EndpointTimeout()
+    assert EndpointTimeout().client_timeout().total == 120 * 60
+    assert EndpointTimeout().client_timeout().sock_connect == 30
+
+
+@pytest.mark.asyncio
+async def test_with_deadline_cancels_the_call():
+    cancelled = False
+
+    async def call():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    with pytest.raises(DeadlineExceeded):
+        await with_deadline(deadline_after(0.01), call())
+
+    assert cancelled
+    assert await with_deadline(None, asyncio.sleep(0, "done")) == "done"
+
+
+@pytest.mark.asyncio
+async def test_with_deadline_fails_fast_when_the_deadline_has_passed():
+    with pytest.raises(DeadlineExceeded):
+        await with_deadline(time.monotonic() - 1, asyncio.sleep(1))
+
+
+@pytest.mark.asyncio
+async def test_endpoint_timeout_applies_to_posts_and_gets(serve_api):
+    handler, _ = slow_handler(1)
+
+    async with serve_api(post={"/search": handler}, get={"/datasets/status": handler}):
+        for api_endpoint, method in (("/search", "post"), ("/datasets/status", "get")):
+            started_at = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await send_api_request(
+                    api_endpoint,
+                    method,
+                    {"Content-Type": "application/json"},
+                    {},
+                    timeout=EndpointTimeout(total=0.05),
+                )
+            assert time.monotonic() - started_at < 0.5
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_a_request_across_retries(serve_api):
+    calls = []
+
+    # Fails fast twice, then hangs past the deadline.
+    async def handler(request):
+        calls.append(request)
+        if len(calls) > 2:
+            await asyncio.sleep(1)
+        return web.json_response({"ok": True}, status=503)
+
+    retry_policy = RetryPolicy(max_attempts=10, base_delay=0.001, max_delay=0.001)
+
+    async with serve_api(post={"/search": handler}, get={"/datasets/status": handler}):
+        started_at = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await send_api_request(
+                "/search",
+                "post",
+                {},
+                {},
+                retry_policy=retry_policy,
+                deadline=deadline_after(0.1),
+            )
+
+    assert time.monotonic() - started_at < 0.3
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_backoff_past_the_deadline_returns_the_last_error(serve_api):
+    handler, calls = slow_handler(0, status=503, headers={"Retry-After": "10"})
+    retry_policy = RetryPolicy(max_attempts=5)
+
+    async with serve_api(post={"/search": handler}, get={"/datasets/status": handler}):
+        started_at = time.monotonic()
+        response = await send_api_request(
+            "/search",
+            "post",
+            {},
+            {},
+            retry_policy=retry_policy,
+            deadline=deadline_after(1),
+        )
+
+    assert isinstance(response, ErrorResponse)
+    assert response.status == 503
+    assert len(calls) == 1
+    assert time.monotonic() - started_at < 0.5
+
+
+@pytest.mark.asyncio
+async def test_request_within_its_deadline_succeeds(serve_api):
+    handler, _ = slow_handler(0)
+
+    async with serve_api(post={"/search": handler}, get={"/datasets/status": handler}):
+        response = await send_api_request(
+            "/search",
+            "post",
+            {"Content-Type": "application/json"},
+            {},
+            deadline=deadline_after(5),
+        )
+
+    assert isinstance(response, SuccessResponse)
+    assert response.data == {"ok": True}
@@ -0,0 +1,37 @@
+from cogwit_sdk.modules.add.batch_text_data import batch_text_data
+
+
+def test_batches_by_item_count():
+    batches = list(batch_text_data((str(i) for i in range(7)), 3, 1024))
+
+    assert batches == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+
+
+def test_batches_by_encoded_size():
+    # Each document encodes to 10 bytes plus a separator.
+    documents = ["x" * 8] * 5
+
+    batches = list(batch_text_data(documents, 100, 25))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_counts_escaped_characters_in_size():
+    # Quotes are escaped, so this encodes to 22 bytes rather than 12.
+    documents = ['"' * 10, "a"]
+
+    assert list(batch_text_data(documents, 100, 24)) == [['"' * 10], ["a"]]
+
+
+def test_oversized_document_gets_its_own_batch():
+    documents = ["small", "x" * 100, "small"]
+
+    assert list(batch_text_data(documents, 100, 20)) == [
+        ["small"],
+        ["x" * 100],
+        ["small"],
+    ]
+
+
+def test_empty_input_yields_no_batches():
+    assert list(batch_text_data([], 10, 10)) == []
@@ -0,0 +1,86 @@
+import json
+import mmap
+from uuid import UUID
+
+import pytest
+
+from cogwit_sdk.modules.add.stream_add_body import is_text_data, stream_add_body
+
+dataset_id = UUID("12345678-1234-1234-1234-123456789abc")
+text = 'Zürich "quoted" \\ line\nbreak ✓ ' * 50
+
+
+async def numbered_documents():
+    for index in range(3):
+        yield f"document {index}"
+
+
+async def read_body(body):
+    chunks = [chunk async for chunk in body.open()]
+    return chunks, json.loads(b"".join(chunks))
+
+
+def test_is_text_data():
+    assert is_text_data("text")
+    assert is_text_data(["a", "b"])
+    assert not is_text_data(b"bytes")
+    assert not is_text_data(["a", b"b"])
+
+
+@pytest.mark.asyncio
+async def test_encodes_every_kind_of_source(tmp_path):
+    path = tmp_path / "document.txt"
+    path.write_text(text, encoding="utf-8")
+
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        body = stream_add_body(
+            [text, path, text.encode(), memoryview(text.encode()), mapped],
+            "docs",
+            dataset_id,
+            ["node"],
+            chunk_size=7,
+        )
+        chunks, payload = await read_body(body)
+
+    assert payload == {
+        "text_data": [text] * 5,
+        "dataset_id": str(dataset_id),
+        "dataset_name": "docs",
+        "node_set": ["node"],
+    }
+    # Multi-byte characters split across chunks are decoded intact, and no
+    # chunk holds more than a chunk's worth of a document.
+    assert max(len(chunk) for chunk in chunks[1:-1]) <= 7 * 3
+    assert body.replayable
+
+
+@pytest.mark.asyncio
+async def test_async_iterators_add_one_document_per_item():
+    body = stream_add_body(
+        [numbered_documents(), "last"], "docs", None, None, chunk_size=1024
+    )
+
+    _, payload = await read_body(body)
+
+    assert payload["text_data"] == [
+        "document 0",
+        "document 1",
+        "document 2",
+        "last",
+    ]
+    assert payload["dataset_id"] == ""
+    assert not body.replayable
+    with pytest.raises(RuntimeError):
+        body.open()
+
+
+@pytest.mark.asyncio
+async def test_replayable_bodies_can_be_sent_again(tmp_path):
+    path = tmp_path / "document.txt"
+    path.write_text("content", encoding="utf-8")
+    body = stream_add_body([path], "docs", None, None)
+
+    assert await read_body(body) == await read_body(body)
@@ -0,0 +1,144 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from cogwit_sdk.cogwit.cogwit import AddError, AddResponse, CognifyError
+from cogwit_sdk.modules.cognify.CognifyScheduler import (
+    CognifyScheduler,
+    CognifySchedulerConfig,
+)
+
+
+def make_client(cognify_delay=0.0):
+    client = MagicMock()
+    dataset_ids = {}
+
+    async def add(data, dataset_name="main_dataset", **kwargs):
+        dataset_id = dataset_ids.setdefault(dataset_name, uuid4())
+        return AddResponse(
+            status="PipelineRunCompleted",
+            dataset_id=dataset_id,
+            pipeline_run_id=uuid4(),
+            dataset_name=dataset_name,
+        )
+
+    async def cognify(datasets, dataset_ids):
+        await asyncio.sleep(cognify_delay)
+        return "cognified"
+
+    client.add = AsyncMock(side_effect=add)
+    client.cognify = AsyncMock(side_effect=cognify)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_cognifies_each_dataset_once_after_a_quiet_period():
+    client = make_client()
+    scheduler = CognifyScheduler(
+        client, CognifySchedulerConfig(quiet_period=0.05, max_staleness=10)
+    )
+
+    for _ in range(3):
+        docs = await scheduler.add("document", dataset_name="docs")
+        notes = await scheduler.add("note", dataset_name="notes")
+        await asyncio.sleep(0.01)
+    assert client.cognify.call_count == 0
+
+    await asyncio.sleep(0.1)
+
+    assert sorted(
+        call.kwargs["dataset_ids"][0] for call in client.cognify.call_args_list
+    ) == sorted([docs.dataset_id, notes.dataset_id])
+    assert scheduler.results[docs.dataset_id] == "cognified"
+    assert scheduler.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_max_staleness_bounds_the_wait_under_continuous_adds():
+    client = make_client()
+    scheduler = CognifyScheduler(
+        client, CognifySchedulerConfig(quiet_period=0.05, max_staleness=0.1)
+    )
+
+    for _ in range(15):
+        await scheduler.add("document", dataset_name="docs")
+        await asyncio.sleep(0.01)
+
+    # The adds never paused for the quiet period.
+    assert client.cognify.call_count >= 1
+    await scheduler.aclose()
+
+
+@pytest.mark.asyncio
+async def test_at_most_one_cognify_per_dataset_is_in_flight():
+    client = make_client(cognify_delay=0.05)
+    scheduler = CognifyScheduler(
+        client, CognifySchedulerConfig(quiet_period=0, max_staleness=0)
+    )
+
+    await scheduler.add("first", dataset_name="docs")
+    await asyncio.sleep(0.01)
+    await scheduler.add("second", dataset_name="docs")
+    await scheduler.add("third", dataset_name="docs")
+    await asyncio.sleep(0.01)
+    assert client.cognify.call_count == 1
+
+    await asyncio.sleep(0.1)
+    assert client.cognify.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_cognifies_pending_datasets_and_skips_failed_adds():
+    client = make_client()
+    scheduler = CognifyScheduler(client, CognifySchedulerConfig(quiet_period=60))
+    await scheduler.add("document", dataset_name="docs")
+    client.add.side_effect = None
+    client.add.return_value = AddError(status=500, error="boom")
+    await scheduler.add("document", dataset_name="notes")
+
+    await scheduler.flush()
+
+    assert client.cognify.call_count == 1
+    assert scheduler.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_cognify_exceptions_are_recorded_as_errors():
+    client = make_client()
+    client.cognify.side_effect = OSError("connection reset")
+    scheduler = CognifyScheduler(client, CognifySchedulerConfig(quiet_period=60))
+    dataset_id = uuid4()
+    scheduler.notify(dataset_id)
+
+    await scheduler.flush()
+
+    assert scheduler.results[dataset_id].status == 0
+    assert "connection reset" in scheduler.results[dataset_id].error
+
+
+@pytest.mark.asyncio
+async def test_failed_cognify_keeps_the_dataset_pending_and_retries():
+    client = make_client()
+    client.cognify.side_effect = [
+        CognifyError(status=503, error="unavailable"),
+        OSError("connection reset"),
+        "cognified",
+    ]
+    scheduler = CognifyScheduler(
+        client,
+        CognifySchedulerConfig(quiet_period=0, max_staleness=0, retry_delay=0.02),
+    )
+    dataset_id = uuid4()
+    scheduler.notify(dataset_id)
+
+    await asyncio.sleep(0.01)
+    assert client.cognify.call_count == 1
+    assert scheduler.pending() == [dataset_id]
+
+    # Retried after 0.02 and then 0.04 seconds.
+    await asyncio.sleep(0.1)
+    assert client.cognify.call_count == 3
+    assert scheduler.results[dataset_id] == "cognified"
+    assert scheduler.pending() == []
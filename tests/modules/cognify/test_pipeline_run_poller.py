@@ -0,0 +1,173 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from cogwit_sdk.modules.cognify.PipelineRunPoller import (
+    PipelinePollingConfig,
+    PipelineRunPoller,
+    PipelineStatusError,
+)
+
+fast_polling = PipelinePollingConfig(
+    initial_interval=0.01, backoff=2, max_interval=0.04, max_batch_size=2
+)
+
+
+class FakeStatuses:
+    def __init__(self):
+        self.statuses = {}
+        self.requests = []
+
+    async def __call__(self, dataset_ids):
+        self.requests.append(dataset_ids)
+        return {
+            str(dataset_id): self.statuses[dataset_id] for dataset_id in dataset_ids
+        }
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_the_final_status():
+    fake_statuses = FakeStatuses()
+    poller = PipelineRunPoller(fast_polling, fake_statuses)
+    dataset_id = uuid4()
+    fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_STARTED"
+    handle = poller.watch(dataset_id, "docs", uuid4(), "PipelineRunStarted")
+
+    await asyncio.sleep(0.03)
+    assert not handle.done
+    fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_COMPLETED"
+
+    assert await handle.wait(timeout=1) == "DATASET_PROCESSING_COMPLETED"
+    assert handle.succeeded
+    assert poller.tracked() == 0
+
+
+@pytest.mark.asyncio
+async def test_due_runs_are_polled_in_batches():
+    fake_statuses = FakeStatuses()
+    poller = PipelineRunPoller(fast_polling, fake_statuses)
+    dataset_ids = [uuid4() for _ in range(5)]
+    for dataset_id in dataset_ids:
+        fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_COMPLETED"
+
+    handles = [
+        poller.watch(dataset_id, "docs", uuid4(), "PipelineRunStarted")
+        for dataset_id in dataset_ids
+    ]
+    await asyncio.gather(*(handle.wait(timeout=1) for handle in handles))
+
+    assert sorted(len(request) for request in fake_statuses.requests) == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_runs_back_off_up_to_max_interval():
+    fake_statuses = FakeStatuses()
+    poller = PipelineRunPoller(fast_polling, fake_statuses)
+    dataset_id = uuid4()
+    fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_STARTED"
+    handle = poller.watch(dataset_id, "docs", uuid4(), "DATASET_PROCESSING_STARTED")
+
+    await asyncio.sleep(0.2)
+    handle.cancel()
+
+    # Polls at 0.01, 0.03, 0.07, then every 0.04 seconds.
+    assert 4 <= len(fake_statuses.requests) <= 6
+
+
+@pytest.mark.asyncio
+async def test_status_fetches_right_away_and_cancel_stops_waiters():
+    fake_statuses = FakeStatuses()
+    poller = PipelineRunPoller(
+        PipelinePollingConfig(initial_interval=10), fake_statuses
+    )
+    dataset_id = uuid4()
+    fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_STARTED"
+    handle = poller.watch(dataset_id, "docs", uuid4(), "PipelineRunStarted")
+
+    assert await asyncio.wait_for(handle.status(), 1) == "DATASET_PROCESSING_STARTED"
+
+    waiter = asyncio.create_task(handle.wait())
+    await asyncio.sleep(0)
+    handle.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert poller.tracked() == 0
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_status_requests_keep_polling():
+    fake_statuses = FakeStatuses()
+    completed = asyncio.Event()
+
+    async def flaky_statuses(dataset_ids):
+        if len(fake_statuses.requests) < 2:
+            fake_statuses.requests.append(dataset_ids)
+            raise OSError("connection reset")
+        return await fake_statuses(dataset_ids)
+
+    async def on_completed(handle):
+        completed.set()
+
+    poller = PipelineRunPoller(fast_polling, flaky_statuses, on_completed)
+    dataset_id = uuid4()
+    fake_statuses.statuses[dataset_id] = "DATASET_PROCESSING_ERRORED"
+    handle = poller.watch(dataset_id, "docs", uuid4(), "PipelineRunStarted")
+
+    assert await handle.wait(timeout=1) == "DATASET_PROCESSING_ERRORED"
+    assert not handle.succeeded
+    assert not completed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_failing_completion_callback_does_not_stop_polling(caplog):
+    fake_statuses = FakeStatuses()
+
+    async def on_completed(handle):
+        raise OSError("database is locked")
+
+    poller = PipelineRunPoller(fast_polling, fake_statuses, on_completed)
+    first_id, second_id = uuid4(), uuid4()
+    fake_statuses.statuses[first_id] = "DATASET_PROCESSING_COMPLETED"
+    fake_statuses.statuses[second_id] = "DATASET_PROCESSING_STARTED"
+    first = poller.watch(first_id, "docs", uuid4(), "PipelineRunStarted")
+    second = poller.watch(second_id, "notes", uuid4(), "PipelineRunStarted")
+
+    assert await first.wait(timeout=1) == "DATASET_PROCESSING_COMPLETED"
+    fake_statuses.statuses[second_id] = "DATASET_PROCESSING_COMPLETED"
+
+    assert await second.wait(timeout=1) == "DATASET_PROCESSING_COMPLETED"
+    assert "database is locked" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_runs_fail_when_their_status_is_refused():
+    async def refused_statuses(dataset_ids):
+        raise PipelineStatusError(404, "Dataset not found")
+
+    poller = PipelineRunPoller(fast_polling, refused_statuses)
+    handle = poller.watch(uuid4(), "docs", uuid4(), "PipelineRunStarted")
+
+    with pytest.raises(PipelineStatusError) as error:
+        await handle.wait(timeout=1)
+    assert error.value.status == 404
+    assert handle.done and not handle.succeeded
+    assert poller.tracked() == 0
+
+
+@pytest.mark.asyncio
+async def test_runs_fail_after_max_failed_polls_in_a_row():
+    requests = []
+
+    async def unavailable_statuses(dataset_ids):
+        requests.append(dataset_ids)
+        raise PipelineStatusError(503, "Service unavailable")
+
+    config = fast_polling.model_copy(update={"max_failed_polls": 3})
+    poller = PipelineRunPoller(config, unavailable_statuses)
+    handle = poller.watch(uuid4(), "docs", uuid4(), "PipelineRunStarted")
+
+    with pytest.raises(PipelineStatusError):
+        await handle.wait(timeout=1)
+    assert len(requests) == 3
@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from cogwit_sdk.modules.search.DiskSearchResultCache import DiskSearchResultCache
+
+
+def write_entry(path, index):
+    cache = DiskSearchResultCache(path, max_bytes=1 << 20, ttl=60)
+    asyncio.run(cache.put((f"q{index}", "CHUNKS", False), b"[]", frozenset({"docs"})))
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_returns_stored_results_until_they_expire(tmp_path, clock):
+    cache = DiskSearchResultCache(
+        str(tmp_path / "cache.db"), max_bytes=1024, ttl=5, clock=clock
+    )
+    await cache.put(("q", "CHUNKS", False), b'["result"]', frozenset({"docs"}))
+
+    assert await cache.get(("q", "CHUNKS", False)) == b'["result"]'
+    assert await cache.get(("q", "CHUNKS", True)) is None
+    clock.now = 5
+    assert await cache.get(("q", "CHUNKS", False)) is None
+
+    stats = await cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_read_entries_over_max_bytes(tmp_path, clock):
+    cache = DiskSearchResultCache(
+        str(tmp_path / "cache.db"), max_bytes=20, ttl=60, clock=clock
+    )
+    await cache.put(("a", "CHUNKS", False), b"x" * 10, frozenset())
+    clock.now = 1
+    await cache.put(("b", "CHUNKS", False), b"x" * 10, frozenset())
+    clock.now = 2
+    await cache.get(("a", "CHUNKS", False))
+    clock.now = 3
+    await cache.put(("c", "CHUNKS", False), b"x" * 10, frozenset())
+
+    assert await cache.get(("a", "CHUNKS", False)) is not None
+    assert await cache.get(("b", "CHUNKS", False)) is None
+    assert await cache.get(("c", "CHUNKS", False)) is not None
+    assert (await cache.stats()).evictions == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_invalidates_entries_of_changed_datasets_and_unscoped_ones(tmp_path):
+    cache = DiskSearchResultCache(str(tmp_path / "cache.db"), max_bytes=1024, ttl=60)
+    await cache.put(("docs", "CHUNKS", False), b"[]", frozenset({"docs", "docs-id"}))
+    await cache.put(("notes", "CHUNKS", False), b"[]", frozenset({"notes"}))
+    await cache.put(("any", "CHUNKS", False), b"[]", frozenset())
+
+    await cache.invalidate_datasets(["docs-id"])
+
+    assert await cache.get(("docs", "CHUNKS", False)) is None
+    assert await cache.get(("notes", "CHUNKS", False)) is not None
+    assert await cache.get(("any", "CHUNKS", False)) is None
+    assert (await cache.stats()).size == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_entries_are_shared_by_api_key_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = DiskSearchResultCache(path, max_bytes=1024, ttl=60, namespace="key")
+    reader = DiskSearchResultCache(path, max_bytes=1024, ttl=60, namespace="key")
+    other = DiskSearchResultCache(path, max_bytes=1024, ttl=60, namespace="other")
+
+    await writer.put(("q", "CHUNKS", False), b"[1]", frozenset())
+
+    assert await reader.get(("q", "CHUNKS", False)) == b"[1]"
+    assert await other.get(("q", "CHUNKS", False)) is None
+    for cache in (writer, reader, other):
+        cache.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_in_other_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=write_entry, args=(path, index)) for index in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    cache = DiskSearchResultCache(path, max_bytes=1 << 20, ttl=60)
+    assert (await cache.stats()).size == 4
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_write_until_the_next_write(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = DiskSearchResultCache(path, max_bytes=1024, ttl=60, clock=clock)
+    await cache.put(("q", "CHUNKS", False), b"[]", frozenset())
+    changes = cache._connect().total_changes
+
+    clock.now = 1
+    assert await cache.get(("q", "CHUNKS", False)) == b"[]"
+    assert cache._connect().total_changes == changes
+
+    cache.close()
+    reader = sqlite3.connect(path)
+    assert reader.execute("SELECT accessed_at FROM search_results").fetchall() == [(1,)]
+    reader.close()
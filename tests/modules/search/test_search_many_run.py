@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from cogwit_sdk.modules.search.SearchManyRun import (
+    SearchManyRun,
+    latency_percentile,
+)
+
+
+def make_run(run_query, queries, concurrency=4, ordered=True):
+    return SearchManyRun(
+        queries,
+        run_query,
+        is_error=lambda result: isinstance(result, dict) and "error" in result,
+        error_result=lambda error: {"error": str(error)},
+        concurrency=concurrency,
+        ordered=ordered,
+    )
+
+
+async def delayed_echo(query_text):
+    # Later queries finish first.
+    await asyncio.sleep(0.001 * (10 - int(query_text)))
+    return query_text
+
+
+def test_latency_percentile_uses_nearest_rank():
+    latencies = [float(value) for value in range(1, 101)]
+
+    assert latency_percentile(latencies, 50) == 50.0
+    assert latency_percentile(latencies, 99) == 99.0
+    assert latency_percentile(latencies, 100) == 100.0
+    assert latency_percentile([3.0], 50) == 3.0
+
+
+def test_concurrency_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        make_run(delayed_echo, ["0"], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_results_come_back_in_input_order():
+    queries = [str(index) for index in range(10)]
+
+    items = await make_run(delayed_echo, queries).collect()
+
+    assert [item.index for item in items] == list(range(10))
+    assert [item.result for item in items] == queries
+
+
+@pytest.mark.asyncio
+async def test_unordered_results_come_back_as_they_complete():
+    queries = [str(index) for index in range(10)]
+
+    items = await make_run(
+        delayed_echo, queries, concurrency=10, ordered=False
+    ).collect()
+
+    assert sorted(item.index for item in items) == list(range(10))
+    assert items[0].index == 9
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    in_flight = 0
+    peak = 0
+
+    async def run_query(query_text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return query_text
+
+    items = await make_run(run_query, map(str, range(50)), concurrency=3).collect()
+
+    assert len(items) == 50
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_queries_do_not_stop_the_batch():
+    async def run_query(query_text):
+        if query_text == "raise":
+            raise RuntimeError("boom")
+        if query_text == "fail":
+            return {"error": "bad query"}
+        return query_text
+
+    run = make_run(run_query, ["a", "raise", "b", "fail", "c"])
+    items = await run.collect()
+
+    assert [item.result for item in items] == [
+        "a",
+        {"error": "boom"},
+        "b",
+        {"error": "bad query"},
+        "c",
+    ]
+    assert run.summary.total == 5
+    assert run.summary.succeeded == 3
+    assert run.summary.failed == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_reports_throughput_and_latency_percentiles():
+    run = make_run(delayed_echo, [str(index) for index in range(10)])
+
+    assert run.summary is None
+    await run.collect()
+
+    summary = run.summary
+    assert summary.total == 10
+    assert summary.elapsed > 0
+    assert summary.throughput == pytest.approx(10 / summary.elapsed)
+    assert 0 < summary.latency_p50 <= summary.latency_p90 <= summary.latency_p99
+    assert summary.latency_p99 <= summary.latency_max
+
+
+@pytest.mark.asyncio
+async def test_empty_input_has_an_empty_summary():
+    run = make_run(delayed_echo, [])
+
+    assert await run.collect() == []
+    assert run.summary.total == 0
+    assert run.summary.latency_p50 is None
+
+
+@pytest.mark.asyncio
+async def test_queries_are_pulled_lazily_and_stop_when_iteration_stops():
+    pulled = []
+    started = []
+
+    def queries():
+        for index in range(1000):
+            pulled.append(index)
+            yield str(index)
+
+    async def run_query(query_text):
+        started.append(query_text)
+        await asyncio.sleep(0)
+        return query_text
+
+    run = make_run(run_query, queries(), concurrency=2)
+    iterator = aiter(run)
+    async for item in iterator:
+        if item.index == 2:
+            break
+    await iterator.aclose()
+
+    # The ordered window caps how far ahead queries are started.
+    assert len(pulled) <= 3 + 4 * 2 + 2
+    assert len(started) == len(set(started))
+
+
+@pytest.mark.asyncio
+async def test_stopping_an_unordered_run_early_closes_it():
+    async def run_query(query_text):
+        await asyncio.sleep(0)
+        return query_text
+
+    run = make_run(
+        run_query, (str(index) for index in range(100)), concurrency=2, ordered=False
+    )
+    iterator = aiter(run)
+    async for item in iterator:
+        break
+    # Let the workers fill the queue before the run is closed.
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(iterator.aclose(), 1)
+
+    assert run.summary is None
@@ -0,0 +1,114 @@
+from uuid import UUID
+
+from cogwit_sdk.cogwit.cogwit import (
+    CombinedSearchResult,
+    SearchResult,
+    SearchResultDataset,
+)
+from cogwit_sdk.modules.search.SearchResultCache import (
+    CACHE_MISS,
+    SearchResultCache,
+    search_cache_key,
+)
+from cogwit_sdk.modules.search.SearchType import SearchType
+
+docs_id = UUID("12345678-1234-1234-1234-123456789abc")
+notes_id = UUID("87654321-4321-4321-4321-cba987654321")
+
+
+def results_from(dataset_id, dataset_name):
+    return [
+        SearchResult(
+            search_result="answer", dataset_id=dataset_id, dataset_name=dataset_name
+        )
+    ]
+
+
+def test_search_cache_key_normalizes_whitespace():
+    assert search_cache_key(
+        "  What is   in data? ", SearchType.CHUNKS, False
+    ) == search_cache_key("What is in data?", SearchType.CHUNKS, False)
+    assert search_cache_key("q", SearchType.CHUNKS, False) != search_cache_key(
+        "q", SearchType.CHUNKS, True
+    )
+
+
+def test_returns_cached_results_until_they_expire(clock):
+    cache = SearchResultCache(max_entries=10, ttl=5, clock=clock)
+    cache.put(("q", "CHUNKS", False), ["result"])
+
+    assert cache.get(("q", "CHUNKS", False)) == ["result"]
+    clock.now = 5
+    assert cache.get(("q", "CHUNKS", False)) is CACHE_MISS
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations, stats.size) == (1, 1, 1, 0)
+
+
+def test_evicts_least_recently_used_entry():
+    cache = SearchResultCache(max_entries=2, ttl=60)
+    cache.put(("a", "CHUNKS", False), 1)
+    cache.put(("b", "CHUNKS", False), 2)
+    cache.get(("a", "CHUNKS", False))
+    cache.put(("c", "CHUNKS", False), 3)
+
+    assert cache.get(("b", "CHUNKS", False)) is CACHE_MISS
+    assert cache.get(("a", "CHUNKS", False)) == 1
+    assert cache.stats().evictions == 1
+
+
+def test_invalidates_only_entries_built_from_changed_dataset():
+    cache = SearchResultCache(max_entries=10, ttl=60)
+    cache.put(("docs", "CHUNKS", False), results_from(docs_id, "docs"))
+    cache.put(("notes", "CHUNKS", False), results_from(notes_id, "notes"))
+    cache.put(
+        ("combined", "CHUNKS", True),
+        CombinedSearchResult(
+            result="answer",
+            context={},
+            datasets=[SearchResultDataset(id=notes_id, name="notes")],
+        ),
+    )
+
+    cache.invalidate_datasets([str(notes_id)])
+
+    assert cache.get(("docs", "CHUNKS", False)) is not CACHE_MISS
+    assert cache.get(("notes", "CHUNKS", False)) is CACHE_MISS
+    assert cache.get(("combined", "CHUNKS", True)) is CACHE_MISS
+    assert cache.stats().invalidations == 2
+
+    cache.invalidate_datasets(["docs"])
+    assert cache.get(("docs", "CHUNKS", False)) is CACHE_MISS
+
+
+def test_entries_without_datasets_are_dropped_on_any_write():
+    cache = SearchResultCache(max_entries=10, ttl=60)
+    cache.put(("raw", "CHUNKS", False), ["plain"])
+
+    cache.invalidate_datasets([str(docs_id)])
+
+    assert cache.get(("raw", "CHUNKS", False)) is CACHE_MISS
+
+
+def test_put_skips_results_fetched_across_an_invalidation():
+    cache = SearchResultCache(max_entries=10, ttl=60)
+    generation = cache.generation
+
+    cache.invalidate_datasets(["docs"])
+    cache.put(("q", "CHUNKS", False), ["stale"], generation)
+
+    assert cache.get(("q", "CHUNKS", False)) is CACHE_MISS
+
+
+def test_put_keeps_results_over_datasets_that_did_not_change():
+    cache = SearchResultCache(max_entries=10, ttl=60)
+    generation = cache.generation
+
+    cache.invalidate_datasets([str(docs_id), "docs"])
+    cache.put(("notes", "CHUNKS", False), results_from(notes_id, "notes"), generation)
+    cache.put(("docs", "CHUNKS", False), results_from(docs_id, "docs"), generation)
+    cache.put(("raw", "CHUNKS", False), ["plain"], generation)
+
+    assert cache.get(("notes", "CHUNKS", False)) == results_from(notes_id, "notes")
+    assert cache.get(("docs", "CHUNKS", False)) is CACHE_MISS
+    assert cache.get(("raw", "CHUNKS", False)) is CACHE_MISS
@@ -0,0 +1,109 @@
+from uuid import UUID
+
+from cogwit_sdk.cogwit.cogwit import SearchResult
+from cogwit_sdk.modules.search.SearchResultCache import CACHE_MISS
+from cogwit_sdk.modules.search.SearchType import SearchType
+from cogwit_sdk.modules.search.SimilarSearchCache import (
+    MinHasher,
+    SimilarSearchCache,
+    SimilarSearchCacheConfig,
+    query_words,
+)
+
+docs_id = UUID("12345678-1234-1234-1234-123456789abc")
+
+
+def make_cache(**config):
+    return SimilarSearchCache(SimilarSearchCacheConfig(enabled=True, **config))
+
+
+def test_query_words_ignore_case_punctuation_and_contractions():
+    assert query_words("What is in data?") == query_words("what's in the  DATA")
+    assert query_words("in data, what is") == query_words("What is in data?")
+
+
+def test_min_hash_signatures_are_deterministic():
+    words = query_words("graph of the knowledge base")
+
+    assert MinHasher(8).signature(words) == MinHasher(8).signature(words)
+    assert MinHasher(8).signature(words) != MinHasher(8).signature(
+        query_words("something else entirely")
+    )
+
+
+def test_reuses_results_of_near_duplicate_queries():
+    cache = make_cache()
+    cache.put("What is in data?", SearchType.CHUNKS, False, ["answer"])
+
+    assert cache.get("what's in the data", SearchType.CHUNKS, False) == ["answer"]
+    assert cache.get("What is in data?", SearchType.CHUNKS, True) is CACHE_MISS
+    assert cache.get("What is in data?", SearchType.SUMMARIES, False) is CACHE_MISS
+    assert cache.get("Who wrote the data?", SearchType.CHUNKS, False) is CACHE_MISS
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 3)
+
+
+def test_threshold_controls_how_similar_queries_must_be():
+    query = "how are graph nodes linked to documents"
+    similar = "how are graph nodes linked to the documents today"
+
+    strict = make_cache(threshold=1.0)
+    strict.put(query, SearchType.CHUNKS, False, ["answer"])
+    assert strict.get(similar, SearchType.CHUNKS, False) is CACHE_MISS
+
+    lenient = make_cache(threshold=0.5, bands=32, rows=1)
+    lenient.put(query, SearchType.CHUNKS, False, ["answer"])
+    assert lenient.get(similar, SearchType.CHUNKS, False) == ["answer"]
+
+
+def test_entries_expire_and_are_invalidated_by_dataset(clock):
+    cache = SimilarSearchCache(
+        SimilarSearchCacheConfig(enabled=True, ttl=5), clock=clock
+    )
+    result = [SearchResult(search_result="a", dataset_id=docs_id, dataset_name="docs")]
+    cache.put("first question", SearchType.CHUNKS, False, result)
+    cache.put("second question", SearchType.CHUNKS, False, result)
+
+    cache.invalidate_datasets(["docs"])
+    assert cache.get("first question", SearchType.CHUNKS, False) is CACHE_MISS
+
+    cache.put("third question", SearchType.CHUNKS, False, ["unscoped"])
+    clock.now = 5
+    assert cache.get("third question", SearchType.CHUNKS, False) is CACHE_MISS
+    assert cache.stats().expirations == 1
+    assert cache.stats().size == 0
+
+
+def test_evicts_least_recently_used_entries():
+    cache = make_cache(max_entries=2)
+    cache.put("alpha question", SearchType.CHUNKS, False, ["a"])
+    cache.put("beta question", SearchType.CHUNKS, False, ["b"])
+    cache.get("alpha question", SearchType.CHUNKS, False)
+    cache.put("gamma question", SearchType.CHUNKS, False, ["c"])
+
+    assert cache.get("alpha question", SearchType.CHUNKS, False) == ["a"]
+    assert cache.get("beta question", SearchType.CHUNKS, False) is CACHE_MISS
+    assert cache.stats().evictions == 1
+
+
+def test_ignores_results_fetched_across_an_invalidation():
+    cache = make_cache()
+    generation = cache.generation
+    cache.invalidate_datasets(["docs"])
+    cache.put("question", SearchType.CHUNKS, False, ["stale"], generation)
+
+    assert cache.get("question", SearchType.CHUNKS, False) is CACHE_MISS
+
+
+def test_removed_entries_leave_the_index():
+    cache = make_cache(max_entries=1)
+    cache.put("alpha question", SearchType.CHUNKS, False, ["a"])
+    cache.put("alpha question", SearchType.CHUNKS, False, ["a2"])
+    assert cache.get("alpha question", SearchType.CHUNKS, False) == ["a2"]
+    cache.put("beta question", SearchType.CHUNKS, False, ["b"])
+    cache.invalidate_datasets([])
+
+    assert cache.stats().size == 0
+    assert cache._buckets == {}
+    assert cache._buckets_by_key == {}